@@ -3,6 +3,10 @@ ASGI config for codingplatform project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server (e.g. ``uvicorn codingplatform.asgi:application``)
+so the async submission events endpoint can hold many open connections
+without tying up a sync worker per client.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
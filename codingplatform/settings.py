@@ -122,3 +122,74 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'challenge_list'
 LOGOUT_REDIRECT_URL = 'home'
 
+
+# Sandbox de execução de código
+# Processos filhos pré-criados que executam as submissões isoladas do processo web
+SANDBOX_ENABLED = True
+SANDBOX_POOL_SIZE = int(os.environ.get('SANDBOX_POOL_SIZE', 2))
+SANDBOX_MAX_JOBS_PER_WORKER = 100
+
+# Fila de avaliação
+# Workers: python manage.py run_judge_workers
+# Com JUDGE_EAGER = True a submissão é avaliada na própria requisição
+JUDGE_EAGER = os.environ.get('JUDGE_EAGER', '') == '1'
+JUDGE_WORKERS = 2
+JUDGE_POLL_INTERVAL = 1.0
+JUDGE_STALE_AFTER = 300  # segundos até uma submissão 'running' voltar à fila
+
+# Eventos de progresso da avaliação (server-sent events)
+SUBMISSION_EVENTS_POLL_INTERVAL = 0.5
+SUBMISSION_EVENTS_TIMEOUT = 60  # segundos até o navegador reconectar
+
+# Cache de vereditos (código normalizado + versão da suíte de testes)
+VERDICT_CACHE_ENABLED = True
+VERDICT_CACHE_SIZE = 1024  # entradas no LRU em memória de cada processo
+
+# Cache de bytecode compilado (LRU por processo + cache do Django)
+BYTECODE_CACHE_SIZE = 512  # entradas
+BYTECODE_MAX_SOURCE = 100 * 1024  # códigos maiores não ficam no LRU
+
+# Desafios por página na listagem (paginação por cursor)
+CHALLENGES_PAGE_SIZE = 50
+
+# Cache
+# Em produção, com vários processos, use um cache compartilhado (Redis ou
+# Memcached) para que páginas e estatísticas valham para todos
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'codingplatform',
+    }
+}
+
+# Páginas de visitantes anônimos (home e listagem de desafios)
+PAGE_CACHE_TIMEOUT = 60  # segundos
+
+# Estatísticas da home: recalculadas em segundo plano depois de HOME_STATS_TTL,
+# servindo o valor antigo por até HOME_STATS_STALE_TTL
+# Atualização periódica: python manage.py refresh_stats
+HOME_STATS_TTL = 60
+HOME_STATS_STALE_TTL = 600
+
+# Medição dos testes na avaliação (opcional, cada opção multiplica o custo
+# dos testes que passam): com JUDGE_TIMING_REPEATS > 1 o teste é repetido,
+# sempre com o código recarregado, e vale o menor tempo de CPU; com
+# JUDGE_MEASURE_MEMORY roda mais uma vez com tracemalloc para medir o pico
+JUDGE_TIMING_REPEATS = 1
+JUDGE_MEASURE_MEMORY = False
+
+# Teste de escala: expoente de crescimento tolerado além da complexidade
+# esperada do desafio (ver problems/scaling.py)
+SCALING_TOLERANCE = 0.5
+
+# Cache do histograma de tempos exibido na página do desafio (segundos)
+RUNTIME_DISTRIBUTION_TTL = 60
+
+# Casos de teste grandes ficam em arquivos neste diretório, fora do banco
+# (ver problems/test_data.py e python manage.py move_test_data). Casos com
+# mais de TEST_DATA_INLINE_LIMIT caracteres são movidos pelo comando.
+TEST_DATA_ROOT = BASE_DIR / 'test_data'
+TEST_DATA_INLINE_LIMIT = 64 * 1024
+
+# Arquivamento de submissões antigas: python manage.py archive_submissions
+ARCHIVE_AFTER_DAYS = 90
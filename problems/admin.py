@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.utils.html import format_html
 from .models import Challenge, TestCase, Submission, UserProfile
 
 
@@ -6,13 +7,17 @@ class TestCaseInline(admin.TabularInline):
     """Inline para adicionar casos de teste diretamente na página do desafio"""
     model = TestCase
     extra = 1
-    fields = ['input_data', 'expected_output', 'is_sample', 'description']
+    fields = ['input_data', 'expected_output', 'data_file', 'data_size', 'is_sample', 'description']
+    readonly_fields = ['data_file', 'data_size']
 
 
 @admin.register(Challenge)
 class ChallengeAdmin(admin.ModelAdmin):
     """Admin para gerenciar desafios"""
-    list_display = ['title', 'difficulty', 'created_at', 'get_solved_count']
+    list_display = [
+        'title', 'difficulty', 'created_at', 'solved_count', 'attempt_count',
+        'acceptance_rate_display'
+    ]
     list_filter = ['difficulty', 'created_at']
     search_fields = ['title', 'description']
     prepopulated_fields = {'slug': ('title',)}
@@ -25,24 +30,56 @@ class ChallengeAdmin(admin.ModelAdmin):
         ('Configuração de Código', {
             'fields': ('starter_code', 'function_name')
         }),
+        ('Limites de Execução', {
+            'fields': (
+                'time_limit', 'cpu_time_limit', 'total_time_limit', 'memory_limit',
+                'parallel_shards'
+            )
+        }),
+        ('Teste de Escala', {
+            'fields': (
+                'expected_complexity', 'scaling_generator',
+                'scaling_base_size', 'scaling_steps'
+            ),
+            'classes': ('collapse',)
+        }),
+        ('Comparação da Saída', {
+            'fields': ('comparator', 'float_tolerance', 'checker_code'),
+            'classes': ('collapse',)
+        }),
+        ('Estatísticas', {
+            'fields': ('solved_count', 'attempt_count', 'accepted_count')
+        }),
     )
+    readonly_fields = ['solved_count', 'attempt_count', 'accepted_count']
+    
+    @admin.display(description='Taxa de Aceitação')
+    def acceptance_rate_display(self, obj):
+        rate = obj.acceptance_rate
+        return '-' if rate is None else f'{rate}%'
 
 
 @admin.register(TestCase)
 class TestCaseAdmin(admin.ModelAdmin):
     """Admin para gerenciar casos de teste"""
-    list_display = ['challenge', 'is_sample', 'description']
+    list_display = ['challenge', 'is_sample', 'description', 'data_size']
     list_filter = ['is_sample', 'challenge']
     search_fields = ['challenge__title', 'description']
+    readonly_fields = ['data_file', 'data_sha256', 'data_size']
 
 
 @admin.register(Submission)
 class SubmissionAdmin(admin.ModelAdmin):
     """Admin para visualizar submissões"""
-    list_display = ['user', 'challenge', 'status', 'submitted_at', 'execution_time']
-    list_filter = ['status', 'submitted_at', 'challenge']
+    list_display = ['user', 'challenge', 'status', 'failed_test', 'submitted_at', 'execution_time', 'cpu_time', 'cache_hit']
+    list_filter = ['status', 'submitted_at', 'challenge', 'is_archived']
     search_fields = ['user__username', 'challenge__title']
-    readonly_fields = ['submitted_at', 'execution_time']
+    readonly_fields = ['source_code', 'submitted_at', 'execution_time', 'cpu_time', 'failed_test', 'cache_hit', 'is_archived']
+    exclude = ['code_blob']
+    
+    @admin.display(description='Código')
+    def source_code(self, obj):
+        return format_html('<pre>{}</pre>', obj.code)
     
     def has_add_permission(self, request):
         """Desabilita adição manual de submissões"""
@@ -0,0 +1,124 @@
+"""
+Arquivamento de submissões antigas.
+
+Submissões finalizadas há mais de ``ARCHIVE_AFTER_DAYS`` dias têm o resultado
+(mensagem e resultados por teste) movido, compactado com zlib, para
+``SubmissionArchive``. A linha em ``Submission`` fica só com os metadados e
+``is_archived = True``, então a tabela quente e seus índices param de crescer
+com o histórico. O código não precisa ser arquivado: ele já fica compactado
+e deduplicado em ``CodeBlob``.
+
+A melhor submissão de cada usuário em cada desafio (o aceite mais rápido)
+nunca é arquivada. ``load`` devolve os campos arquivados a uma instância,
+para que as views mostrem a submissão como antes.
+
+Executar: python manage.py archive_submissions
+"""
+import json
+import zlib
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import Submission, SubmissionArchive
+
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 90
+DEFAULT_BATCH_SIZE = 500
+COMPRESSION_LEVEL = 6
+
+# Campos que saem da tabela quente
+ARCHIVED_FIELDS = ('result_message', 'test_results')
+
+
+def compress_text(text):
+    return zlib.compress(text.encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def decompress_text(data):
+    return zlib.decompress(bytes(data)).decode('utf-8')
+
+
+def archivable_submissions(before):
+    """Submissões finalizadas antes de ``before`` que podem ser arquivadas"""
+    best_accepted = Submission.objects.filter(
+        user=OuterRef('user'),
+        challenge=OuterRef('challenge'),
+        status='accepted'
+    ).order_by(F('execution_time').asc(nulls_last=True), 'id').values('id')[:1]
+
+    return (
+        Submission.objects
+        .filter(submitted_at__lt=before, is_archived=False)
+        .exclude(status__in=('pending', 'running'))
+        .annotate(best_id=Subquery(best_accepted))
+        # Sem aceite, best_id é NULL e a comparação sozinha excluiria tudo
+        .filter(Q(best_id__isnull=True) | ~Q(id=F('best_id')))
+    )
+
+
+def _archive_batch(submissions):
+    archives = [
+        SubmissionArchive(
+            submission_id=submission.id,
+            result=compress_text(json.dumps({
+                'result_message': submission.result_message,
+                'test_results': submission.test_results,
+            }))
+        )
+        for submission in submissions
+    ]
+    with transaction.atomic():
+        SubmissionArchive.objects.bulk_create(archives)
+        Submission.objects.filter(id__in=[s.id for s in submissions]).update(
+            result_message='',
+            test_results=[],
+            is_archived=True
+        )
+
+
+def archive_submissions(older_than_days=DEFAULT_ARCHIVE_AFTER_DAYS,
+                        batch_size=DEFAULT_BATCH_SIZE, limit=None):
+    """
+    Arquiva as submissões antigas em lotes
+
+    Args:
+        older_than_days: Idade mínima, em dias, das submissões arquivadas
+        batch_size: Submissões por transação
+        limit: Máximo de submissões arquivadas nesta execução
+
+    Returns:
+        Número de submissões arquivadas
+    """
+    before = timezone.now() - timedelta(days=older_than_days)
+    archived = 0
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        batch = list(
+            archivable_submissions(before)
+            .order_by('id')
+            .only('id', *ARCHIVED_FIELDS)[:size]
+        )
+        if not batch:
+            break
+        _archive_batch(batch)
+        archived += len(batch)
+    return archived
+
+
+def load(submission):
+    """
+    Preenche os campos arquivados de ``submission`` (sem gravar no banco)
+
+    Não faz nada se a submissão não estiver arquivada.
+    """
+    if not submission.is_archived:
+        return submission
+
+    archive = SubmissionArchive.objects.get(submission_id=submission.id)
+    result = json.loads(decompress_text(archive.result))
+    submission.result_message = result['result_message']
+    submission.test_results = result['test_results']
+    return submission
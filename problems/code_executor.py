@@ -1,48 +1,422 @@
+import copy
+import hashlib
 import json
+import marshal
+import signal
 import sys
+import threading
 import traceback
 from io import StringIO
 import time
+import tracemalloc
 import platform
+from collections import namedtuple
 
+from . import comparators, complexity, test_data
 
-class TimeoutException(Exception):
-    """Exceção para timeout de execução"""
+
+# Limites padrão quando o desafio não define os seus
+DEFAULT_LIMITS = {
+    'time_limit': 2.0,          # segundos por teste
+    'cpu_time_limit': 2.0,      # segundos de CPU por teste
+    'total_time_limit': 10.0,   # segundos por submissão
+    'memory_limit': 256,        # MB (aplicado apenas no sandbox)
+    'output_limit': 64 * 1024,  # caracteres de saída capturados
+    # Medição (viaja com os limites até o sandbox)
+    'timing_repeats': 1,        # execuções medidas por teste; vale a menor
+    'measure_memory': False,    # pico de memória por teste, com tracemalloc
+}
+
+OUTPUT_TRUNCATED_MARKER = '\n... (saída truncada)'
+
+# Tamanho máximo do resultado guardado de um teste com resposta errada
+MAX_ACTUAL_REPR = 1000
+
+# Nome de arquivo que aparece nos tracebacks do código do usuário
+SOURCE_FILENAME = '<solution>'
+
+# Código compilado: objeto executável e a versão serializada com marshal,
+# que é o que atravessa o pipe até o sandbox
+CompiledCode = namedtuple('CompiledCode', ['digest', 'code_object', 'marshaled'])
+
+
+def source_digest(code):
+    """Hash SHA-256 do código fonte exato"""
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+
+# Erros do compilador com código inválido: sintaxe, bytes nulos e código
+# aninhado demais, que esgota a pilha ou a memória do compilador
+COMPILE_ERRORS = (SyntaxError, ValueError, RecursionError, MemoryError)
+
+
+def compile_source(code):
+    """
+    Compila o código do usuário
+
+    Levanta um dos ``COMPILE_ERRORS`` se o código for inválido.
+    """
+    code_object = compile(code, SOURCE_FILENAME, 'exec')
+    return CompiledCode(source_digest(code), code_object, marshal.dumps(code_object))
+
+
+def syntax_error_result(error):
+    """Monta o resultado de um código que nem chegou a compilar"""
+    if isinstance(error, (SyntaxError, ValueError)):
+        message = f'Erro de sintaxe: {str(error)}'
+    else:
+        message = 'Erro ao compilar o código: aninhamento profundo demais'
+    return {
+        'status': 'runtime_error',
+        'message': message,
+        'test_results': [],
+        'execution_time': 0,
+        'failed_test': None,
+        'output': ''
+    }
+
+
+class TimeoutException(BaseException):
+    """
+    Exceção para timeout de execução
+
+    Herda de BaseException para que um ``except Exception`` no código do
+    usuário não consiga engolir o timeout.
+    """
     pass
 
 
-def execute_code(code, test_cases, function_name='solution'):
+class LimitedOutput(StringIO):
+    """Buffer de saída que descarta o que passar de ``max_chars``"""
+
+    def __init__(self, max_chars):
+        super().__init__()
+        self.max_chars = max_chars
+        self.size = 0
+        self.truncated = False
+
+    def write(self, text):
+        remaining = self.max_chars - self.size
+        if remaining <= 0:
+            self.truncated = self.truncated or bool(text)
+            return len(text)
+        if len(text) > remaining:
+            self.truncated = True
+            text = text[:remaining]
+        self.size += len(text)
+        super().write(text)
+        return len(text)
+
+    def getvalue(self):
+        value = super().getvalue()
+        if self.truncated:
+            value += OUTPUT_TRUNCATED_MARKER
+        return value
+
+
+def memory_limit_result(test_number):
+    """Monta o resultado de uma execução que estourou o limite de memória"""
+    if test_number is None:
+        message = 'Limite de memória excedido ao carregar o código'
+    else:
+        message = f'Limite de memória excedido no teste {test_number}'
+    return {
+        'status': 'memory_limit',
+        'message': message,
+        'failed_test': test_number,
+    }
+
+
+def total_cpu_time(test_results):
+    """Soma do tempo de CPU dos testes, ou None se algum não foi medido"""
+    if not test_results or any('cpu_time' not in t for t in test_results):
+        return None
+    return round(sum(t['cpu_time'] for t in test_results), 6)
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutException()
+
+
+class ExecutionTimer:
+    """
+    Aplica limites de tempo real e de CPU usando temporizadores do sistema
+
+    Só funciona na thread principal de sistemas POSIX. Fora disso os limites
+    não são aplicados aqui e ficam a cargo do processo pai (ver sandbox.py).
+    """
+
+    def __init__(self, limits):
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.enabled = (
+            platform.system() != 'Windows'
+            and hasattr(signal, 'setitimer')
+            and threading.current_thread() is threading.main_thread()
+        )
+        self.wall_start = time.monotonic()
+        self.cpu_start = time.process_time()
+        self._old_handlers = {}
+
+    def install(self):
+        """Instala os handlers dos sinais de timeout"""
+        if self.enabled:
+            self._old_handlers = {
+                signal.SIGALRM: signal.signal(signal.SIGALRM, _raise_timeout),
+                signal.SIGPROF: signal.signal(signal.SIGPROF, _raise_timeout),
+            }
+
+    def uninstall(self):
+        """Desarma os temporizadores e restaura os handlers anteriores"""
+        if self.enabled:
+            self.stop()
+            for signum, handler in self._old_handlers.items():
+                signal.signal(signum, handler)
+            self._old_handlers = {}
+
+    def remaining(self):
+        """Retorna o tempo real e de CPU que ainda restam para a submissão"""
+        total = self.limits['total_time_limit']
+        wall = total - (time.monotonic() - self.wall_start)
+        cpu = total - (time.process_time() - self.cpu_start)
+        return wall, cpu
+
+    def start(self, wall_limit, cpu_limit):
+        """Arma os temporizadores; levanta TimeoutException se não há orçamento"""
+        wall_remaining, cpu_remaining = self.remaining()
+        wall = min(wall_limit, wall_remaining)
+        cpu = min(cpu_limit, cpu_remaining)
+        if wall <= 0 or cpu <= 0:
+            raise TimeoutException()
+        if self.enabled:
+            signal.setitimer(signal.ITIMER_REAL, wall)
+            signal.setitimer(signal.ITIMER_PROF, cpu)
+
+    def start_test(self):
+        self.start(self.limits['time_limit'], self.limits['cpu_time_limit'])
+
+    def start_module(self):
+        total = self.limits['total_time_limit']
+        self.start(total, total)
+
+    def stop(self):
+        if self.enabled:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.setitimer(signal.ITIMER_PROF, 0)
+
+
+def _call(function, args):
+    """Chama a função do usuário com os argumentos do teste"""
+    if isinstance(args, list):
+        return function(*args)
+    if isinstance(args, dict):
+        return function(**args)
+    return function(args)
+
+
+def _timed_call(timer, function, args):
+    """
+    Chama a função sob o limite de tempo do teste
+
+    Returns:
+        Tupla (resultado, tempo de CPU, tempo real), em segundos. Só a
+        chamada é medida: parse do JSON e comparação ficam de fora.
+    """
+    try:
+        timer.start_test()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        value = _call(function, args)
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+    finally:
+        timer.stop()
+    return value, cpu, wall
+
+
+def _fresh_function(timer, code, function_name):
+    """
+    Carrega o código do usuário de novo, em um namespace limpo
+
+    Cada repetição de uma medição usa uma função nova: com a mesma, um
+    ``@lru_cache`` ou uma variável global guardaria a resposta da chamada
+    anterior e o tempo medido seria o da consulta ao cache.
+    """
+    namespace = {}
+    try:
+        timer.start_module()
+        exec(code, namespace)
+    finally:
+        timer.stop()
+    return namespace[function_name]
+
+
+def _peak_memory(timer, function, args):
+    """Pico de memória alocada por uma chamada, em bytes"""
+    tracemalloc.start()
+    try:
+        timer.start_test()
+        _call(function, args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        timer.stop()
+        tracemalloc.stop()
+
+
+def _measure(timer, load_function, args, test_result):
+    """
+    Completa a medição de um teste que passou
+
+    Repete a chamada ``timing_repeats - 1`` vezes, cada uma com uma função
+    recém-carregada por ``load_function`` e uma cópia dos argumentos
+    originais, e guarda o menor tempo: o mínimo é o valor menos afetado pela
+    carga da máquina. Com ``measure_memory`` faz uma chamada a mais com
+    tracemalloc, fora das medições de tempo. Se o orçamento da submissão
+    acabar, fica o que já foi medido; outros erros do código do usuário
+    sobem como em qualquer chamada.
+    """
+    cpu, wall = test_result['cpu_time'], test_result['wall_time']
+    try:
+        for _ in range(timer.limits['timing_repeats'] - 1):
+            if min(timer.remaining()) < 2 * wall:
+                break
+            _, repeat_cpu, repeat_wall = _timed_call(
+                timer, load_function(), copy.deepcopy(args)
+            )
+            cpu = min(cpu, repeat_cpu)
+            wall = min(wall, repeat_wall)
+        if timer.limits['measure_memory']:
+            test_result['peak_memory'] = _peak_memory(
+                timer, load_function(), copy.deepcopy(args)
+            ) // 1024
+    except TimeoutException:
+        pass
+    test_result['cpu_time'] = round(cpu, 6)
+    test_result['wall_time'] = round(wall, 6)
+
+
+def _check_scaling(timer, load_function, scaling, results):
+    """
+    Teste de escala: mede a função nas entradas geradas e ajusta a curva
+
+    Cada chamada usa uma função recém-carregada por ``load_function``, como
+    em ``_measure``. Cada tamanho vale o menor tempo real entre
+    ``timing_repeats`` chamadas: o relógio de CPU de alguns sistemas avança
+    em tiques de milissegundos, grossos demais para a curva, e o mínimo já
+    descarta as chamadas atrasadas pela carga da máquina. Atualiza
+    ``results`` com ``time_limit`` se o crescimento passar da complexidade
+    esperada.
+    """
+    sizes, times = [], []
+    for size, args in scaling['inputs']:
+        best = None
+        try:
+            for _ in range(max(timer.limits['timing_repeats'], 1)):
+                if best is not None and min(timer.remaining()) < 2 * best:
+                    break
+                _, _, wall = _timed_call(timer, load_function(), copy.deepcopy(args))
+                best = wall if best is None else min(best, wall)
+        except TimeoutException:
+            results.update(time_limit_result(
+                None, f'Tempo limite excedido no teste de escala (n = {size})'
+            ))
+            return
+        except MemoryError:
+            results.update(memory_limit_result(None))
+            results['message'] = f'Limite de memória excedido no teste de escala (n = {size})'
+            return
+        except Exception as e:
+            results['status'] = 'runtime_error'
+            results['message'] = f'Erro no teste de escala (n = {size}): {str(e)}'
+            return
+        sizes.append(size)
+        times.append(best)
+
+    excess = complexity.excess_exponent(sizes, times, scaling['complexity'])
+    results['scaling'] = {
+        'sizes': sizes,
+        'times': [round(t, 6) for t in times],
+        'excess_exponent': None if excess is None else round(excess, 2),
+    }
+    if excess is not None and excess > scaling['tolerance']:
+        growth = complexity.fit_slope(sizes, times)
+        results.update(time_limit_result(None, (
+            f'Solução lenta demais para entradas grandes: esperado '
+            f'{complexity.label(scaling["complexity"])}, o tempo medido cresce '
+            f'como n^{growth:.1f}'
+        )))
+
+
+def time_limit_result(test_number, message=None):
+    """Monta o resultado de uma execução interrompida por tempo limite"""
+    return {
+        'status': 'time_limit',
+        'message': message or f'Tempo limite excedido no teste {test_number}',
+        'failed_test': test_number,
+    }
+
+
+def execute_code(code, test_cases, function_name='solution', limits=None,
+                 on_test_result=None, scaling=None, comparison=None):
     """
     Executa o código do usuário com os casos de teste
     
     Args:
-        code: String com o código Python do usuário
+        code: String com o código Python do usuário ou objeto de código já
+            compilado
         test_cases: Lista de dicionários com 'input_data' e 'expected_output'
+            (JSON) e, opcionalmente, 'args' e 'expected' já decodificados ou
+            'data_file', o arquivo com os dados (ver test_data.py)
         function_name: Nome da função a ser chamada
+        limits: dict com 'time_limit' e 'cpu_time_limit' (por teste) e
+            'total_time_limit' (por submissão), em segundos,
+            'output_limit' (caracteres de saída capturados) e as opções de
+            medição 'timing_repeats' e 'measure_memory'
+        on_test_result: Função chamada com o resultado de cada teste assim
+            que ele termina
+        scaling: Teste de escala (ver scaling.py), executado se todos os
+            testes passarem: dict com 'inputs' (pares tamanho, argumentos),
+            'complexity' e 'tolerance'
+        comparison: Comparador da saída (ver comparators.py): dict com
+            'name' e as opções dele; por padrão, igualdade exata
     
     Returns:
-        dict com status, mensagem e resultados dos testes
+        dict com status, mensagem e resultados dos testes. Cada teste que
+        chegou ao fim traz 'cpu_time' e 'wall_time' (segundos) e, se medido,
+        'peak_memory' (KB); 'cpu_time' do resultado é a soma dos testes.
+        Um teste com resposta errada traz em 'diff' a primeira diferença.
     """
     results = {
         'status': 'accepted',
         'message': 'Todos os testes passaram!',
         'test_results': [],
-        'execution_time': 0
+        'execution_time': 0,
+        'cpu_time': None,
+        'failed_test': None,
+        'output': ''
     }
     
-    start_time = time.time()
+    start_time = time.perf_counter()
+    timer = ExecutionTimer(limits)
+    output = LimitedOutput(timer.limits['output_limit'])
     
     try:
+        compare = comparators.build(comparison)
+        
         # Criar namespace isolado para execução
         namespace = {}
         
         # Redirecionar stdout para capturar prints
         old_stdout = sys.stdout
-        sys.stdout = StringIO()
+        sys.stdout = output
+        timer.install()
         
         try:
             # Executar o código do usuário
-            exec(code, namespace)
+            try:
+                timer.start_module()
+                exec(code, namespace)
+            finally:
+                timer.stop()
             
             # Verificar se a função existe
             if function_name not in namespace:
@@ -56,10 +430,16 @@ def execute_code(code, test_cases, function_name='solution'):
             
             user_function = namespace[function_name]
             
+            def load_function():
+                return _fresh_function(timer, code, function_name)
+            
             # Executar cada caso de teste
             for i, test_case in enumerate(test_cases):
+                # Quando os testes são divididos entre processos, cada caso
+                # traz o seu número original
+                test_number = test_case.get('test_number', i + 1)
                 test_result = {
-                    'test_number': i + 1,
+                    'test_number': test_number,
                     'passed': False,
                     'input': test_case['input_data'],
                     'expected': test_case['expected_output'],
@@ -68,57 +448,115 @@ def execute_code(code, test_cases, function_name='solution'):
                 }
                 
                 try:
-                    # Parse do input (JSON)
-                    input_args = json.loads(test_case['input_data'])
-                    expected_output = json.loads(test_case['expected_output'])
+                    # Parse do input (JSON), a menos que já venha decodificado
+                    # da suíte em cache ou esteja em arquivo
+                    if 'args' in test_case:
+                        input_args = test_case['args']
+                        expected_output = test_case['expected']
+                    elif 'data_file' in test_case:
+                        input_args, expected_output = test_data.read_test_data(
+                            test_case['data_file']
+                        )
+                    else:
+                        input_args = json.loads(test_case['input_data'])
+                        expected_output = json.loads(test_case['expected_output'])
                     
-                    # Executar a função
-                    if isinstance(input_args, list):
-                        actual_output = user_function(*input_args)
-                    elif isinstance(input_args, dict):
-                        actual_output = user_function(**input_args)
+                    # A função pode alterar os argumentos; as repetições e o
+                    # verificador próprio precisam dos originais
+                    if (timer.limits['timing_repeats'] > 1 or timer.limits['measure_memory']
+                            or getattr(compare, 'uses_args', False)):
+                        original_args = copy.deepcopy(input_args)
                     else:
-                        actual_output = user_function(input_args)
+                        original_args = None
+                    
+                    # Executar a função
+                    actual_output, cpu, wall = _timed_call(timer, user_function, input_args)
                     
                     test_result['actual'] = actual_output
+                    test_result['cpu_time'] = round(cpu, 6)
+                    test_result['wall_time'] = round(wall, 6)
                     
                     # Comparar resultado
-                    if actual_output == expected_output:
+                    diff = compare(actual_output, expected_output, original_args)
+                    if diff is None:
+                        _measure(timer, load_function, original_args, test_result)
                         test_result['passed'] = True
                     else:
                         test_result['passed'] = False
+                        test_result['diff'] = diff
+                        # A diferença já aponta o erro: um resultado enorme
+                        # não precisa ir inteiro para o pipe e para o banco
+                        if len(repr(actual_output)) > MAX_ACTUAL_REPR:
+                            test_result['actual'] = comparators.short_repr(
+                                actual_output, MAX_ACTUAL_REPR
+                            )
                         results['status'] = 'wrong_answer'
-                        results['message'] = f'Teste {i + 1} falhou'
+                        results['message'] = f'Teste {test_number} falhou'
                     
+                except TimeoutException:
+                    test_result['error'] = 'Tempo limite excedido'
+                    results.update(time_limit_result(test_number))
+                except MemoryError:
+                    test_result['error'] = 'Limite de memória excedido'
+                    results.update(memory_limit_result(test_number))
                 except json.JSONDecodeError as e:
                     test_result['error'] = f'Erro ao parsear JSON: {str(e)}'
                     results['status'] = 'runtime_error'
                     results['message'] = 'Erro no formato dos dados de teste'
+                except test_data.TestDataError as e:
+                    test_result['error'] = str(e)
+                    results['status'] = 'runtime_error'
+                    results['message'] = 'Erro no formato dos dados de teste'
+                except comparators.CheckerError as e:
+                    test_result['error'] = str(e)
+                    results['status'] = 'runtime_error'
+                    results['message'] = f'Erro no verificador do desafio no teste {test_number}'
                 except Exception as e:
                     test_result['error'] = str(e)
                     results['status'] = 'runtime_error'
-                    results['message'] = f'Erro no teste {i + 1}: {str(e)}'
+                    results['message'] = f'Erro no teste {test_number}: {str(e)}'
                 
                 results['test_results'].append(test_result)
+                if on_test_result is not None:
+                    on_test_result(test_result)
                 
                 # Se um teste falhou, parar
                 if not test_result['passed']:
+                    results['failed_test'] = test_number
                     break
+            
+            if scaling and results['status'] == 'accepted':
+                _check_scaling(timer, load_function, scaling, results)
         
         finally:
-            # Restaurar stdout
+            # Restaurar stdout e os handlers de sinais
+            timer.uninstall()
             sys.stdout = old_stdout
     
+    except TimeoutException:
+        results.update(time_limit_result(
+            None, 'Tempo limite excedido ao carregar o código'
+        ))
+    
+    except MemoryError:
+        results.update(memory_limit_result(None))
+    
     except SyntaxError as e:
         results['status'] = 'runtime_error'
         results['message'] = f'Erro de sintaxe: {str(e)}'
     
+    except comparators.CheckerError as e:
+        results['status'] = 'runtime_error'
+        results['message'] = f'Erro no verificador do desafio: {str(e)}'
+    
     except Exception as e:
         results['status'] = 'runtime_error'
         results['message'] = f'Erro durante execução: {str(e)}\n{traceback.format_exc()}'
     
-    end_time = time.time()
+    end_time = time.perf_counter()
     results['execution_time'] = round(end_time - start_time, 3)
+    results['cpu_time'] = total_cpu_time(results['test_results'])
+    results['output'] = output.getvalue()
     
     return results
 
@@ -0,0 +1,213 @@
+"""
+Comparadores da saída do usuário com a saída esperada.
+
+Cada desafio escolhe um comparador (``Challenge.comparator``):
+
+- ``exact``: igualdade do Python, como antes;
+- ``float``: números comparados com tolerância (``float_tolerance``);
+- ``unordered``: a lista de resposta pode vir em qualquer ordem;
+- ``unordered_nested``: a ordem não importa em nenhum nível de listas;
+- ``custom``: função ``check(actual, expected, args)`` escrita pelo autor do
+  desafio, que retorna um booleano ou uma tupla (booleano, mensagem).
+
+Todos percorrem a saída uma vez (multiconjuntos com ``Counter``, sem
+ordenar), param na primeira diferença e a descrevem de forma curta, com o
+caminho até ela, em vez de repetir o valor inteiro. Outros comparadores
+podem ser adicionados com ``register``.
+
+Não depende do Django: roda no processo filho do sandbox.
+"""
+import math
+import operator
+from collections import Counter
+
+
+DEFAULT_TOLERANCE = 1e-6
+
+# Tamanho máximo de um valor citado na descrição da diferença
+MAX_REPR = 80
+
+COMPARATOR_CHOICES = [
+    ('exact', 'Exata'),
+    ('float', 'Números com tolerância'),
+    ('unordered', 'Lista em qualquer ordem'),
+    ('unordered_nested', 'Listas aninhadas em qualquer ordem'),
+    ('custom', 'Verificador próprio'),
+]
+
+
+class CheckerError(Exception):
+    """Erro no verificador escrito pelo autor do desafio"""
+    pass
+
+
+def short_repr(value, limit=MAX_REPR):
+    """``repr`` truncado em ``limit`` caracteres"""
+    text = repr(value)
+    if len(text) > limit:
+        text = text[:limit - 3] + '...'
+    return text
+
+
+def _path(path):
+    return ''.join(f'[{key!r}]' for key in path) or 'resultado'
+
+
+def _mismatch(path, expected, actual):
+    return f'{_path(path)}: esperado {short_repr(expected)}, obtido {short_repr(actual)}'
+
+
+def _walk(actual, expected, equal):
+    """
+    Percorre as duas estruturas juntas
+
+    Returns:
+        Descrição da primeira diferença, ou None se ``equal`` aceitar todas
+        as folhas
+    """
+    stack = [((), actual, expected)]
+    while stack:
+        path, a, e = stack.pop()
+        if isinstance(e, (list, tuple)) and isinstance(a, (list, tuple)):
+            if len(a) != len(e):
+                return f'{_path(path)}: esperado {len(e)} elementos, obtido {len(a)}'
+            # Ao contrário, para o índice 0 sair primeiro da pilha
+            stack.extend((path + (i,), a[i], e[i]) for i in range(len(e) - 1, -1, -1))
+        elif isinstance(e, dict) and isinstance(a, dict):
+            missing = [key for key in e if key not in a]
+            if missing:
+                return f'{_path(path)}: falta a chave {short_repr(missing[0])}'
+            if len(a) != len(e):
+                extra = next(key for key in a if key not in e)
+                return f'{_path(path)}: chave inesperada {short_repr(extra)}'
+            stack.extend((path + (key,), a[key], e[key]) for key in reversed(list(e)))
+        elif not equal(a, e):
+            return _mismatch(path, e, a)
+    return None
+
+
+def exact(actual, expected, args=None):
+    # A igualdade nativa resolve o caso comum; o percurso só localiza a diferença
+    if actual == expected:
+        return None
+    # Sem diferença nas folhas, o que muda é o tipo (ex.: tupla e lista)
+    return _walk(actual, expected, operator.eq) or _mismatch((), expected, actual)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def float_comparator(tolerance=DEFAULT_TOLERANCE):
+    """Comparador com tolerância absoluta e relativa nos números"""
+    def equal(a, e):
+        if _is_number(a) and _is_number(e):
+            return math.isclose(a, e, rel_tol=tolerance, abs_tol=tolerance)
+        return a == e
+
+    def compare(actual, expected, args=None):
+        return _walk(actual, expected, equal)
+    return compare
+
+
+def _freeze(value):
+    """Versão imutável (e hashable) de um valor JSON"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return frozenset((key, _freeze(item)) for key, item in value.items())
+    return value
+
+
+def _freeze_unordered(value):
+    """Como ``_freeze``, mas listas viram multiconjuntos em todos os níveis"""
+    if isinstance(value, (list, tuple)):
+        return frozenset(Counter(_freeze_unordered(item) for item in value).items())
+    if isinstance(value, dict):
+        return frozenset((key, _freeze_unordered(item)) for key, item in value.items())
+    return value
+
+
+def _multiset_comparator(key):
+    def compare(actual, expected, args=None):
+        if not isinstance(actual, (list, tuple)):
+            return _mismatch((), expected, actual)
+        if len(actual) != len(expected):
+            return f'resultado: esperado {len(expected)} elementos, obtido {len(actual)}'
+        try:
+            counts = Counter(key(item) for item in actual)
+        except TypeError:
+            return 'resultado: contém valores que não podem ser comparados'
+        for index, item in enumerate(expected):
+            frozen = key(item)
+            if counts[frozen] <= 0:
+                return f'[{index}]: {short_repr(item)} não aparece na resposta'
+            counts[frozen] -= 1
+        return None
+    return compare
+
+
+def custom_comparator(checker_code):
+    """
+    Comparador que chama ``check(actual, expected, args)`` do desafio
+
+    Raises:
+        CheckerError: se o código não compilar ou não definir ``check``
+    """
+    namespace = {}
+    try:
+        exec(compile(checker_code, '<checker>', 'exec'), namespace)
+        check = namespace['check']
+    except Exception as e:
+        raise CheckerError(f'Verificador inválido: {e}') from e
+
+    def compare(actual, expected, args=None):
+        try:
+            verdict = check(actual, expected, args)
+        except Exception as e:
+            raise CheckerError(f'Erro no verificador: {e}') from e
+        message = None
+        if isinstance(verdict, tuple):
+            verdict, message = verdict
+        if verdict:
+            return None
+        return message or _mismatch((), expected, actual)
+
+    # O executor guarda uma cópia dos argumentos antes da chamada
+    compare.uses_args = True
+    return compare
+
+
+_registry = {
+    'exact': lambda options: exact,
+    'float': lambda options: float_comparator(options.get('tolerance') or DEFAULT_TOLERANCE),
+    'unordered': lambda options: _multiset_comparator(_freeze),
+    'unordered_nested': lambda options: _multiset_comparator(_freeze_unordered),
+    'custom': lambda options: custom_comparator(options.get('checker', '')),
+}
+
+
+def register(name, factory):
+    """
+    Registra um comparador
+
+    Args:
+        name: Nome usado em ``Challenge.comparator``
+        factory: Função que recebe as opções do desafio e retorna
+            ``compare(actual, expected, args)``, que devolve None quando a
+            saída está correta ou a descrição da primeira diferença
+    """
+    _registry[name] = factory
+
+
+def build(comparison=None):
+    """
+    Cria o comparador descrito por ``comparison`` (ver
+    ``Challenge.get_comparison``); sem ele, a comparação exata
+
+    Raises:
+        CheckerError: se o verificador próprio for inválido
+        KeyError: se o comparador não estiver registrado
+    """
+    comparison = comparison or {}
+    return _registry[comparison.get('name') or 'exact'](comparison)
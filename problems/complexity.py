@@ -0,0 +1,78 @@
+"""
+Classes de complexidade e ajuste da curva de crescimento do tempo.
+
+Usado pelo teste de escala (ver scaling.py): o tempo medido em cada tamanho
+de entrada é dividido pelo crescimento esperado e a inclinação da reta
+log-log que sobra é o expoente excedente. Uma solução dentro da classe
+declarada fica perto de 0 (ou abaixo, se for mais rápida); uma O(n²) em um
+desafio O(n log n) fica perto de 1.
+
+Não depende do Django: roda no processo filho do sandbox.
+"""
+import math
+
+
+COMPLEXITY_CHOICES = [
+    ('1', 'O(1)'),
+    ('log n', 'O(log n)'),
+    ('n', 'O(n)'),
+    ('n log n', 'O(n log n)'),
+    ('n^2', 'O(n²)'),
+    ('n^3', 'O(n³)'),
+]
+
+_GROWTH = {
+    '1': lambda n: 1.0,
+    'log n': lambda n: math.log2(n),
+    'n': lambda n: float(n),
+    'n log n': lambda n: n * math.log2(n),
+    'n^2': lambda n: float(n) ** 2,
+    'n^3': lambda n: float(n) ** 3,
+}
+
+# Expoente excedente tolerado antes de rejeitar
+DEFAULT_TOLERANCE = 0.5
+
+# Tempos menores que isso (segundos) não entram no ajuste
+MIN_MEASURABLE_TIME = 0.001
+
+
+def label(complexity):
+    """Nome da classe para mensagens, ex.: 'O(n log n)'"""
+    return dict(COMPLEXITY_CHOICES).get(complexity, complexity)
+
+
+def growth(complexity, n):
+    """Crescimento esperado da classe em uma entrada de tamanho ``n``"""
+    return _GROWTH[complexity](max(n, 2))
+
+
+def fit_slope(sizes, values):
+    """Inclinação da reta de mínimos quadrados de log(valor) por log(tamanho)"""
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(max(v, 1e-9)) for v in values]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if not spread:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def excess_exponent(sizes, times, complexity):
+    """
+    Quanto o tempo cresce além da classe declarada, como expoente de n
+
+    Returns:
+        Expoente excedente, ou None se os tempos forem pequenos demais para
+        uma medição confiável
+    """
+    # Pontos abaixo da resolução só acrescentariam ruído
+    points = [(n, t) for n, t in zip(sizes, times) if t >= MIN_MEASURABLE_TIME]
+    if len(points) < 2:
+        return None
+    sizes, times = zip(*points)
+    # Relativo ao menor tamanho, para não depender da escala dos números
+    base = growth(complexity, sizes[0])
+    normalized = [t * base / growth(complexity, n) for n, t in zip(sizes, times)]
+    return fit_slope(sizes, normalized)
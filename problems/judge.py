@@ -0,0 +1,276 @@
+"""
+Fila de avaliação de submissões.
+
+A própria tabela de submissões funciona como fila: ``submit_code`` cria a
+submissão com status ``pending`` e retorna imediatamente. Os workers
+(``manage.py run_judge_workers``) reivindicam a submissão pendente mais
+antiga, executam os testes no sandbox e gravam o resultado.
+
+A reivindicação usa ``SELECT ... FOR UPDATE SKIP LOCKED`` quando o banco
+suporta e, em todo caso, um ``UPDATE`` condicional no status, de forma que
+dois workers nunca avaliam a mesma submissão.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import runtimes, scaling, stats, verdict_cache
+from .models import Submission, UserProfile
+from .sandbox import run_in_sandbox
+from .test_suites import get_test_suite
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_STALE_AFTER = 300
+
+# Quantas vezes tentar reivindicar antes de desistir nesta rodada
+CLAIM_ATTEMPTS = 5
+
+# Intervalo mínimo (segundos) entre gravações do progresso parcial
+PROGRESS_FLUSH_INTERVAL = 0.25
+
+DEFAULT_TIMING_REPEATS = 1
+
+
+def measurement_options():
+    """Opções de medição das submissões (repetições e pico de memória)"""
+    return {
+        'timing_repeats': getattr(settings, 'JUDGE_TIMING_REPEATS', DEFAULT_TIMING_REPEATS),
+        'measure_memory': getattr(settings, 'JUDGE_MEASURE_MEMORY', False),
+    }
+
+
+def enqueue_submission(user, challenge, code):
+    """Cria uma submissão pendente e contabiliza no perfil do usuário"""
+    with transaction.atomic():
+        submission = Submission.objects.create(
+            user=user,
+            challenge=challenge,
+            code=code,
+            status='pending'
+        )
+
+        # UPDATE com F() para não sobrescrever os outros contadores do perfil
+        UserProfile.objects.filter(user=user).update(
+            total_submissions=F('total_submissions') + 1
+        )
+
+    return submission
+
+
+def claim_next_submission():
+    """
+    Reivindica a submissão pendente mais antiga
+
+    Returns:
+        A submissão, já marcada como ``running``, ou None se a fila está vazia
+    """
+    for _ in range(CLAIM_ATTEMPTS):
+        with transaction.atomic():
+            candidate = (
+                Submission.objects
+                .select_for_update(skip_locked=True)
+                .filter(status='pending')
+                .order_by('submitted_at', 'id')
+                .values_list('id', flat=True)
+                .first()
+            )
+            if candidate is None:
+                return None
+
+            claimed = Submission.objects.filter(
+                id=candidate,
+                status='pending'
+            ).update(status='running', started_at=timezone.now())
+
+        if claimed:
+            return (
+                Submission.objects
+                .select_related('challenge', 'user', 'code_blob')
+                .get(id=candidate)
+            )
+
+    return None
+
+
+class ProgressRecorder:
+    """
+    Grava no banco os resultados parciais de uma submissão em avaliação
+
+    É o que permite ao endpoint de eventos transmitir o progresso teste a
+    teste. As gravações são espaçadas por ``PROGRESS_FLUSH_INTERVAL`` para
+    não gerar um UPDATE por teste em suítes grandes.
+    """
+
+    def __init__(self, submission, on_test_result=None):
+        self.submission = submission
+        self.on_test_result = on_test_result
+        self.test_results = []
+        self.last_flush = time.monotonic()
+
+    def __call__(self, test_result):
+        self.test_results.append(test_result)
+        if self.on_test_result is not None:
+            self.on_test_result(test_result)
+        if time.monotonic() - self.last_flush >= PROGRESS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        Submission.objects.filter(id=self.submission.id).update(
+            test_results=self.test_results
+        )
+        self.last_flush = time.monotonic()
+
+
+def judge_submission(submission, on_test_result=None):
+    """
+    Executa todos os casos de teste de uma submissão e grava o resultado
+
+    Args:
+        submission: Submissão a ser avaliada
+        on_test_result: Função chamada com o resultado de cada teste
+
+    Returns:
+        dict com o resultado retornado pelo executor
+    """
+    challenge = submission.challenge
+    suite = get_test_suite(challenge)
+    test_cases = suite.cases
+
+    if test_cases:
+        code = submission.code
+        # Código idêntico já avaliado contra a mesma suíte não roda de novo
+        code_digest = verdict_cache.code_hash(code)
+        version = suite.version
+        result = verdict_cache.lookup(challenge, code_digest, version)
+        submission.cache_hit = result is not None
+
+        if result is None:
+            result = run_in_sandbox(
+                code,
+                test_cases,
+                challenge.function_name,
+                limits=dict(challenge.get_execution_limits(), **measurement_options()),
+                on_test_result=ProgressRecorder(submission, on_test_result),
+                shards=challenge.parallel_shards,
+                scaling=scaling.get_scaling_job(challenge),
+                comparison=challenge.get_comparison()
+            )
+            verdict_cache.store(challenge, code_digest, version, result)
+    else:
+        result = {
+            'status': 'runtime_error',
+            'message': 'Nenhum caso de teste disponível',
+            'test_results': [],
+            'execution_time': 0
+        }
+
+    submission.status = result['status']
+    submission.result_message = result['message']
+    submission.execution_time = result['execution_time']
+    submission.cpu_time = result.get('cpu_time')
+    submission.failed_test = result.get('failed_test')
+    submission.test_results = result.get('test_results', [])
+    submission.finished_at = timezone.now()
+
+    # Veredito e contadores gravados juntos: ou tudo ou nada
+    with transaction.atomic():
+        submission.save(update_fields=[
+            'status', 'result_message', 'execution_time', 'cpu_time', 'failed_test',
+            'test_results', 'finished_at', 'cache_hit'
+        ])
+
+        # Se foi aceito e é a primeira vez que resolve este desafio
+        first_accept = False
+        if result['status'] == 'accepted':
+            first_accept = stats.record_accept(submission)
+            runtime = runtimes.ranking_time(submission)
+            if runtime is not None:
+                runtimes.record_runtime(challenge.id, runtime)
+
+        stats.record_verdict(challenge, result['status'], first_accept)
+
+    return result
+
+
+def recover_stale_submissions(stale_after=None):
+    """
+    Devolve à fila submissões presas em ``running``
+
+    Isso acontece quando um worker morre no meio de uma avaliação.
+
+    Returns:
+        Número de submissões devolvidas à fila
+    """
+    if stale_after is None:
+        stale_after = getattr(settings, 'JUDGE_STALE_AFTER', DEFAULT_STALE_AFTER)
+    limit = timezone.now() - timedelta(seconds=stale_after)
+    return Submission.objects.filter(
+        status='running',
+        started_at__lt=limit
+    ).update(status='pending', started_at=None)
+
+
+def process_next_submission():
+    """
+    Reivindica e avalia uma submissão
+
+    Returns:
+        True se uma submissão foi processada, False se a fila estava vazia
+    """
+    submission = claim_next_submission()
+    if submission is None:
+        return False
+
+    try:
+        judge_submission(submission)
+    except Exception:
+        logger.exception('Erro ao avaliar a submissão %s', submission.id)
+        Submission.objects.filter(id=submission.id).update(
+            status='runtime_error',
+            result_message='Erro interno ao avaliar a submissão',
+            finished_at=timezone.now()
+        )
+    return True
+
+
+def _refresh_connections():
+    """Descarta conexões quebradas ou expiradas entre um job e outro"""
+    # Dentro de uma transação (ex.: nos testes) a conexão não pode ser fechada
+    if not connection.in_atomic_block:
+        close_old_connections()
+
+
+def run_worker(stop_event=None, poll_interval=None, once=False):
+    """
+    Loop de um worker: processa submissões até ``stop_event`` ser acionado
+
+    Args:
+        stop_event: threading.Event que encerra o loop
+        poll_interval: Espera (segundos) quando a fila está vazia
+        once: Se True, encerra assim que a fila esvaziar
+    """
+    if stop_event is None:
+        stop_event = threading.Event()
+    if poll_interval is None:
+        poll_interval = getattr(settings, 'JUDGE_POLL_INTERVAL', DEFAULT_POLL_INTERVAL)
+
+    while not stop_event.is_set():
+        _refresh_connections()
+        processed = process_next_submission()
+        if not processed:
+            if once:
+                break
+            # Aproveita a fila vazia para resgatar avaliações abandonadas
+            recover_stale_submissions()
+            stop_event.wait(poll_interval)
+
+    _refresh_connections()
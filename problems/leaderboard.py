@@ -0,0 +1,185 @@
+"""
+Ranking de usuários.
+
+``LeaderboardEntry`` guarda a pontuação de cada usuário e é atualizado de
+forma incremental no primeiro aceite de cada desafio, nunca recalculado com
+GROUP BY ao abrir a página. A pontuação soma os pontos da dificuldade dos
+desafios resolvidos; no empate fica à frente quem chegou antes a ela.
+
+``LeaderboardScore`` conta quantos usuários têm cada pontuação. A posição de
+um usuário é 1 + os usuários das pontuações acima (soma sobre as pontuações
+distintas, que são poucas) + os empatados que chegaram antes (faixa do
+índice ``leaderboard_rank_idx``). As páginas do ranking usam paginação por
+chave sobre o mesmo índice.
+"""
+from collections import namedtuple
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Sum, Value, When
+
+from .models import LeaderboardEntry, LeaderboardScore, UserSolved
+from .pagination import InvalidCursor, Page, decode_key, encode_key
+
+
+DIFFICULTY_POINTS = {
+    'easy': 1,
+    'medium': 2,
+    'hard': 3,
+}
+
+DEFAULT_PAGE_SIZE = 50
+
+RankedEntry = namedtuple('RankedEntry', ['rank', 'entry'])
+
+
+def points_for(difficulty):
+    """Pontos de um desafio de acordo com a dificuldade"""
+    return DIFFICULTY_POINTS.get(difficulty, 1)
+
+
+def _move_score(old_score, new_score):
+    """
+    Transfere um usuário de uma pontuação para outra nos contadores
+
+    Pontuações que ficam sem usuários continuam na tabela, com zero: se a
+    linha fosse apagada, o incremento de outra transação que já a tinha
+    encontrado não atualizaria nada e o usuário sumiria da contagem.
+    """
+    if old_score:
+        LeaderboardScore.objects.filter(score=old_score).update(users=F('users') - 1)
+    LeaderboardScore.objects.get_or_create(score=new_score)
+    LeaderboardScore.objects.filter(score=new_score).update(users=F('users') + 1)
+
+
+def record_first_accept(user_id, difficulty, accepted_at):
+    """Soma ao ranking um desafio resolvido pela primeira vez"""
+    with transaction.atomic():
+        LeaderboardEntry.objects.get_or_create(
+            user_id=user_id,
+            defaults={'last_accept_at': accepted_at}
+        )
+        # Trava a linha: aceites simultâneos do mesmo usuário somam em sequência
+        entry = LeaderboardEntry.objects.select_for_update().get(user_id=user_id)
+        old_score = entry.score
+        entry.score += points_for(difficulty)
+        entry.solved_count += 1
+        entry.last_accept_at = accepted_at
+        entry.save(update_fields=['score', 'solved_count', 'last_accept_at'])
+        _move_score(old_score, entry.score)
+    return entry
+
+
+def _ahead_of(entry):
+    """Filtro dos empatados com ``entry`` que ficam à frente dele"""
+    return Q(score=entry.score) & (
+        Q(last_accept_at__lt=entry.last_accept_at) |
+        Q(last_accept_at=entry.last_accept_at, user_id__lt=entry.user_id)
+    )
+
+
+def get_rank(entry):
+    """Posição de uma entrada do ranking (1 = primeiro)"""
+    above = LeaderboardScore.objects.filter(
+        score__gt=entry.score
+    ).aggregate(total=Sum('users'))['total'] or 0
+    tied_ahead = LeaderboardEntry.objects.filter(_ahead_of(entry)).count()
+    return above + tied_ahead + 1
+
+
+def get_user_rank(user):
+    """
+    Posição do usuário no ranking
+
+    Returns:
+        RankedEntry, ou None se o usuário ainda não resolveu nenhum desafio
+    """
+    if not user.is_authenticated:
+        return None
+    entry = LeaderboardEntry.objects.filter(user=user, score__gt=0).first()
+    if entry is None:
+        return None
+    return RankedEntry(get_rank(entry), entry)
+
+
+def _encode(entry, rank):
+    return encode_key([entry.score, entry.last_accept_at.isoformat(), entry.user_id, rank])
+
+
+def _decode(cursor):
+    try:
+        score, last_accept_at, user_id, rank = decode_key(cursor)
+        return int(score), datetime.fromisoformat(last_accept_at), int(user_id), int(rank)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Cursor inválido') from e
+
+
+def leaderboard_page(cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Uma página do ranking
+
+    Returns:
+        Page cujos itens são RankedEntry
+
+    Raises:
+        InvalidCursor: se o cursor estiver malformado
+    """
+    entries = LeaderboardEntry.objects.filter(score__gt=0).select_related('user')
+    rank = 1
+    if cursor:
+        score, last_accept_at, user_id, rank = _decode(cursor)
+        entries = entries.filter(
+            Q(score__lt=score) |
+            Q(score=score, last_accept_at__gt=last_accept_at) |
+            Q(score=score, last_accept_at=last_accept_at, user_id__gt=user_id)
+        )
+        rank += 1
+
+    rows = list(entries.order_by('-score', 'last_accept_at', 'user_id')[:page_size + 1])
+    items = [RankedEntry(rank + i, entry) for i, entry in enumerate(rows[:page_size])]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = items[-1]
+        next_cursor = _encode(last.entry, last.rank)
+    return Page(items, next_cursor)
+
+
+def rebuild_leaderboard():
+    """
+    Recalcula o ranking inteiro a partir de ``UserSolved``
+
+    Necessário, por exemplo, depois de mudar a dificuldade de um desafio.
+
+    Returns:
+        Número de usuários no ranking
+    """
+    points = Case(
+        *[When(challenge__difficulty=difficulty, then=Value(value))
+          for difficulty, value in DIFFICULTY_POINTS.items()],
+        default=Value(1),
+        output_field=IntegerField()
+    )
+    rows = (
+        UserSolved.objects
+        .values('user_id')
+        .annotate(
+            score=Sum(points),
+            solved_count=Count('id'),
+            last_accept_at=Max('first_accepted_at')
+        )
+        .order_by()
+    )
+    entries = [LeaderboardEntry(**row) for row in rows]
+
+    scores = {}
+    for entry in entries:
+        scores[entry.score] = scores.get(entry.score, 0) + 1
+
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardScore.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+        LeaderboardScore.objects.bulk_create(
+            [LeaderboardScore(score=score, users=users) for score, users in scores.items()]
+        )
+    return len(entries)
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from problems.archive import (
+    DEFAULT_ARCHIVE_AFTER_DAYS,
+    DEFAULT_BATCH_SIZE,
+    archivable_submissions,
+    archive_submissions,
+)
+
+
+class Command(BaseCommand):
+    help = 'Move a mensagem e os resultados dos testes das submissões antigas para o arquivo compactado'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=getattr(settings, 'ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS),
+            help='Idade mínima (dias) das submissões arquivadas'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Submissões arquivadas por transação'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Máximo de submissões arquivadas nesta execução'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas conta as submissões que seriam arquivadas'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            before = timezone.now() - timedelta(days=options['older_than'])
+            count = archivable_submissions(before).count()
+            self.stdout.write(f'{count} submissão(ões) seriam arquivadas')
+            return
+
+        archived = archive_submissions(
+            older_than_days=options['older_than'],
+            batch_size=max(1, options['batch_size']),
+            limit=options['limit']
+        )
+        self.stdout.write(self.style.SUCCESS(f'{archived} submissão(ões) arquivada(s)'))
@@ -0,0 +1,274 @@
+import copy
+import json
+import multiprocessing
+import platform
+import sys
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from problems.code_executor import COMPILE_ERRORS, execute_code
+from problems.models import Challenge
+from problems.sandbox import SandboxPool, compile_code
+from problems.test_suites import get_test_suite
+
+
+MODES = ('inline', 'sandbox', 'parallel')
+
+# Submissões reproduzidas contra os desafios de create_sample_problems:
+# (slug, tipo, código)
+CORPUS = [
+    ('soma-de-dois-numeros', 'accepted', 'def solution(a, b):\n    return a + b'),
+    ('soma-de-dois-numeros', 'wrong', 'def solution(a, b):\n    return a - b'),
+    ('soma-de-dois-numeros', 'error', 'def solution(a, b):\n    return a + undefined'),
+    ('numero-par-ou-impar', 'accepted', 'def solution(n):\n    return n % 2 == 0'),
+    ('numero-par-ou-impar', 'wrong', 'def solution(n):\n    return n % 2 == 1'),
+    ('inverter-string', 'accepted', 'def solution(s):\n    return s[::-1]'),
+    ('inverter-string', 'error', 'def solution(s)\n    return s[::-1]'),
+    ('fatorial', 'accepted', '''def solution(n):
+    result = 1
+    for i in range(2, n + 1):
+        result *= i
+    return result'''),
+    ('fatorial', 'slow', '''def solution(n):
+    # Recalcula o fatorial várias vezes antes de responder
+    for _ in range(2000):
+        result = 1
+        for i in range(2, n + 1):
+            result *= i
+    return result'''),
+    ('palindromo', 'accepted', '''def solution(s):
+    s = s.replace(' ', '').lower()
+    return s == s[::-1]'''),
+    ('palindromo', 'error', 'def solution(s):\n    raise ValueError(s)'),
+    ('fibonacci', 'accepted', '''def solution(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a'''),
+    ('fibonacci', 'slow', '''def solution(n):
+    if n < 2:
+        return n
+    return solution(n - 1) + solution(n - 2)'''),
+    ('maior-elemento-lista', 'accepted', 'def solution(nums):\n    return max(nums)'),
+    ('maior-elemento-lista', 'wrong', 'def solution(nums):\n    return nums[0]'),
+    ('ordenar-lista-sem-sort', 'accepted', '''def solution(nums):
+    nums = list(nums)
+    for i in range(1, len(nums)):
+        j = i
+        while j > 0 and nums[j - 1] > nums[j]:
+            nums[j - 1], nums[j] = nums[j], nums[j - 1]
+            j -= 1
+    return nums'''),
+    ('ordenar-lista-sem-sort', 'wrong', 'def solution(nums):\n    return nums'),
+]
+
+
+def percentile(values, percent):
+    """Percentil pelo método nearest-rank"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def peak_rss_kb(who):
+    """Pico de memória residente (KB) do processo ou dos filhos já encerrados"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(who).ru_maxrss
+    # No macOS ru_maxrss vem em bytes
+    if sys.platform == 'darwin':
+        usage //= 1024
+    return usage
+
+
+class Command(BaseCommand):
+    help = 'Mede latência e vazão do avaliador reproduzindo um corpus de submissões'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modes',
+            nargs='+',
+            choices=MODES,
+            default=list(MODES),
+            help='Modos de execução medidos'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Quantas vezes o corpus é reproduzido em cada modo'
+        )
+        parser.add_argument(
+            '--pool-size',
+            type=int,
+            default=2,
+            help='Processos do pool nos modos sandbox e parallel'
+        )
+        parser.add_argument(
+            '--shards',
+            type=int,
+            default=2,
+            help='Partes da suíte no modo parallel'
+        )
+        parser.add_argument(
+            '--output',
+            help='Arquivo onde gravar o relatório em JSON'
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat deve ser pelo menos 1')
+
+        corpus = self._load_corpus()
+        report = {
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'corpus_size': len(corpus),
+            'repeat': options['repeat'],
+            'modes': {},
+        }
+
+        for mode in options['modes']:
+            self.stdout.write(f'Medindo modo {mode}...')
+            report['modes'][mode] = self._bench_isolated(mode, corpus, options)
+            self._print_summary(mode, report['modes'][mode])
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f'Relatório gravado em {options["output"]}'))
+
+    def _load_corpus(self):
+        """Associa cada submissão do corpus à suíte de testes do desafio"""
+        slugs = {slug for slug, _, _ in CORPUS}
+        challenges = Challenge.objects.in_bulk(slugs, field_name='slug')
+        if len(challenges) < len(slugs):
+            call_command('create_sample_problems', stdout=self.stdout)
+            challenges = Challenge.objects.in_bulk(slugs, field_name='slug')
+
+        corpus = []
+        for slug, kind, code in CORPUS:
+            challenge = challenges[slug]
+            corpus.append({
+                'kind': kind,
+                'code': code,
+                'test_cases': get_test_suite(challenge).cases,
+                'function_name': challenge.function_name,
+                'limits': challenge.get_execution_limits(),
+            })
+        return corpus
+
+    def _bench_isolated(self, mode, corpus, options):
+        """
+        Mede um modo em um processo próprio
+
+        ``ru_maxrss`` é o pico desde o início do processo: medidos no mesmo
+        processo, os modos seguintes herdariam o pico dos anteriores. Sem
+        ``fork`` o modo roda aqui mesmo e o pico de memória fica de fora.
+        """
+        if resource is None or 'fork' not in multiprocessing.get_all_start_methods():
+            return dict(self._bench_mode(mode, corpus, options),
+                        peak_rss_kb=None, children_peak_rss_kb=None)
+
+        context = multiprocessing.get_context('fork')
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=self._bench_child, args=(sender, mode, corpus, options)
+        )
+        process.start()
+        sender.close()
+        try:
+            kind, payload = receiver.recv()
+        except EOFError:
+            kind, payload = 'error', f'processo encerrado com código {process.exitcode}'
+        finally:
+            process.join()
+            receiver.close()
+        if kind == 'error':
+            raise CommandError(f'Falha ao medir o modo {mode}: {payload}')
+        return payload
+
+    def _bench_child(self, conn, mode, corpus, options):
+        try:
+            stats = self._bench_mode(mode, corpus, options)
+            # Picos só deste modo; os filhos incluem os processos do pool
+            stats['peak_rss_kb'] = peak_rss_kb(resource.RUSAGE_SELF)
+            stats['children_peak_rss_kb'] = peak_rss_kb(resource.RUSAGE_CHILDREN)
+            conn.send(('done', stats))
+        except Exception:
+            conn.send(('error', traceback.format_exc()))
+        finally:
+            conn.close()
+
+    def _bench_mode(self, mode, corpus, options):
+        """Reproduz o corpus em um modo e resume as medições"""
+        pool = None
+        if mode != 'inline':
+            pool = SandboxPool(size=max(1, options['pool_size']))
+
+        latencies = []
+        statuses = {}
+        try:
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                for entry in corpus:
+                    begin = time.perf_counter()
+                    result = self._execute(mode, pool, entry, options['shards'])
+                    latencies.append(time.perf_counter() - begin)
+                    statuses[result['status']] = statuses.get(result['status'], 0) + 1
+            elapsed = time.perf_counter() - started
+        finally:
+            if pool is not None:
+                pool.close()
+
+        return {
+            'submissions': len(latencies),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+            'submissions_per_second': round(len(latencies) / elapsed, 2) if elapsed else None,
+            'statuses': statuses,
+        }
+
+    def _execute(self, mode, pool, entry, shards):
+        if mode == 'inline':
+            try:
+                code = compile_code(entry['code']).code_object
+            except COMPILE_ERRORS:
+                code = entry['code']
+            return execute_code(
+                code,
+                copy.deepcopy(entry['test_cases']),
+                entry['function_name'],
+                limits=entry['limits']
+            )
+        if mode == 'sandbox':
+            return pool.execute(
+                entry['code'], entry['test_cases'], entry['function_name'],
+                limits=entry['limits']
+            )
+        return pool.execute_parallel(
+            entry['code'], entry['test_cases'], entry['function_name'],
+            shards=shards, limits=entry['limits']
+        )
+
+    def _print_summary(self, mode, stats):
+        self.stdout.write(
+            f'  {mode}: {stats["submissions"]} submissões, '
+            f'p50 {stats["p50_ms"]} ms, p95 {stats["p95_ms"]} ms, p99 {stats["p99_ms"]} ms, '
+            f'{stats["submissions_per_second"]} submissões/s, '
+            f'pico de RSS {stats["peak_rss_kb"]} KB'
+        )
@@ -34,20 +34,20 @@ Escreva uma função que recebe dois parâmetros (a e b) e retorna a + b.''',
                 description='2 + 3 = 5'
             )
             TestCase.objects.create(
-                problem=problem1,
+                challenge=challenge1,
                 input_data=json.dumps([10, 20]),
                 expected_output=json.dumps(30),
                 is_sample=True,
                 description='10 + 20 = 30'
             )
             TestCase.objects.create(
-                problem=problem1,
+                challenge=challenge1,
                 input_data=json.dumps([-5, 5]),
                 expected_output=json.dumps(0),
                 is_sample=False
             )
             TestCase.objects.create(
-                problem=problem1,
+                challenge=challenge1,
                 input_data=json.dumps([100, 200]),
                 expected_output=json.dumps(300),
                 is_sample=False
@@ -0,0 +1,77 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Length
+
+from problems.models import TestCase
+from problems.test_data import file_digest
+
+
+DEFAULT_INLINE_LIMIT = 64 * 1024
+
+
+class Command(BaseCommand):
+    help = 'Move os casos de teste grandes do banco para arquivos (ver problems/test_data.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-size',
+            type=int,
+            default=getattr(settings, 'TEST_DATA_INLINE_LIMIT', DEFAULT_INLINE_LIMIT),
+            help='Tamanho mínimo (caracteres de entrada e saída) dos casos movidos'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas conta os casos que seriam movidos'
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Confere o SHA-256 dos arquivos já gravados em vez de mover casos'
+        )
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            self._verify()
+            return
+
+        test_cases = TestCase.objects.filter(data_file='').annotate(
+            size=Length('input_data') + Length('expected_output')
+        ).filter(size__gte=options['min_size'])
+
+        if options['dry_run']:
+            self.stdout.write(f'{test_cases.count()} caso(s) de teste seriam movidos')
+            return
+
+        moved = 0
+        for test_case in test_cases.iterator():
+            try:
+                args = json.loads(test_case.input_data)
+                expected = json.loads(test_case.expected_output)
+            except json.JSONDecodeError:
+                self.stderr.write(f'Caso de teste {test_case.id} ignorado: JSON inválido')
+                continue
+            test_case.store_data(args, expected)
+            # O signal de post_save invalida as suítes em cache do desafio
+            test_case.save()
+            moved += 1
+        self.stdout.write(self.style.SUCCESS(f'{moved} caso(s) de teste movido(s)'))
+
+    def _verify(self):
+        invalid = 0
+        for test_case in TestCase.objects.exclude(data_file='').iterator():
+            try:
+                valid = file_digest(test_case.data_path) == test_case.data_sha256
+            except OSError:
+                valid = False
+            if not valid:
+                invalid += 1
+                self.stderr.write(
+                    f'Caso de teste {test_case.id}: arquivo ausente ou alterado ({test_case.data_file})'
+                )
+        if invalid:
+            self.stdout.write(self.style.ERROR(f'{invalid} arquivo(s) com problema'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Todos os arquivos conferem'))
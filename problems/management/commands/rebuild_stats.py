@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from problems.models import Challenge
+from problems.leaderboard import rebuild_leaderboard
+from problems.runtimes import rebuild_runtime_histograms
+from problems.stats import rebuild_challenge_stats, rebuild_profile_stats
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores e histogramas de tempo dos desafios, os perfis e o ranking'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'slugs',
+            nargs='*',
+            help='Slugs dos desafios (padrão: todos)'
+        )
+
+    def handle(self, *args, **options):
+        challenges = Challenge.objects.all()
+        if options['slugs']:
+            challenges = challenges.filter(slug__in=options['slugs'])
+
+        updated = rebuild_challenge_stats(challenges)
+        self.stdout.write(self.style.SUCCESS(f'Estatísticas de {updated} desafio(s) recalculadas'))
+
+        buckets = rebuild_runtime_histograms(challenges)
+        self.stdout.write(self.style.SUCCESS(f'Histogramas de tempo recalculados ({buckets} faixa(s))'))
+
+        if not options['slugs']:
+            fixed = rebuild_profile_stats()
+            self.stdout.write(self.style.SUCCESS(f'{fixed} perfil(is) corrigido(s)'))
+
+            ranked = rebuild_leaderboard()
+            self.stdout.write(self.style.SUCCESS(f'Ranking recalculado com {ranked} usuário(s)'))
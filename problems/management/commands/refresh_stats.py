@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from problems.stats import refresh_home_stats
+
+
+class Command(BaseCommand):
+    help = 'Recalcula as estatísticas da home e grava no cache (para uso em cron)'
+
+    def handle(self, *args, **options):
+        values = refresh_home_stats()
+        summary = ', '.join(f'{name}={value}' for name, value in values.items())
+        self.stdout.write(self.style.SUCCESS(f'Estatísticas atualizadas: {summary}'))
@@ -0,0 +1,90 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from problems.judge import recover_stale_submissions, run_worker
+
+
+class Command(BaseCommand):
+    help = 'Executa os workers que avaliam as submissões pendentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'JUDGE_WORKERS', 2),
+            help='Número de workers (threads) consumindo a fila'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=None,
+            help='Espera em segundos quando a fila está vazia'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Processa a fila até esvaziar e encerra'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        stop_event = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write('Encerrando workers...')
+            stop_event.set()
+
+        previous_handlers = {
+            signal.SIGINT: signal.signal(signal.SIGINT, stop),
+            signal.SIGTERM: signal.signal(signal.SIGTERM, stop),
+        }
+        try:
+            self._run(workers, stop_event, options)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write(self.style.SUCCESS('Workers encerrados'))
+
+    def _run(self, workers, stop_event, options):
+        """Inicia os workers e espera até que todos terminem"""
+        recovered = recover_stale_submissions()
+        if recovered:
+            self.stdout.write(f'{recovered} submissão(ões) devolvida(s) à fila')
+
+        self.stdout.write(f'Iniciando {workers} worker(s) de avaliação...')
+
+        worker_kwargs = {
+            'stop_event': stop_event,
+            'poll_interval': options['poll_interval'],
+            'once': options['once'],
+        }
+
+        if workers == 1:
+            run_worker(**worker_kwargs)
+        else:
+            threads = [
+                threading.Thread(
+                    target=self._thread_main,
+                    kwargs=worker_kwargs,
+                    name=f'judge-worker-{i + 1}',
+                    daemon=True
+                )
+                for i in range(workers)
+            ]
+            for thread in threads:
+                thread.start()
+            # join com timeout para que os sinais sejam tratados
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+
+    def _thread_main(self, **kwargs):
+        try:
+            run_worker(**kwargs)
+        finally:
+            connection.close()
@@ -0,0 +1,69 @@
+# Sincroniza o estado das migrações com a renomeação problema -> desafio.
+# As tabelas e colunas continuam as mesmas, portanto nada muda no banco.
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameModel(
+                    old_name='Problem',
+                    new_name='Challenge',
+                ),
+                migrations.AlterModelTable(
+                    name='challenge',
+                    table='problems_problem',
+                ),
+                migrations.AlterModelTable(
+                    name='submission',
+                    table='problems_submission',
+                ),
+                migrations.AlterModelTable(
+                    name='testcase',
+                    table='problems_testcase',
+                ),
+                migrations.AlterModelTable(
+                    name='userprofile',
+                    table='problems_userprofile',
+                ),
+                migrations.RenameField(
+                    model_name='submission',
+                    old_name='problem',
+                    new_name='challenge',
+                ),
+                migrations.AlterField(
+                    model_name='submission',
+                    name='challenge',
+                    field=models.ForeignKey(db_column='problem_id', on_delete=django.db.models.deletion.CASCADE, to='problems.challenge', verbose_name='Desafio'),
+                ),
+                migrations.RenameField(
+                    model_name='testcase',
+                    old_name='problem',
+                    new_name='challenge',
+                ),
+                migrations.AlterField(
+                    model_name='testcase',
+                    name='challenge',
+                    field=models.ForeignKey(db_column='problem_id', on_delete=django.db.models.deletion.CASCADE, related_name='test_cases', to='problems.challenge', verbose_name='Desafio'),
+                ),
+                migrations.RenameField(
+                    model_name='userprofile',
+                    old_name='problems_solved',
+                    new_name='challenges_solved',
+                ),
+                migrations.AlterField(
+                    model_name='userprofile',
+                    name='challenges_solved',
+                    field=models.IntegerField(db_column='problems_solved', default=0, verbose_name='Desafios Resolvidos'),
+                ),
+            ],
+        ),
+    ]
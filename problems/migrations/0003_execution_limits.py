@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0002_sync_challenge_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='cpu_time_limit',
+            field=models.FloatField(default=2.0, verbose_name='Limite de CPU por Teste (segundos)'),
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='time_limit',
+            field=models.FloatField(default=2.0, verbose_name='Limite de Tempo por Teste (segundos)'),
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='total_time_limit',
+            field=models.FloatField(default=10.0, verbose_name='Limite de Tempo por Submissão (segundos)'),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='failed_test',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Teste que Falhou'),
+        ),
+    ]
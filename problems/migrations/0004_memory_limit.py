@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0003_execution_limits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='memory_limit',
+            field=models.PositiveIntegerField(default=256, verbose_name='Limite de Memória (MB)'),
+        ),
+        migrations.AlterField(
+            model_name='submission',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendente'), ('running', 'Executando'), ('accepted', 'Aceito'), ('wrong_answer', 'Resposta Errada'), ('runtime_error', 'Erro de Execução'), ('time_limit', 'Tempo Limite Excedido'), ('memory_limit', 'Limite de Memória Excedido')], default='pending', max_length=20, verbose_name='Status'),
+        ),
+    ]
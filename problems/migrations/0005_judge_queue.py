@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0004_memory_limit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Fim da Avaliação'),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Início da Avaliação'),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='test_results',
+            field=models.JSONField(blank=True, default=list, verbose_name='Resultados dos Testes'),
+        ),
+    ]
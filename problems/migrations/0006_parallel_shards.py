@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0005_judge_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='parallel_shards',
+            field=models.PositiveSmallIntegerField(default=1, verbose_name='Processos Paralelos na Avaliação'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0006_parallel_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='cache_hit',
+            field=models.BooleanField(default=False, verbose_name='Resultado do Cache'),
+        ),
+        migrations.CreateModel(
+            name='VerdictCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code_hash', models.CharField(max_length=64, verbose_name='Hash do Código')),
+                ('suite_version', models.CharField(max_length=64, verbose_name='Versão da Suíte de Testes')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('running', 'Executando'), ('accepted', 'Aceito'), ('wrong_answer', 'Resposta Errada'), ('runtime_error', 'Erro de Execução'), ('time_limit', 'Tempo Limite Excedido'), ('memory_limit', 'Limite de Memória Excedido')], max_length=20, verbose_name='Status')),
+                ('result_message', models.TextField(blank=True, verbose_name='Mensagem de Resultado')),
+                ('execution_time', models.FloatField(blank=True, null=True, verbose_name='Tempo de Execução (segundos)')),
+                ('failed_test', models.PositiveIntegerField(blank=True, null=True, verbose_name='Teste que Falhou')),
+                ('test_results', models.JSONField(blank=True, default=list, verbose_name='Resultados dos Testes')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Acertos')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data de Criação')),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cached_verdicts', to='problems.challenge', verbose_name='Desafio')),
+            ],
+            options={
+                'verbose_name': 'Veredito em Cache',
+                'verbose_name_plural': 'Vereditos em Cache',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='verdictcache',
+            constraint=models.UniqueConstraint(fields=('code_hash', 'suite_version'), name='unique_verdict_per_code_and_suite'),
+        ),
+    ]
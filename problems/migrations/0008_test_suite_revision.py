@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0007_verdict_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='test_suite_revision',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Revisão da Suíte de Testes'),
+        ),
+    ]
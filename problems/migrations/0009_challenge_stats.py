@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:49
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_stats(apps, schema_editor):
+    Challenge = apps.get_model('problems', 'Challenge')
+    judged = ~Q(submission__status__in=('pending', 'running'))
+    accepted = Q(submission__status='accepted')
+    rows = Challenge.objects.annotate(
+        new_attempt_count=Count('submission', filter=judged),
+        new_accepted_count=Count('submission', filter=accepted),
+        new_solved_count=Count('submission__user', filter=accepted, distinct=True),
+    )
+    for challenge in rows:
+        Challenge.objects.filter(pk=challenge.pk).update(
+            attempt_count=challenge.new_attempt_count,
+            accepted_count=challenge.new_accepted_count,
+            solved_count=challenge.new_solved_count,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0008_test_suite_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='accepted_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Submissões Aceitas'),
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='attempt_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Submissões Avaliadas'),
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='solved_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Usuários que Resolveram'),
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+from django.db.models import Min
+
+
+def backfill_user_solved(apps, schema_editor):
+    Submission = apps.get_model('problems', 'Submission')
+    UserSolved = apps.get_model('problems', 'UserSolved')
+    rows = (
+        Submission.objects
+        .filter(status='accepted')
+        .values('user_id', 'challenge_id')
+        .annotate(first_accepted_at=Min('submitted_at'), best_time=Min('execution_time'))
+        .order_by()
+    )
+    UserSolved.objects.bulk_create(
+        (UserSolved(**row) for row in rows.iterator()),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('problems', '0009_challenge_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSolved',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_accepted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Primeiro Aceite')),
+                ('best_time', models.FloatField(blank=True, null=True, verbose_name='Melhor Tempo (segundos)')),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='solvers', to='problems.challenge', verbose_name='Desafio')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='solved_challenges', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Desafio Resolvido',
+                'verbose_name_plural': 'Desafios Resolvidos',
+                'ordering': ['-first_accepted_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='usersolved',
+            constraint=models.UniqueConstraint(fields=('user', 'challenge'), name='unique_solved_per_user_and_challenge'),
+        ),
+        migrations.RunPython(backfill_user_solved, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+from django.db.models import Case, Count, IntegerField, Max, Sum, Value, When
+
+
+DIFFICULTY_POINTS = {'easy': 1, 'medium': 2, 'hard': 3}
+
+
+def backfill_leaderboard(apps, schema_editor):
+    UserSolved = apps.get_model('problems', 'UserSolved')
+    LeaderboardEntry = apps.get_model('problems', 'LeaderboardEntry')
+    LeaderboardScore = apps.get_model('problems', 'LeaderboardScore')
+    points = Case(
+        *[When(challenge__difficulty=difficulty, then=Value(value))
+          for difficulty, value in DIFFICULTY_POINTS.items()],
+        default=Value(1),
+        output_field=IntegerField()
+    )
+    rows = (
+        UserSolved.objects
+        .values('user_id')
+        .annotate(score=Sum(points), solved_count=Count('id'), last_accept_at=Max('first_accepted_at'))
+        .order_by()
+    )
+    entries = [LeaderboardEntry(**row) for row in rows]
+    scores = {}
+    for entry in entries:
+        scores[entry.score] = scores.get(entry.score, 0) + 1
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+    LeaderboardScore.objects.bulk_create(
+        [LeaderboardScore(score=score, users=users) for score, users in scores.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('problems', '0013_challenge_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField(unique=True, verbose_name='Pontuação')),
+                ('users', models.IntegerField(default=0, verbose_name='Usuários')),
+            ],
+            options={
+                'verbose_name': 'Pontuação do Ranking',
+                'verbose_name_plural': 'Pontuações do Ranking',
+                'ordering': ['-score'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField(default=0, verbose_name='Pontuação')),
+                ('solved_count', models.PositiveIntegerField(default=0, verbose_name='Desafios Resolvidos')),
+                ('last_accept_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Último Primeiro Aceite')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entry', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Posição no Ranking',
+                'verbose_name_plural': 'Ranking',
+                'ordering': ['-score', 'last_accept_at', 'user_id'],
+                'indexes': [models.Index(fields=['-score', 'last_accept_at', 'user'], name='leaderboard_rank_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_leaderboard, migrations.RunPython.noop),
+    ]
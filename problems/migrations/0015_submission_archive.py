@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0014_leaderboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionArchive',
+            fields=[
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='archive', serialize=False, to='problems.submission', verbose_name='Submissão')),
+                ('code', models.BinaryField(verbose_name='Código (zlib)')),
+                ('result', models.BinaryField(verbose_name='Resultado (JSON, zlib)')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data de Arquivamento')),
+            ],
+            options={
+                'verbose_name': 'Submissão Arquivada',
+                'verbose_name_plural': 'Submissões Arquivadas',
+            },
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='is_archived',
+            field=models.BooleanField(default=False, verbose_name='Arquivada'),
+        ),
+    ]
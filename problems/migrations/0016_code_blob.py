@@ -0,0 +1,156 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import hashlib
+import zlib
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+BATCH_SIZE = 1000
+
+
+def move_code_to_blobs(apps, schema_editor):
+    Submission = apps.get_model('problems', 'Submission')
+    SubmissionArchive = apps.get_model('problems', 'SubmissionArchive')
+    CodeBlob = apps.get_model('problems', 'CodeBlob')
+
+    last_id = 0
+    while True:
+        batch = list(
+            Submission.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .only('id', 'code', 'is_archived')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        archived = dict(
+            SubmissionArchive.objects
+            .filter(submission_id__in=[s.id for s in batch if s.is_archived])
+            .values_list('submission_id', 'code')
+        )
+        sources = {}
+        for submission in batch:
+            if submission.id in archived:
+                data = zlib.decompress(bytes(archived[submission.id]))
+            else:
+                data = submission.code.encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+            sources[digest] = data
+            submission.digest = digest
+
+        existing = set(
+            CodeBlob.objects.filter(sha256__in=sources).values_list('sha256', flat=True)
+        )
+        CodeBlob.objects.bulk_create([
+            CodeBlob(sha256=digest, data=zlib.compress(data, 6), size=len(data))
+            for digest, data in sources.items() if digest not in existing
+        ])
+        blob_ids = dict(
+            CodeBlob.objects.filter(sha256__in=sources).values_list('sha256', 'id')
+        )
+        for submission in batch:
+            submission.code_blob_id = blob_ids[submission.digest]
+        Submission.objects.bulk_update(batch, ['code_blob'])
+
+    references = (
+        Submission.objects.filter(code_blob=OuterRef('pk'))
+        .values('code_blob').annotate(total=Count('id')).values('total')
+    )
+    CodeBlob.objects.update(ref_count=Coalesce(Subquery(references), 0))
+
+
+def restore_code_from_blobs(apps, schema_editor):
+    # Volta ao formato da 0015: o código das arquivadas fica compactado no
+    # arquivo e o da submissão fica vazio; o das demais fica na submissão
+    Submission = apps.get_model('problems', 'Submission')
+    SubmissionArchive = apps.get_model('problems', 'SubmissionArchive')
+    CodeBlob = apps.get_model('problems', 'CodeBlob')
+
+    last_id = 0
+    while True:
+        batch = list(
+            Submission.objects.filter(id__gt=last_id, code_blob__isnull=False)
+            .order_by('id')
+            .only('id', 'code_blob', 'is_archived')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        blobs = dict(
+            CodeBlob.objects
+            .filter(id__in={s.code_blob_id for s in batch})
+            .values_list('id', 'data')
+        )
+        archives = {
+            archive.submission_id: archive
+            for archive in SubmissionArchive.objects.filter(
+                submission_id__in=[s.id for s in batch if s.is_archived]
+            ).only('submission')
+        }
+        for submission in batch:
+            data = bytes(blobs[submission.code_blob_id])
+            if submission.id in archives:
+                # O blob já é o texto em UTF-8 compactado com zlib
+                archives[submission.id].code = data
+                submission.code = ''
+            else:
+                submission.code = zlib.decompress(data).decode('utf-8')
+        Submission.objects.bulk_update(batch, ['code'])
+        SubmissionArchive.objects.bulk_update(list(archives.values()), ['code'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0015_submission_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('data', models.BinaryField(verbose_name='Código (zlib)')),
+                ('size', models.PositiveIntegerField(verbose_name='Tamanho Original (bytes)')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Referências')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data de Criação')),
+            ],
+            options={
+                'verbose_name': 'Código Armazenado',
+                'verbose_name_plural': 'Códigos Armazenados',
+            },
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='code_blob',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='submissions', to='problems.codeblob', verbose_name='Código'),
+        ),
+        migrations.RunPython(move_code_to_blobs, restore_code_from_blobs),
+        # Sem default o banco não consegue recriar as colunas ao desfazer a
+        # migração; restore_code_from_blobs preenche os valores depois
+        migrations.AlterField(
+            model_name='submission',
+            name='code',
+            field=models.TextField(default='', verbose_name='Código'),
+        ),
+        migrations.AlterField(
+            model_name='submissionarchive',
+            name='code',
+            field=models.BinaryField(default=b'', verbose_name='Código (zlib)'),
+        ),
+        migrations.RemoveField(
+            model_name='submission',
+            name='code',
+        ),
+        migrations.RemoveField(
+            model_name='submissionarchive',
+            name='code',
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+import math
+
+
+# Mesmas faixas de problems/runtimes.py
+MIN_RUNTIME = 0.0001
+BUCKETS_PER_DECADE = 10
+BUCKET_COUNT = 60
+
+
+def backfill_histograms(apps, schema_editor):
+    Submission = apps.get_model('problems', 'Submission')
+    RuntimeBucket = apps.get_model('problems', 'RuntimeBucket')
+    counts = {}
+    times = Submission.objects.filter(
+        status='accepted', execution_time__isnull=False
+    ).values_list('challenge_id', 'execution_time')
+    for challenge_id, seconds in times.iterator():
+        if seconds <= MIN_RUNTIME:
+            bucket = 0
+        else:
+            bucket = min(int(math.log10(seconds / MIN_RUNTIME) * BUCKETS_PER_DECADE), BUCKET_COUNT - 1)
+        counts[challenge_id, bucket] = counts.get((challenge_id, bucket), 0) + 1
+    RuntimeBucket.objects.bulk_create(
+        [RuntimeBucket(challenge_id=challenge_id, bucket=bucket, count=count)
+         for (challenge_id, bucket), count in counts.items()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0016_code_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RuntimeBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveSmallIntegerField(verbose_name='Faixa')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Submissões')),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='runtime_buckets', to='problems.challenge', verbose_name='Desafio')),
+            ],
+            options={
+                'verbose_name': 'Faixa de Tempo',
+                'verbose_name_plural': 'Faixas de Tempo',
+                'ordering': ['challenge', 'bucket'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='runtimebucket',
+            constraint=models.UniqueConstraint(fields=('challenge', 'bucket'), name='unique_runtime_bucket_per_challenge'),
+        ),
+        migrations.RunPython(backfill_histograms, migrations.RunPython.noop),
+    ]
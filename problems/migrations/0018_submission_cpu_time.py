@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0017_runtime_histogram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='cpu_time',
+            field=models.FloatField(blank=True, null=True, verbose_name='Tempo de CPU (segundos)'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:19
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+
+search_index = import_module('problems.migrations.0013_challenge_search_index')
+
+
+def recreate_sqlite_search_index(apps, schema_editor):
+    # Na SQLite o AddField recria a tabela de desafios, e os triggers do
+    # índice de busca (migração 0013) vão junto com a tabela antiga
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    search_index._run(schema_editor, search_index.SQLITE_BACKWARD)
+    if search_index._sqlite_has_fts5(schema_editor):
+        search_index._run(schema_editor, search_index.SQLITE_FORWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0018_submission_cpu_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='expected_complexity',
+            field=models.CharField(blank=True, choices=[('1', 'O(1)'), ('log n', 'O(log n)'), ('n', 'O(n)'), ('n log n', 'O(n log n)'), ('n^2', 'O(n²)'), ('n^3', 'O(n³)')], max_length=10, verbose_name='Complexidade Esperada'),
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='scaling_base_size',
+            field=models.PositiveIntegerField(default=1000, verbose_name='Tamanho Inicial do Teste de Escala'),
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='scaling_generator',
+            field=models.TextField(blank=True, help_text='Código Python com generate(n), que retorna os argumentos da função para uma entrada de tamanho n', verbose_name='Gerador de Entradas'),
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='scaling_steps',
+            field=models.PositiveSmallIntegerField(default=4, help_text='Tamanhos n, 2n, 4n... a partir do tamanho inicial', verbose_name='Tamanhos no Teste de Escala'),
+        ),
+        migrations.RunPython(recreate_sqlite_search_index, recreate_sqlite_search_index),
+    ]
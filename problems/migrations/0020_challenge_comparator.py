@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:27
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+
+# O AddField na SQLite derruba os triggers da busca; ver 0019
+recreate_sqlite_search_index = import_module(
+    'problems.migrations.0019_challenge_scaling_test'
+).recreate_sqlite_search_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0019_challenge_scaling_test'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='checker_code',
+            field=models.TextField(blank=True, help_text='Código Python com check(actual, expected, args), que retorna True/False ou (bool, mensagem)', verbose_name='Verificador'),
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='comparator',
+            field=models.CharField(choices=[('exact', 'Exata'), ('float', 'Números com tolerância'), ('unordered', 'Lista em qualquer ordem'), ('unordered_nested', 'Listas aninhadas em qualquer ordem'), ('custom', 'Verificador próprio')], default='exact', max_length=20, verbose_name='Comparação da Saída'),
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='float_tolerance',
+            field=models.FloatField(default=1e-06, help_text='Diferença absoluta ou relativa aceita na comparação com tolerância', verbose_name='Tolerância Numérica'),
+        ),
+        migrations.RunPython(recreate_sqlite_search_index, recreate_sqlite_search_index),
+    ]
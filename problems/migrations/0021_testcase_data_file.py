@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0020_challenge_comparator'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testcase',
+            name='data_file',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Arquivo de Dados'),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='data_sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='data_size',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Tamanho do Arquivo (bytes)'),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='expected_output',
+            field=models.TextField(blank=True, verbose_name='Saída Esperada (JSON)'),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='input_data',
+            field=models.TextField(blank=True, verbose_name='Entrada (JSON)'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def clear_verdict_cache(apps, schema_editor):
+    # As chaves antigas vêm do código sem os espaços no fim das linhas e
+    # podem coincidir com o hash exato de outro programa
+    VerdictCache = apps.get_model('problems', 'VerdictCache')
+    VerdictCache.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0021_testcase_data_file'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_verdict_cache, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,16 @@
-from django.db import models
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
 from django.utils import timezone
+import hashlib
+import os
+import zlib
+
+from .comparators import COMPARATOR_CHOICES, DEFAULT_TOLERANCE
+from .complexity import COMPLEXITY_CHOICES
+from .test_data import write_test_data
 
 
 class Challenge(models.Model):
@@ -36,21 +46,153 @@ class Challenge(models.Model):
         verbose_name='Nome da Função'
     )
     
+    # Limites de execução
+    time_limit = models.FloatField(
+        default=2.0,
+        verbose_name='Limite de Tempo por Teste (segundos)'
+    )
+    cpu_time_limit = models.FloatField(
+        default=2.0,
+        verbose_name='Limite de CPU por Teste (segundos)'
+    )
+    total_time_limit = models.FloatField(
+        default=10.0,
+        verbose_name='Limite de Tempo por Submissão (segundos)'
+    )
+    memory_limit = models.PositiveIntegerField(
+        default=256,
+        verbose_name='Limite de Memória (MB)'
+    )
+    
+    # Desafios com muitos testes ocultos podem dividi-los entre processos
+    parallel_shards = models.PositiveSmallIntegerField(
+        default=1,
+        verbose_name='Processos Paralelos na Avaliação'
+    )
+    
+    # Teste de escala (ver scaling.py): entradas geradas em tamanhos
+    # crescentes; o tempo não pode crescer além da complexidade esperada
+    expected_complexity = models.CharField(
+        max_length=10,
+        choices=COMPLEXITY_CHOICES,
+        blank=True,
+        verbose_name='Complexidade Esperada'
+    )
+    scaling_generator = models.TextField(
+        blank=True,
+        verbose_name='Gerador de Entradas',
+        help_text='Código Python com generate(n), que retorna os argumentos da '
+                  'função para uma entrada de tamanho n'
+    )
+    scaling_base_size = models.PositiveIntegerField(
+        default=1000,
+        verbose_name='Tamanho Inicial do Teste de Escala'
+    )
+    scaling_steps = models.PositiveSmallIntegerField(
+        default=4,
+        verbose_name='Tamanhos no Teste de Escala',
+        help_text='Tamanhos n, 2n, 4n... a partir do tamanho inicial'
+    )
+    
+    # Como a saída do usuário é comparada com a esperada (ver comparators.py)
+    comparator = models.CharField(
+        max_length=20,
+        choices=COMPARATOR_CHOICES,
+        default='exact',
+        verbose_name='Comparação da Saída'
+    )
+    float_tolerance = models.FloatField(
+        default=DEFAULT_TOLERANCE,
+        verbose_name='Tolerância Numérica',
+        help_text='Diferença absoluta ou relativa aceita na comparação com tolerância'
+    )
+    checker_code = models.TextField(
+        blank=True,
+        verbose_name='Verificador',
+        help_text='Código Python com check(actual, expected, args), que retorna '
+                  'True/False ou (bool, mensagem)'
+    )
+    
+    # Incrementado a cada mudança nos casos de teste (ver signals.py);
+    # invalida as suítes de teste em cache em todos os processos
+    test_suite_revision = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Revisão da Suíte de Testes'
+    )
+    
+    # Contadores desnormalizados, mantidos pelo avaliador (ver stats.py)
+    solved_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Usuários que Resolveram'
+    )
+    attempt_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Submissões Avaliadas'
+    )
+    accepted_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Submissões Aceitas'
+    )
+    
     class Meta:
         verbose_name = 'Desafio'
         verbose_name_plural = 'Desafios'
         ordering = ['-created_at']
         db_table = 'problems_problem'  # Manter tabela existente
+        indexes = [
+            # Paginação por chave da listagem (ver pagination.py)
+            models.Index(fields=['-created_at', '-id'], name='challenge_created_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
     def get_solved_count(self):
-        """Retorna o número de usuários que resolveram este desafio"""
+        """
+        Retorna o número de usuários que resolveram este desafio
+
+        Consulta as submissões; listagens devem usar ``solved_count``.
+        """
         return Submission.objects.filter(
             challenge=self, 
             status='accepted'
         ).values('user').distinct().count()
+    
+    @property
+    def acceptance_rate(self):
+        """Porcentagem de submissões avaliadas que foram aceitas"""
+        if not self.attempt_count:
+            return None
+        return round(100 * self.accepted_count / self.attempt_count, 1)
+    
+    @property
+    def has_scaling_test(self):
+        return bool(self.expected_complexity and self.scaling_generator.strip())
+    
+    def get_scaling_sizes(self):
+        """Tamanhos das entradas do teste de escala: n, 2n, 4n..."""
+        return [self.scaling_base_size * 2 ** step for step in range(self.scaling_steps)]
+    
+    def get_execution_limits(self):
+        """Retorna os limites de execução no formato usado pelo executor"""
+        return {
+            'time_limit': self.time_limit,
+            'cpu_time_limit': self.cpu_time_limit,
+            'total_time_limit': self.total_time_limit,
+            'memory_limit': self.memory_limit,
+        }
+    
+    def get_comparison(self):
+        """Retorna o comparador da saída no formato usado pelo executor"""
+        return {
+            'name': self.comparator,
+            'tolerance': self.float_tolerance,
+            'checker': self.checker_code,
+        }
 
 
 # Manter alias Problem para compatibilidade
@@ -66,8 +208,22 @@ class TestCase(models.Model):
         verbose_name='Desafio',
         db_column='problem_id'  # Manter coluna existente
     )
-    input_data = models.TextField(verbose_name='Entrada (JSON)')
-    expected_output = models.TextField(verbose_name='Saída Esperada (JSON)')
+    input_data = models.TextField(blank=True, verbose_name='Entrada (JSON)')
+    expected_output = models.TextField(blank=True, verbose_name='Saída Esperada (JSON)')
+    # Casos grandes ficam em arquivo, fora do banco (ver test_data.py); com
+    # ``data_file`` preenchido, os dois campos acima ficam vazios
+    data_file = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        verbose_name='Arquivo de Dados'
+    )
+    data_sha256 = models.CharField(max_length=64, blank=True, editable=False)
+    data_size = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Tamanho do Arquivo (bytes)'
+    )
     is_sample = models.BooleanField(
         default=False, 
         verbose_name='Caso de Teste de Exemplo'
@@ -87,12 +243,104 @@ class TestCase(models.Model):
     def __str__(self):
         return f"{self.challenge.title} - Test {self.id}"
     
+    def clean(self):
+        if not self.data_file and not (self.input_data and self.expected_output):
+            raise ValidationError('Informe a entrada e a saída esperada do caso de teste')
+    
+    @staticmethod
+    def data_root():
+        """Diretório dos arquivos de casos de teste"""
+        return getattr(settings, 'TEST_DATA_ROOT', os.path.join(settings.BASE_DIR, 'test_data'))
+    
+    @property
+    def data_path(self):
+        """Caminho absoluto do arquivo de dados, ou None se o caso está no banco"""
+        if not self.data_file:
+            return None
+        return os.path.join(self.data_root(), self.data_file)
+    
+    def store_data(self, args, expected):
+        """
+        Grava entrada e saída esperada em arquivo em vez de no banco
+
+        Não salva o caso de teste.
+        """
+        self.data_file, self.data_sha256, self.data_size = write_test_data(
+            self.data_root(), args, expected
+        )
+        self.input_data = ''
+        self.expected_output = ''
+    
     # Propriedade para compatibilidade
     @property
     def problem(self):
         return self.challenge
 
 
+class CodeBlobManager(models.Manager):
+    """Operações do armazenamento de código por conteúdo"""
+    
+    def store(self, text):
+        """
+        Guarda ``text`` e retorna o blob, incrementando a contagem de referências
+
+        Códigos idênticos, de qualquer usuário, compartilham o mesmo blob.
+        """
+        data = text.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        while True:
+            # O UPDATE primeiro: se o blob acabou de ser removido por
+            # release(), nenhuma linha é afetada e ele é recriado abaixo
+            if self.filter(sha256=digest).update(ref_count=F('ref_count') + 1):
+                return self.get(sha256=digest)
+            try:
+                with transaction.atomic():
+                    return self.create(
+                        sha256=digest,
+                        data=zlib.compress(data, CodeBlob.COMPRESSION_LEVEL),
+                        size=len(data),
+                        ref_count=1
+                    )
+            except IntegrityError:
+                # Outro processo criou o mesmo blob; tenta o UPDATE de novo
+                continue
+    
+    def release(self, blob_id):
+        """Decrementa as referências e remove o blob que não é mais usado"""
+        self.filter(pk=blob_id).update(ref_count=F('ref_count') - 1)
+        self.filter(pk=blob_id, ref_count__lte=0).delete()
+
+
+class CodeBlob(models.Model):
+    """
+    Código-fonte de submissões, compactado e endereçado pelo SHA-256
+
+    Submissões com o mesmo código apontam para o mesmo blob; ``ref_count``
+    conta quantas apontam.
+    """
+    COMPRESSION_LEVEL = 6
+    
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name='SHA-256')
+    data = models.BinaryField(verbose_name='Código (zlib)')
+    size = models.PositiveIntegerField(verbose_name='Tamanho Original (bytes)')
+    ref_count = models.PositiveIntegerField(default=0, verbose_name='Referências')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='Data de Criação')
+    
+    objects = CodeBlobManager()
+    
+    class Meta:
+        verbose_name = 'Código Armazenado'
+        verbose_name_plural = 'Códigos Armazenados'
+    
+    def __str__(self):
+        return self.sha256[:12]
+    
+    @property
+    def text(self):
+        """Código descompactado"""
+        return zlib.decompress(bytes(self.data)).decode('utf-8')
+
+
 class Submission(models.Model):
     """Modelo para representar uma submissão de solução"""
     STATUS_CHOICES = [
@@ -102,6 +350,7 @@ class Submission(models.Model):
         ('wrong_answer', 'Resposta Errada'),
         ('runtime_error', 'Erro de Execução'),
         ('time_limit', 'Tempo Limite Excedido'),
+        ('memory_limit', 'Limite de Memória Excedido'),
     ]
     
     user = models.ForeignKey(
@@ -115,7 +364,14 @@ class Submission(models.Model):
         verbose_name='Desafio',
         db_column='problem_id'  # Manter coluna existente
     )
-    code = models.TextField(verbose_name='Código')
+    # O código fica em CodeBlob; use a propriedade ``code``
+    code_blob = models.ForeignKey(
+        CodeBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        related_name='submissions',
+        verbose_name='Código'
+    )
     status = models.CharField(
         max_length=20, 
         choices=STATUS_CHOICES, 
@@ -135,22 +391,312 @@ class Submission(models.Model):
         blank=True,
         verbose_name='Tempo de Execução (segundos)'
     )
+    # Soma do tempo de CPU das chamadas da função, sem carga do módulo e
+    # parse dos testes; é o tempo usado nas comparações entre soluções
+    cpu_time = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Tempo de CPU (segundos)'
+    )
+    failed_test = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Teste que Falhou'
+    )
+    test_results = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Resultados dos Testes'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Início da Avaliação'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fim da Avaliação'
+    )
+    cache_hit = models.BooleanField(
+        default=False,
+        verbose_name='Resultado do Cache'
+    )
+    # Código e resultado movidos para SubmissionArchive (ver archive.py)
+    is_archived = models.BooleanField(
+        default=False,
+        verbose_name='Arquivada'
+    )
     
     class Meta:
         verbose_name = 'Submissão'
         verbose_name_plural = 'Submissões'
         ordering = ['-submitted_at']
         db_table = 'problems_submission'  # Manter tabela existente
+        indexes = [
+            # Submissões recentes do usuário (perfil)
+            models.Index(fields=['user', '-submitted_at'], name='submission_user_recent_idx'),
+            # Submissões do usuário em um desafio (página do desafio);
+            # também atende filtros por (user, challenge, status)
+            models.Index(
+                fields=['user', 'challenge', '-submitted_at'],
+                name='submission_user_chal_idx'
+            ),
+            # Fila de avaliação: pendentes mais antigas primeiro
+            models.Index(fields=['status', 'submitted_at'], name='submission_queue_idx'),
+            # Aceites por desafio; parcial onde o banco suporta. O SQLite só
+            # usa índices parciais quando o valor vem literal na consulta,
+            # o que o ORM não faz, então lá ele serve apenas ao PostgreSQL
+            models.Index(
+                fields=['challenge', 'user'],
+                name='submission_accepted_idx',
+                condition=models.Q(status='accepted')
+            ),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.challenge.title} - {self.status}"
     
+    # Código atribuído e ainda não gravado em um blob
+    _pending_code = None
+    
+    @property
+    def code(self):
+        """Código-fonte da submissão"""
+        if self._pending_code is not None:
+            return self._pending_code
+        if self.code_blob_id is None:
+            return ''
+        return self.code_blob.text
+    
+    @code.setter
+    def code(self, value):
+        self._pending_code = value
+    
+    def save(self, *args, **kwargs):
+        if self._pending_code is not None:
+            previous_blob_id = self.code_blob_id
+            with transaction.atomic():
+                self.code_blob = CodeBlob.objects.store(self._pending_code)
+                update_fields = kwargs.get('update_fields')
+                if update_fields is not None:
+                    kwargs['update_fields'] = set(update_fields) | {'code_blob'}
+                super().save(*args, **kwargs)
+                if previous_blob_id is not None:
+                    CodeBlob.objects.release(previous_blob_id)
+            self._pending_code = None
+            return
+        super().save(*args, **kwargs)
+    
+    @property
+    def is_finished(self):
+        """Indica se a avaliação da submissão já terminou"""
+        return self.status not in ('pending', 'running')
+    
     # Propriedade para compatibilidade
     @property
     def problem(self):
         return self.challenge
 
 
+class SubmissionArchive(models.Model):
+    """
+    Resultado de uma submissão antiga, compactado com zlib
+
+    A submissão continua na tabela principal apenas com os metadados
+    (status, datas, tempo), mantendo a tabela quente pequena.
+    """
+    submission = models.OneToOneField(
+        Submission,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='archive',
+        verbose_name='Submissão'
+    )
+    result = models.BinaryField(verbose_name='Resultado (JSON, zlib)')
+    archived_at = models.DateTimeField(default=timezone.now, verbose_name='Data de Arquivamento')
+    
+    class Meta:
+        verbose_name = 'Submissão Arquivada'
+        verbose_name_plural = 'Submissões Arquivadas'
+    
+    def __str__(self):
+        return f"Arquivo da submissão {self.submission_id}"
+
+
+class UserSolved(models.Model):
+    """
+    Desafio resolvido por um usuário
+
+    Mantido pelo avaliador no primeiro aceite, para que "o usuário já
+    resolveu este desafio?" seja uma consulta pela chave única em vez de
+    uma varredura das submissões.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='solved_challenges',
+        verbose_name='Usuário'
+    )
+    challenge = models.ForeignKey(
+        Challenge,
+        on_delete=models.CASCADE,
+        related_name='solvers',
+        verbose_name='Desafio'
+    )
+    first_accepted_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Primeiro Aceite'
+    )
+    best_time = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Melhor Tempo (segundos)'
+    )
+    
+    class Meta:
+        verbose_name = 'Desafio Resolvido'
+        verbose_name_plural = 'Desafios Resolvidos'
+        ordering = ['-first_accepted_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'challenge'],
+                name='unique_solved_per_user_and_challenge'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.challenge.title}"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Posição de um usuário no ranking
+
+    Tabela materializada, atualizada a cada primeiro aceite (ver
+    leaderboard.py). A ordem é pontuação decrescente e, no empate, quem
+    chegou primeiro à pontuação.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entry',
+        verbose_name='Usuário'
+    )
+    score = models.PositiveIntegerField(default=0, verbose_name='Pontuação')
+    solved_count = models.PositiveIntegerField(default=0, verbose_name='Desafios Resolvidos')
+    last_accept_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Último Primeiro Aceite'
+    )
+    
+    class Meta:
+        verbose_name = 'Posição no Ranking'
+        verbose_name_plural = 'Ranking'
+        ordering = ['-score', 'last_accept_at', 'user_id']
+        indexes = [
+            models.Index(
+                fields=['-score', 'last_accept_at', 'user'],
+                name='leaderboard_rank_idx'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.score}"
+
+
+class LeaderboardScore(models.Model):
+    """
+    Quantidade de usuários com cada pontuação
+
+    Permite calcular a posição de alguém somando as poucas pontuações
+    acima da dele, sem contar os usuários um a um.
+    """
+    score = models.PositiveIntegerField(unique=True, verbose_name='Pontuação')
+    users = models.IntegerField(default=0, verbose_name='Usuários')
+    
+    class Meta:
+        verbose_name = 'Pontuação do Ranking'
+        verbose_name_plural = 'Pontuações do Ranking'
+        ordering = ['-score']
+    
+    def __str__(self):
+        return f"{self.score}: {self.users}"
+
+
+class RuntimeBucket(models.Model):
+    """
+    Uma faixa do histograma de tempos das submissões aceitas de um desafio
+
+    As faixas são logarítmicas e fixas (ver runtimes.py); o avaliador soma
+    cada aceite com ``F()``.
+    """
+    challenge = models.ForeignKey(
+        Challenge,
+        on_delete=models.CASCADE,
+        related_name='runtime_buckets',
+        verbose_name='Desafio'
+    )
+    bucket = models.PositiveSmallIntegerField(verbose_name='Faixa')
+    count = models.PositiveIntegerField(default=0, verbose_name='Submissões')
+    
+    class Meta:
+        verbose_name = 'Faixa de Tempo'
+        verbose_name_plural = 'Faixas de Tempo'
+        ordering = ['challenge', 'bucket']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['challenge', 'bucket'],
+                name='unique_runtime_bucket_per_challenge'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.challenge.title} - {self.bucket}: {self.count}"
+
+
+class VerdictCache(models.Model):
+    """
+    Veredito já calculado para um código em uma versão da suíte de testes
+
+    A chave é o hash do código (só as quebras de linha são normalizadas)
+    mais a versão da suíte (hash dos casos de teste, da função e dos
+    limites), de forma que qualquer mudança nos testes produz uma chave nova.
+    """
+    challenge = models.ForeignKey(
+        Challenge,
+        on_delete=models.CASCADE,
+        related_name='cached_verdicts',
+        verbose_name='Desafio'
+    )
+    code_hash = models.CharField(max_length=64, verbose_name='Hash do Código')
+    suite_version = models.CharField(max_length=64, verbose_name='Versão da Suíte de Testes')
+    status = models.CharField(
+        max_length=20,
+        choices=Submission.STATUS_CHOICES,
+        verbose_name='Status'
+    )
+    result_message = models.TextField(blank=True, verbose_name='Mensagem de Resultado')
+    execution_time = models.FloatField(null=True, blank=True, verbose_name='Tempo de Execução (segundos)')
+    failed_test = models.PositiveIntegerField(null=True, blank=True, verbose_name='Teste que Falhou')
+    test_results = models.JSONField(default=list, blank=True, verbose_name='Resultados dos Testes')
+    hits = models.PositiveIntegerField(default=0, verbose_name='Acertos')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='Data de Criação')
+    
+    class Meta:
+        verbose_name = 'Veredito em Cache'
+        verbose_name_plural = 'Vereditos em Cache'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['code_hash', 'suite_version'],
+                name='unique_verdict_per_code_and_suite'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.challenge.title} - {self.code_hash[:12]} - {self.status}"
+
+
 class UserProfile(models.Model):
     """Modelo para estender as informações do usuário"""
     user = models.OneToOneField(
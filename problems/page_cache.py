@@ -0,0 +1,70 @@
+"""
+Cache de página inteira para visitantes anônimos.
+
+As páginas mais acessadas (home e listagem de desafios) são iguais para
+todos os visitantes não autenticados, então a resposta renderizada é
+guardada no cache do Django por ``PAGE_CACHE_TIMEOUT`` segundos. Usuários
+autenticados veem dados próprios (desafios resolvidos) e nunca usam o cache.
+
+As chaves incluem uma geração que muda sempre que um desafio é criado,
+alterado ou removido (ver signals.py), descartando todas as páginas de uma
+vez sem precisar conhecer suas URLs.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+
+
+DEFAULT_TIMEOUT = 60
+GENERATION_KEY = 'page:generation'
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = str(time.time_ns())
+        cache.set(GENERATION_KEY, generation, None)
+    return generation
+
+
+def invalidate():
+    """Descarta todas as páginas em cache"""
+    cache.set(GENERATION_KEY, str(time.time_ns()), None)
+
+
+def _cache_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'page:{_generation()}:{path}'
+
+
+def _cacheable(request):
+    if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+        return False
+    # Mensagens pendentes (ex.: "Você saiu da sua conta") são de um visitante só
+    return not len(get_messages(request))
+
+
+def cache_page_for_anonymous(view):
+    """Guarda a resposta da view para visitantes anônimos"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+        if not timeout or not _cacheable(request):
+            return view(request, *args, **kwargs)
+
+        key = _cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            cache.set(key, (response.content, response['Content-Type']), timeout)
+        return response
+    return wrapper
@@ -0,0 +1,131 @@
+"""
+Paginação por chave (keyset) para listagens grandes.
+
+Em vez de ``OFFSET``, cada página continua a partir da última linha da
+anterior, comparando ``(created_at, id)``. Com um índice nessas colunas o
+custo de qualquer página é o mesmo, não importa quantas linhas vêm antes.
+O cursor é opaco para o cliente: a chave da última linha em base64.
+
+Resultados de busca ranqueada seguem a mesma ideia com a chave
+``(search_rank, id)`` (ver ``paginate_ranked``).
+"""
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime
+
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 50
+
+Page = namedtuple('Page', ['items', 'next_cursor'])
+
+
+class InvalidCursor(ValueError):
+    """Cursor que não foi gerado por ``encode_cursor``"""
+
+
+def encode_key(values):
+    """Codifica uma chave de ordenação (lista serializável em JSON) como cursor"""
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_key(cursor):
+    """
+    Lê uma chave gerada por ``encode_key``
+
+    Raises:
+        InvalidCursor: se o cursor estiver malformado
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError as e:
+        raise InvalidCursor('Cursor inválido') from e
+    if not isinstance(values, list):
+        raise InvalidCursor('Cursor inválido')
+    return values
+
+
+def encode_cursor(obj):
+    """Gera o cursor que aponta para depois de ``obj``"""
+    return encode_key([obj.created_at.isoformat(), obj.pk])
+
+
+def decode_cursor(cursor):
+    """
+    Lê um cursor gerado por ``encode_cursor``
+
+    Returns:
+        Tupla (created_at, id)
+
+    Raises:
+        InvalidCursor: se o cursor estiver malformado
+    """
+    try:
+        created_at, pk = decode_key(cursor)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Cursor inválido') from e
+
+
+def paginate(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Retorna uma página de ``queryset`` em ordem decrescente de (created_at, id)
+
+    Args:
+        queryset: QuerySet de um modelo com o campo ``created_at``
+        cursor: Cursor da página anterior, ou None para a primeira página
+        page_size: Número máximo de linhas por página
+
+    Raises:
+        InvalidCursor: se o cursor estiver malformado
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+
+    # Uma linha a mais indica se existe próxima página
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1])
+    return Page(items, next_cursor)
+
+
+def paginate_ranked(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Retorna uma página de resultados de busca, do mais relevante ao menos
+
+    Args:
+        queryset: QuerySet anotado com ``search_rank`` (ver
+            ``search.filter_challenges``)
+        cursor: Cursor da página anterior, ou None para a primeira página
+        page_size: Número máximo de linhas por página
+
+    Raises:
+        InvalidCursor: se o cursor estiver malformado
+    """
+    queryset = queryset.order_by('search_rank', 'id')
+    if cursor:
+        try:
+            rank, pk = decode_key(cursor)
+            rank, pk = float(rank), int(pk)
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor('Cursor inválido') from e
+        queryset = queryset.filter(
+            Q(search_rank__gt=rank) | Q(search_rank=rank, id__gt=pk)
+        )
+
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_key([items[-1].search_rank, items[-1].pk])
+    return Page(items, next_cursor)
@@ -0,0 +1,172 @@
+"""
+Distribuição dos tempos de execução das submissões aceitas.
+
+Cada desafio tem um histograma de faixas logarítmicas fixas
+(``BUCKETS_PER_DECADE`` faixas por potência de 10, a partir de
+``MIN_RUNTIME``), guardado em ``RuntimeBucket``. O avaliador soma cada aceite
+na faixa do seu tempo (de CPU, ver ``ranking_time``) com ``F()``, então "mais
+rápido que X% das soluções aceitas" sai da soma de no máximo ``BUCKET_COUNT``
+linhas, sem ordenar a tabela de submissões. Dentro da faixa do próprio tempo a posição é
+interpolada; o erro fica abaixo da largura de uma faixa (~26%).
+
+O gráfico da página do desafio lê a distribuição pelo endpoint
+``runtime_distribution``, em cache por ``RUNTIME_DISTRIBUTION_TTL`` segundos.
+``manage.py rebuild_stats`` recalcula os histogramas a partir das submissões.
+"""
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from .models import Challenge, RuntimeBucket, Submission
+
+
+MIN_RUNTIME = 0.0001
+BUCKETS_PER_DECADE = 10
+# De 0,1 ms a 100 s; tempos fora da faixa ficam nas pontas
+BUCKET_COUNT = 6 * BUCKETS_PER_DECADE
+
+DEFAULT_DISTRIBUTION_TTL = 60
+
+
+def bucket_for(seconds):
+    """Faixa do histograma de um tempo de execução"""
+    if seconds <= MIN_RUNTIME:
+        return 0
+    index = int(math.log10(seconds / MIN_RUNTIME) * BUCKETS_PER_DECADE)
+    return min(index, BUCKET_COUNT - 1)
+
+
+def bucket_bounds(bucket):
+    """Limites (inferior, superior), em segundos, de uma faixa"""
+    lower = MIN_RUNTIME * 10 ** (bucket / BUCKETS_PER_DECADE)
+    upper = MIN_RUNTIME * 10 ** ((bucket + 1) / BUCKETS_PER_DECADE)
+    return lower, upper
+
+
+def record_runtime(challenge_id, seconds):
+    """Soma um aceite ao histograma do desafio"""
+    bucket = bucket_for(seconds)
+    with transaction.atomic():
+        RuntimeBucket.objects.get_or_create(challenge_id=challenge_id, bucket=bucket)
+        RuntimeBucket.objects.filter(
+            challenge_id=challenge_id, bucket=bucket
+        ).update(count=F('count') + 1)
+
+
+def _counts(challenge_id):
+    return dict(
+        RuntimeBucket.objects.filter(challenge_id=challenge_id, count__gt=0)
+        .values_list('bucket', 'count')
+    )
+
+
+def ranking_time(submission):
+    """
+    Tempo usado no histograma: o de CPU medido por teste e, em submissões
+    anteriores a essa medição, o tempo total de execução
+    """
+    if submission.cpu_time is not None:
+        return submission.cpu_time
+    return submission.execution_time
+
+
+def faster_than(challenge_id, seconds):
+    """
+    Porcentagem das outras soluções aceitas mais lentas que ``seconds``
+
+    Supõe que o próprio aceite já está no histograma.
+
+    Returns:
+        Porcentagem entre 0 e 100, ou None se não há outra solução aceita
+    """
+    counts = _counts(challenge_id)
+    others = sum(counts.values()) - 1
+    if others <= 0:
+        return None
+
+    bucket = bucket_for(seconds)
+    slower = sum(count for b, count in counts.items() if b > bucket)
+    # Os demais da mesma faixa contam como metade mais lentos, metade mais rápidos
+    same = max(counts.get(bucket, 0) - 1, 0)
+    return round(100 * (slower + same / 2) / others, 1)
+
+
+def submission_faster_than(submission):
+    """``faster_than`` de uma submissão aceita; None para as demais"""
+    seconds = ranking_time(submission)
+    if submission.status != 'accepted' or seconds is None:
+        return None
+    return faster_than(submission.challenge_id, seconds)
+
+
+def _distribution_key(challenge_id):
+    return f'runtimes:{challenge_id}'
+
+
+def distribution(challenge_id):
+    """
+    Histograma de tempos do desafio, do menor ao maior tempo registrado
+
+    Faixas vazias entre os extremos são incluídas para o gráfico ficar em
+    escala. Os limites vêm em milissegundos.
+    """
+    key = _distribution_key(challenge_id)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    counts = _counts(challenge_id)
+    buckets = []
+    if counts:
+        for bucket in range(min(counts), max(counts) + 1):
+            lower, upper = bucket_bounds(bucket)
+            buckets.append({
+                'bucket': bucket,
+                'lower_ms': round(lower * 1000, 3),
+                'upper_ms': round(upper * 1000, 3),
+                'count': counts.get(bucket, 0),
+            })
+    result = {'total': sum(counts.values()), 'buckets': buckets}
+    ttl = getattr(settings, 'RUNTIME_DISTRIBUTION_TTL', DEFAULT_DISTRIBUTION_TTL)
+    cache.set(key, result, ttl)
+    return result
+
+
+def rebuild_runtime_histograms(challenges=None):
+    """
+    Recalcula os histogramas a partir das submissões aceitas
+
+    Args:
+        challenges: QuerySet de desafios; por padrão, todos
+
+    Returns:
+        Número de faixas gravadas
+    """
+    if challenges is None:
+        challenges = Challenge.objects.all()
+    challenge_ids = list(challenges.values_list('id', flat=True))
+
+    counts = {}
+    times = Submission.objects.filter(
+        challenge_id__in=challenge_ids,
+        status='accepted'
+    ).annotate(
+        runtime=Coalesce('cpu_time', 'execution_time')
+    ).filter(runtime__isnull=False).values_list('challenge_id', 'runtime')
+    for challenge_id, seconds in times.iterator():
+        key = (challenge_id, bucket_for(seconds))
+        counts[key] = counts.get(key, 0) + 1
+
+    with transaction.atomic():
+        RuntimeBucket.objects.filter(challenge_id__in=challenge_ids).delete()
+        RuntimeBucket.objects.bulk_create(
+            [RuntimeBucket(challenge_id=challenge_id, bucket=bucket, count=count)
+             for (challenge_id, bucket), count in counts.items()],
+            batch_size=1000
+        )
+    cache.delete_many([_distribution_key(challenge_id) for challenge_id in challenge_ids])
+    return len(counts)
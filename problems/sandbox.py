@@ -0,0 +1,765 @@
+"""
+Pool de processos pré-criados (sandbox) para executar código dos usuários.
+
+Cada job é enviado a um processo filho através de um pipe. O filho executa
+``execute_code`` e devolve o resultado de cada teste assim que ele termina.
+Um processo é reciclado depois de ``SANDBOX_MAX_JOBS_PER_WORKER`` jobs ou
+quando morre durante a execução, de forma que um código malicioso nunca
+derruba o processo web. Se o filho estourar o tempo total da submissão
+(por exemplo, preso em código C que ignora sinais), o pai o mata.
+
+O limite de memória de cada job é aplicado no filho com ``RLIMIT_AS``,
+somado ao que o processo já ocupava antes de receber o job.
+
+O filho nasce de um fork do processo Django já inicializado. Antes do
+primeiro job ele larga as conexões de banco herdadas e apaga as
+configurações e variáveis de ambiente sensíveis (``SECRET_KEY``, senhas,
+tokens), para que o código do usuário não alcance nenhuma delas.
+
+O código é compilado no pai antes de ocupar um processo: erros de sintaxe
+retornam na hora e o filho recebe o bytecode pronto. O bytecode fica em um
+LRU do processo e no cache do Django, para que "Executar" (no processo web)
+e "Submeter" (no worker de avaliação) compilem o mesmo código uma vez só.
+"""
+import atexit
+import copy
+import json
+import marshal
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .code_executor import (
+    COMPILE_ERRORS,
+    DEFAULT_LIMITS,
+    CompiledCode,
+    compile_source,
+    execute_code,
+    source_digest,
+    syntax_error_result,
+    time_limit_result,
+    total_cpu_time,
+)
+from .lru import LRUCache
+
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_JOBS_PER_WORKER = 100
+
+# Folga dada ao filho antes de o pai matá-lo por tempo limite
+KILL_GRACE_SECONDS = 0.5
+
+CRASH_MESSAGE = 'O processo de execução foi encerrado inesperadamente'
+
+# Configurações e variáveis de ambiente apagadas no filho
+SENSITIVE_NAME = re.compile(r'SECRET|PASSWORD|PASSWD|TOKEN|API_KEY|CREDENTIAL|DATABASE_URL')
+
+DEFAULT_BYTECODE_CACHE_SIZE = 512
+DEFAULT_BYTECODE_MAX_SOURCE = 100 * 1024
+BYTECODE_CACHE_TIMEOUT = 60 * 60
+
+# O formato do marshal muda entre versões do Python
+_BYTECODE_KEY_PREFIX = 'bytecode:%d.%d' % sys.version_info[:2]
+
+_bytecode = LRUCache(getattr(settings, 'BYTECODE_CACHE_SIZE', DEFAULT_BYTECODE_CACHE_SIZE))
+
+
+def compile_code(code):
+    """
+    Compila o código do usuário consultando os caches de bytecode
+
+    Levanta um dos ``COMPILE_ERRORS`` se o código for inválido; erros não
+    são guardados em cache.
+    """
+    digest = source_digest(code)
+    compiled = _bytecode.get(digest)
+    if compiled is not None:
+        return compiled
+
+    key = f'{_BYTECODE_KEY_PREFIX}:{digest}'
+    marshaled = cache.get(key)
+    if marshaled is not None:
+        compiled = CompiledCode(digest, marshal.loads(marshaled), marshaled)
+    else:
+        compiled = compile_source(code)
+        cache.set(key, compiled.marshaled, BYTECODE_CACHE_TIMEOUT)
+
+    max_source = getattr(settings, 'BYTECODE_MAX_SOURCE', DEFAULT_BYTECODE_MAX_SOURCE)
+    if len(code) <= max_source:
+        _bytecode.set(digest, compiled)
+    return compiled
+
+
+class SandboxCrash(Exception):
+    """Exceção para quando o processo filho morre durante um job"""
+    pass
+
+
+class SandboxTimeout(Exception):
+    """Exceção para quando o processo filho excede o tempo total do job"""
+    pass
+
+
+def _transferable(value):
+    """Garante que o valor possa ser enviado pelo pipe e serializado em JSON"""
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def _current_address_space():
+    """Tamanho atual do espaço de endereçamento do processo, em bytes"""
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[0])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+class MemoryLimit:
+    """Aplica ``RLIMIT_AS`` durante um job e restaura o limite anterior"""
+
+    def __init__(self, megabytes):
+        self.megabytes = megabytes
+        self.previous = None
+
+    def __enter__(self):
+        baseline = _current_address_space()
+        if resource is None or not self.megabytes or baseline is None:
+            return self
+        self.previous = resource.getrlimit(resource.RLIMIT_AS)
+        soft = baseline + int(self.megabytes * 1024 * 1024)
+        hard = self.previous[1]
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.previous is not None:
+            resource.setrlimit(resource.RLIMIT_AS, self.previous)
+        return False
+
+
+def _forget_connections():
+    """Larga as conexões de banco herdadas do pai sem encerrá-las"""
+    for connection in connections.all(initialized_only=True):
+        raw = connection.connection
+        if raw is None:
+            continue
+        fileno = getattr(raw, 'fileno', None)
+        if fileno is not None:
+            # Fechar pelo driver avisaria o servidor e derrubaria a sessão
+            # do pai; o socket herdado passa a apontar para /dev/null
+            devnull = os.open(os.devnull, os.O_RDWR)
+            os.dup2(devnull, fileno())
+            os.close(devnull)
+        else:
+            # SQLite: fechar no filho só libera os descritores do filho
+            raw.close()
+        connection.connection = None
+
+
+def _scrub_settings():
+    """Apaga as configurações e variáveis de ambiente sensíveis"""
+    settings_module = sys.modules.get(settings.SETTINGS_MODULE)
+    for name in dir(settings._wrapped):
+        if name.isupper() and SENSITIVE_NAME.search(name):
+            setattr(settings, name, None)
+            if settings_module is not None and hasattr(settings_module, name):
+                setattr(settings_module, name, None)
+    # Os dicionários são os mesmos usados pelas conexões (settings_dict)
+    for database in settings.DATABASES.values():
+        for key in database:
+            if SENSITIVE_NAME.search(key):
+                database[key] = ''
+    for key in list(os.environ):
+        if SENSITIVE_NAME.search(key.upper()):
+            del os.environ[key]
+
+
+def _isolate_worker():
+    """Prepara o filho recém-criado para executar código não confiável"""
+    _forget_connections()
+    _scrub_settings()
+
+
+def _worker_main(conn):
+    """Loop principal do processo filho: recebe jobs e devolve resultados"""
+    _isolate_worker()
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        if job is None:
+            break
+
+        def send_test_result(test_result):
+            test_result = dict(test_result, actual=_transferable(test_result['actual']))
+            conn.send(('test', test_result))
+
+        with MemoryLimit(job['limits'].get('memory_limit')):
+            result = execute_code(
+                marshal.loads(job['bytecode']),
+                job['test_cases'],
+                job['function_name'],
+                limits=job['limits'],
+                on_test_result=send_test_result,
+                scaling=job.get('scaling'),
+                comparison=job.get('comparison'),
+            )
+        # Os resultados dos testes já foram enviados um a um
+        result['test_results'] = []
+        conn.send(('done', result))
+
+    conn.close()
+
+
+class SandboxWorker:
+    """Processo filho pré-aquecido ligado ao pai por um pipe"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs_done = 0
+
+    def send_job(self, job):
+        """Envia um job ao filho sem esperar pelo resultado"""
+        self.test_results = []
+        try:
+            self.conn.send(job)
+        except (OSError, BrokenPipeError) as e:
+            raise SandboxCrash(str(e))
+
+    def receive(self):
+        """
+        Recebe a próxima mensagem do filho
+
+        Returns:
+            ('test', resultado do teste) ou ('done', resultado final)
+        """
+        try:
+            kind, payload = self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise SandboxCrash(str(e))
+        if kind == 'test':
+            self.test_results.append(payload)
+        else:
+            payload['test_results'] = self.test_results
+            self.jobs_done += 1
+        return kind, payload
+
+    def run(self, job, timeout=None, on_test_result=None):
+        """
+        Envia um job ao filho e espera pelo resultado
+
+        Os resultados parciais ficam em ``self.test_results`` para que o
+        chamador saiba até onde o filho chegou se ele morrer ou travar.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.send_job(job)
+        while True:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.conn.poll(remaining):
+                    raise SandboxTimeout()
+            kind, payload = self.receive()
+            if kind == 'done':
+                return payload
+            if on_test_result is not None:
+                on_test_result(payload)
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def stop(self):
+        """Encerra o filho educadamente e, se necessário, à força"""
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self):
+        """Mata o filho imediatamente"""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SandboxPool:
+    """Pool de processos filhos reutilizáveis"""
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, max_jobs_per_worker=DEFAULT_MAX_JOBS_PER_WORKER):
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._acquire_many_lock = threading.Lock()
+        self._closed = False
+
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        worker = SandboxWorker(self.context)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _retire(self, worker, force=False):
+        with self._lock:
+            self._workers.discard(worker)
+        if force:
+            worker.kill()
+        else:
+            worker.stop()
+
+    def _acquire(self):
+        return self._idle.get()
+
+    def _acquire_many(self, count):
+        """Pega vários workers de uma vez"""
+        # Um chamador por vez: dois chamadores segurando metade dos workers
+        # cada um ficariam esperando um pelo outro para sempre
+        with self._acquire_many_lock:
+            return [self._acquire() for _ in range(count)]
+
+    def _replace(self, worker):
+        """Mata um worker e retorna um novo no lugar dele"""
+        self._retire(worker, force=True)
+        return self._spawn()
+
+    def _release(self, worker):
+        """Devolve o worker ao pool, reciclando-o se necessário"""
+        if self._closed:
+            self._retire(worker)
+            return
+        if not worker.is_alive():
+            self._retire(worker, force=True)
+            worker = self._spawn()
+        elif worker.jobs_done >= self.max_jobs_per_worker:
+            self._retire(worker)
+            worker = self._spawn()
+        self._idle.put(worker)
+
+    def execute(self, code, test_cases, function_name='solution', limits=None,
+                on_test_result=None, scaling=None, comparison=None):
+        """Executa o código em um processo filho e retorna o resultado"""
+        try:
+            compiled = compile_code(code)
+        except COMPILE_ERRORS as e:
+            return syntax_error_result(e)
+
+        test_cases = list(test_cases)
+        limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        job = {
+            'bytecode': compiled.marshaled,
+            'test_cases': test_cases,
+            'function_name': function_name,
+            'limits': limits,
+            'scaling': scaling,
+            'comparison': comparison,
+        }
+
+        start_time = time.monotonic()
+        worker = self._acquire()
+        try:
+            result = worker.run(
+                job,
+                timeout=limits['total_time_limit'] + KILL_GRACE_SECONDS,
+                on_test_result=on_test_result,
+            )
+            if result['status'] == 'memory_limit':
+                # O heap do filho pode ter ficado fragmentado; recicla
+                worker.jobs_done = self.max_jobs_per_worker
+            return result
+        except SandboxTimeout:
+            self._retire(worker, force=True)
+            test_results = worker.test_results
+            worker = self._spawn()
+            return self._time_limit_result(
+                test_cases, test_results, time.monotonic() - start_time, on_test_result
+            )
+        except SandboxCrash:
+            self._retire(worker, force=True)
+            test_results = worker.test_results
+            worker = self._spawn()
+            return {
+                'status': 'runtime_error',
+                'message': CRASH_MESSAGE,
+                'test_results': test_results,
+                'execution_time': 0,
+                'failed_test': len(test_results) + 1,
+            }
+        except BaseException:
+            # O callback falhou com o filho no meio do job: as mensagens que
+            # ainda estão no pipe iriam parar na próxima submissão
+            worker = self._replace(worker)
+            raise
+        finally:
+            self._release(worker)
+
+    def execute_parallel(self, code, test_cases, function_name='solution', shards=2,
+                         limits=None, on_test_result=None, scaling=None, comparison=None):
+        """
+        Executa os casos de teste divididos entre vários processos
+
+        O resultado é o mesmo de ``execute``: os testes voltam em ordem e a
+        falha reportada é sempre a primeira da execução sequencial. O teste
+        de escala, se houver, roda depois em um processo só.
+        """
+        test_cases = list(test_cases)
+        shards = min(shards, self.size, len(test_cases))
+        if shards <= 1:
+            return self.execute(
+                code, test_cases, function_name, limits, on_test_result, scaling, comparison
+            )
+
+        try:
+            compiled = compile_code(code)
+        except COMPILE_ERRORS as e:
+            return syntax_error_result(e)
+
+        result = ShardedRun(
+            self, compiled, test_cases, function_name, shards, limits, on_test_result,
+            comparison
+        ).run()
+        if scaling and result['status'] == 'accepted':
+            scaled = self.execute(code, [], function_name, limits, scaling=scaling)
+            for key in ('status', 'message', 'failed_test', 'scaling'):
+                if key in scaled:
+                    result[key] = scaled[key]
+            result['execution_time'] = round(
+                result['execution_time'] + scaled['execution_time'], 3
+            )
+        return result
+
+    def _time_limit_result(self, test_cases, test_results, elapsed, on_test_result):
+        """Resultado de um job cujo processo foi morto por tempo limite"""
+        test_number = len(test_results) + 1
+        result = time_limit_result(test_number)
+        if test_number <= len(test_cases):
+            test_case = test_cases[test_number - 1]
+            test_result = {
+                'test_number': test_number,
+                'passed': False,
+                'input': test_case['input_data'],
+                'expected': test_case['expected_output'],
+                'actual': None,
+                'error': 'Tempo limite excedido'
+            }
+            test_results.append(test_result)
+            if on_test_result is not None:
+                on_test_result(test_result)
+        else:
+            result = time_limit_result(None, 'Tempo limite excedido')
+        result['test_results'] = test_results
+        result['execution_time'] = round(elapsed, 3)
+        return result
+
+    def close(self):
+        """Encerra todos os processos do pool"""
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            self._retire(worker)
+
+
+class _Shard:
+    """Estado de um pedaço da suíte de testes em execução em um worker"""
+
+    def __init__(self, worker, test_numbers):
+        self.worker = worker
+        self.pending = deque(test_numbers)
+        self.failed = False
+
+
+class ShardedRun:
+    """
+    Execução de uma submissão dividida entre vários processos
+
+    Os testes são distribuídos de forma intercalada (o processo k recebe os
+    testes k, k + n, k + 2n...) para que todos avancem juntos pelos primeiros
+    testes. Quando um teste falha, os processos que ainda têm testes
+    anteriores a ele continuam até passar desse ponto e os demais são
+    cancelados. Assim a falha reportada é sempre a primeira da execução
+    sequencial.
+    """
+
+    def __init__(self, pool, compiled, test_cases, function_name, shards, limits,
+                 on_test_result, comparison=None):
+        self.pool = pool
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.on_test_result = on_test_result
+        self.test_cases = [
+            dict(test_case, test_number=i + 1) for i, test_case in enumerate(test_cases)
+        ]
+        self.jobs = [
+            {
+                'bytecode': compiled.marshaled,
+                'test_cases': self.test_cases[k::shards],
+                'function_name': function_name,
+                'limits': self.limits,
+                'comparison': comparison,
+            }
+            for k in range(shards)
+        ]
+        self.results = {}
+        # número do teste que falhou -> dict com status e mensagem (ou None
+        # enquanto o resultado final do processo não chegou). O número 0
+        # representa falhas ao carregar o código, antes de qualquer teste.
+        self.failures = {}
+        self.outputs = []
+        self.next_to_emit = 1
+
+    def run(self):
+        start_time = time.monotonic()
+        deadline = start_time + self.limits['total_time_limit'] + KILL_GRACE_SECONDS
+        workers = self.pool._acquire_many(len(self.jobs))
+        active = {}
+        finished = []
+
+        try:
+            for worker, job in zip(workers, self.jobs):
+                shard = _Shard(worker, [tc['test_number'] for tc in job['test_cases']])
+                try:
+                    worker.send_job(job)
+                except SandboxCrash:
+                    self._crashed(shard, finished)
+                    continue
+                active[worker.conn] = shard
+
+            while active:
+                self._cancel_unneeded(active, finished)
+                if not active:
+                    break
+
+                remaining = deadline - time.monotonic()
+                ready = wait(list(active), timeout=remaining) if remaining > 0 else []
+                if not ready:
+                    self._timed_out(active, finished)
+                    break
+
+                for conn in ready:
+                    shard = active[conn]
+                    try:
+                        kind, payload = shard.worker.receive()
+                    except SandboxCrash:
+                        del active[conn]
+                        self._crashed(shard, finished)
+                        continue
+
+                    if kind == 'test':
+                        shard.pending.popleft()
+                        self.results[payload['test_number']] = payload
+                        if not payload['passed']:
+                            shard.failed = True
+                            self.failures.setdefault(payload['test_number'], None)
+                    else:
+                        del active[conn]
+                        finished.append(shard.worker)
+                        self.outputs.append(payload.get('output', ''))
+                        if payload['status'] != 'accepted':
+                            self.failures[payload.get('failed_test') or 0] = payload
+                        if payload['status'] == 'memory_limit':
+                            shard.worker.jobs_done = self.pool.max_jobs_per_worker
+
+                self._emit_in_order()
+        finally:
+            # Sobram processos ativos se o callback levantar uma exceção: estão
+            # no meio do job e não podem voltar ao pool
+            for shard in active.values():
+                finished.append(self.pool._replace(shard.worker))
+            for worker in finished:
+                self.pool._release(worker)
+
+        return self._merge(time.monotonic() - start_time)
+
+    def _first_failure(self):
+        return min(self.failures) if self.failures else None
+
+    def _cancel_unneeded(self, active, finished):
+        """Cancela processos cujos testes restantes vêm depois da falha"""
+        first_failure = self._first_failure()
+        if first_failure is None:
+            return
+        for conn, shard in list(active.items()):
+            if not shard.failed and shard.pending and shard.pending[0] > first_failure:
+                del active[conn]
+                finished.append(self.pool._replace(shard.worker))
+
+    def _crashed(self, shard, finished):
+        """Registra a falha de um processo que morreu"""
+        finished.append(self.pool._replace(shard.worker))
+        if shard.pending and not shard.failed:
+            test_number = shard.pending[0]
+            self._synthesize_failure(test_number, 'Processo encerrado inesperadamente', {
+                'status': 'runtime_error',
+                'message': CRASH_MESSAGE,
+            })
+
+    def _timed_out(self, active, finished):
+        """Mata os processos ainda ativos quando o tempo total acaba"""
+        for shard in active.values():
+            finished.append(self.pool._replace(shard.worker))
+            if shard.pending and not shard.failed:
+                test_number = shard.pending[0]
+                self._synthesize_failure(
+                    test_number, 'Tempo limite excedido', time_limit_result(test_number)
+                )
+        active.clear()
+
+    def _synthesize_failure(self, test_number, error, info):
+        test_case = self.test_cases[test_number - 1]
+        self.results[test_number] = {
+            'test_number': test_number,
+            'passed': False,
+            'input': test_case['input_data'],
+            'expected': test_case['expected_output'],
+            'actual': None,
+            'error': error
+        }
+        self.failures[test_number] = info
+
+    def _emit_in_order(self):
+        """Repassa os resultados ao callback na ordem dos testes"""
+        first_failure = self._first_failure()
+        while self.next_to_emit in self.results:
+            if first_failure is not None and self.next_to_emit > first_failure:
+                break
+            if self.on_test_result is not None:
+                self.on_test_result(self.results[self.next_to_emit])
+            self.next_to_emit += 1
+
+    def _merge(self, elapsed):
+        """Junta os resultados dos processos como em uma execução sequencial"""
+        first_failure = self._first_failure()
+        self._emit_in_order()
+
+        if first_failure is None:
+            result = {
+                'status': 'accepted',
+                'message': 'Todos os testes passaram!',
+                'failed_test': None,
+            }
+            last = len(self.test_cases)
+        else:
+            info = self.failures[first_failure]
+            if info is None:
+                # O processo que falhou foi interrompido antes de informar
+                # o resultado final; deduz do resultado do teste
+                failed = self.results[first_failure]
+                status = 'runtime_error' if failed['error'] else 'wrong_answer'
+                info = {'status': status, 'message': f'Teste {first_failure} falhou'}
+            result = {
+                'status': info['status'],
+                'message': info['message'],
+                'failed_test': first_failure or None,
+            }
+            last = first_failure
+
+        result['test_results'] = [
+            self.results[number] for number in range(1, last + 1) if number in self.results
+        ]
+        result['execution_time'] = round(elapsed, 3)
+        result['cpu_time'] = total_cpu_time(result['test_results'])
+        result['output'] = ''.join(self.outputs)
+        return result
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Retorna o pool do processo atual, criando-o se necessário"""
+    global _pool
+    with _pool_lock:
+        # Um pool herdado via fork (ex.: gunicorn --preload) não pode ser usado
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = SandboxPool(
+                size=getattr(settings, 'SANDBOX_POOL_SIZE', DEFAULT_POOL_SIZE),
+                max_jobs_per_worker=getattr(
+                    settings, 'SANDBOX_MAX_JOBS_PER_WORKER', DEFAULT_MAX_JOBS_PER_WORKER
+                ),
+            )
+        return _pool
+
+
+def shutdown_pool():
+    """Encerra o pool do processo atual"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close()
+        _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def run_in_sandbox(code, test_cases, function_name='solution', limits=None,
+                   on_test_result=None, shards=1, scaling=None, comparison=None):
+    """
+    Executa o código do usuário isolado em um processo do pool
+
+    Com ``shards > 1`` os casos de teste são divididos entre vários
+    processos. ``scaling`` é o teste de escala do desafio (ver scaling.py)
+    e ``comparison``, o comparador da saída (ver comparators.py). Com
+    ``SANDBOX_ENABLED = False`` o código é executado no próprio processo,
+    o que é útil apenas em desenvolvimento: fora da thread principal os
+    limites de tempo não são aplicados.
+    """
+    if not getattr(settings, 'SANDBOX_ENABLED', True):
+        # Sem o pipe não há cópia: o código do usuário não pode alterar
+        # os casos de teste compartilhados do cache
+        test_cases = copy.deepcopy(list(test_cases))
+        try:
+            compiled = compile_code(code)
+        except COMPILE_ERRORS as e:
+            return syntax_error_result(e)
+        return execute_code(
+            compiled.code_object, test_cases, function_name, limits, on_test_result,
+            scaling, comparison
+        )
+    pool = get_pool()
+    if shards > 1:
+        return pool.execute_parallel(
+            code, test_cases, function_name, shards, limits, on_test_result, scaling,
+            comparison
+        )
+    return pool.execute(
+        code, test_cases, function_name, limits, on_test_result, scaling, comparison
+    )
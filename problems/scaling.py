@@ -0,0 +1,97 @@
+"""
+Teste de escala: verificação empírica da complexidade de tempo.
+
+Os casos de teste escritos à mão são pequenos e não separam uma solução
+O(n²) de uma O(n log n). Um desafio com ``expected_complexity`` e um
+``scaling_generator`` (código com ``generate(n)``, que devolve os argumentos
+da função para uma entrada de tamanho n) ganha um teste extra: depois que
+todos os casos passam, o executor mede o tempo da função nos tamanhos
+n, 2n, 4n... e ajusta a curva de crescimento (ver complexity.py). Se ela
+passar da classe declarada, o veredito é ``time_limit``.
+
+As entradas geradas podem ser grandes, então são construídas uma vez por
+processo e guardadas em um LRU, válidas enquanto o desafio não mudar. O
+gerador é código do autor do desafio e roda no próprio processo do
+avaliador; para resultados reprodutíveis ele deve usar ``random.Random(n)``
+em vez do ``random`` global.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+
+from .complexity import DEFAULT_TOLERANCE
+from .lru import LRUCache
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 16
+
+_inputs = LRUCache(getattr(settings, 'SCALING_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+
+
+class GeneratorError(Exception):
+    """Erro no gerador de entradas do desafio"""
+    pass
+
+
+def _inputs_key(challenge):
+    generator = hashlib.sha256(challenge.scaling_generator.encode('utf-8')).hexdigest()
+    return (challenge.updated_at, generator, tuple(challenge.get_scaling_sizes()))
+
+
+def build_scaling_inputs(challenge):
+    """
+    Executa o gerador do desafio em cada tamanho
+
+    Returns:
+        Tupla de pares (tamanho, argumentos)
+
+    Raises:
+        GeneratorError: se o gerador não definir ``generate`` ou falhar
+    """
+    namespace = {}
+    try:
+        exec(compile(challenge.scaling_generator, '<generator>', 'exec'), namespace)
+        generate = namespace['generate']
+        return tuple((size, generate(size)) for size in challenge.get_scaling_sizes())
+    except Exception as e:
+        raise GeneratorError(f'Gerador de entradas inválido: {e}') from e
+
+
+def get_scaling_inputs(challenge):
+    """Entradas do teste de escala, do cache quando possível"""
+    key = _inputs_key(challenge)
+    cached = _inputs.get(challenge.id)
+    if cached is None or cached[0] != key:
+        cached = (key, build_scaling_inputs(challenge))
+        _inputs.set(challenge.id, cached)
+    return cached[1]
+
+
+def get_scaling_job(challenge):
+    """
+    Parâmetros do teste de escala no formato do executor
+
+    Returns:
+        dict com 'inputs', 'complexity' e 'tolerance', ou None se o desafio
+        não tem teste de escala ou o gerador está com erro (registrado no log)
+    """
+    if not challenge.has_scaling_test:
+        return None
+    try:
+        inputs = get_scaling_inputs(challenge)
+    except GeneratorError:
+        logger.exception('Teste de escala ignorado no desafio %s', challenge.slug)
+        return None
+    return {
+        'inputs': inputs,
+        'complexity': challenge.expected_complexity,
+        'tolerance': getattr(settings, 'SCALING_TOLERANCE', DEFAULT_TOLERANCE),
+    }
+
+
+def invalidate(challenge_id):
+    """Descarta as entradas geradas de um desafio neste processo"""
+    _inputs.discard(challenge_id)
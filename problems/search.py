@@ -0,0 +1,127 @@
+"""
+Busca textual de desafios.
+
+Usa o índice invertido do banco em vez de ``LIKE '%termo%'``:
+
+- PostgreSQL: coluna gerada ``search_vector`` (tsvector) com índice GIN,
+  ordenada por ``ts_rank``;
+- SQLite: tabela FTS5 ``problems_challenge_fts`` de conteúdo externo,
+  ordenada por ``bm25``.
+
+Ambos são criados na migração 0013 e mantidos pelo próprio banco (coluna
+gerada / triggers), então qualquer escrita em ``Challenge`` já atualiza o
+índice. O título pesa mais que a descrição e o último termo digitado casa
+por prefixo. Sem índice disponível, a busca cai para ``icontains``.
+
+Na SQLite, migrações que adicionam ou alteram colunas de ``Challenge``
+recriam a tabela e perdem os triggers; elas precisam recriar o índice em
+seguida (ver a migração 0019).
+"""
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Challenge
+
+
+FTS_TABLE = 'problems_challenge_fts'
+PG_CONFIG = 'portuguese'
+
+MAX_TERMS = 10
+
+# Pesos do título e da descrição no bm25
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+_fts_available = {}
+
+
+def search_terms(query):
+    """Quebra a busca em palavras, descartando operadores e pontuação"""
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def _backend(connection):
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite':
+        if connection.alias not in _fts_available:
+            with connection.cursor() as cursor:
+                tables = connection.introspection.table_names(cursor)
+            _fts_available[connection.alias] = FTS_TABLE in tables
+        if _fts_available[connection.alias]:
+            return 'sqlite'
+    return None
+
+
+def _sqlite_match(terms):
+    # Cada termo entre aspas para neutralizar a sintaxe do FTS5
+    match = ' '.join(f'"{term}"' for term in terms[:-1])
+    return f'{match} "{terms[-1]}"*'.strip()
+
+
+def _sqlite_ranking(terms):
+    match = _sqlite_match(terms)
+    table = Challenge._meta.db_table
+    matches = RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]
+    )
+    # bm25 já é menor para os mais relevantes
+    rank = RawSQL(
+        f'(SELECT bm25({FTS_TABLE}, %s, %s) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id)',
+        [TITLE_WEIGHT, DESCRIPTION_WEIGHT, match],
+        output_field=FloatField()
+    )
+    return matches, rank
+
+
+def _postgresql_ranking(terms):
+    tsquery = ' & '.join(terms[:-1] + [f'{terms[-1]}:*'])
+    table = Challenge._meta.db_table
+    matches = RawSQL(
+        f'SELECT id FROM {table} WHERE search_vector @@ to_tsquery(%s, %s)',
+        [PG_CONFIG, tsquery]
+    )
+    # Negativo para que a ordem crescente vá do mais relevante ao menos
+    rank = RawSQL(
+        f'(-ts_rank({table}.search_vector, to_tsquery(%s, %s)))',
+        [PG_CONFIG, tsquery],
+        output_field=FloatField()
+    )
+    return matches, rank
+
+
+def filter_challenges(queryset, query):
+    """
+    Filtra ``queryset`` pela busca
+
+    A busca no índice entra na mesma consulta que os outros filtros do
+    queryset (ex.: dificuldade), sem limite de candidatos: a paginação por
+    chave percorre todos os resultados.
+
+    Returns:
+        Tupla (queryset, ranked). Com ``ranked`` o queryset já vem ordenado
+        por relevância, com a relevância de cada desafio em ``search_rank``
+        (menor é melhor; ver ``pagination.paginate_ranked``); sem índice de
+        busca é só o filtro ``icontains``.
+    """
+    backend = _backend(connections[queryset.db])
+    if backend is None:
+        return queryset.filter(
+            Q(title__icontains=query) | Q(description__icontains=query)
+        ), False
+
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none(), True
+
+    if backend == 'postgresql':
+        matches, rank = _postgresql_ranking(terms)
+    else:
+        matches, rank = _sqlite_ranking(terms)
+    return queryset.filter(id__in=matches).annotate(
+        search_rank=rank
+    ).order_by('search_rank', 'id'), True
@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .models import Challenge, CodeBlob, Submission, UserProfile, TestCase
+from . import page_cache, test_suites, verdict_cache
 
 
 @receiver(post_save, sender=User)
@@ -12,8 +14,37 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    """Salva o perfil quando o usuário é salvo"""
-    if hasattr(instance, 'userprofile'):
-        instance.userprofile.save()
+def save_user_profile(sender, instance, created, update_fields=None, **kwargs):
+    """Garante que usuários criados antes dos perfis também tenham um"""
+    # O perfil não copia nada do usuário: regravá-lo a cada save (ex.: no
+    # login) só gastaria escritas e poderia sobrescrever os contadores
+    # atualizados com F() pelo avaliador
+    if created or update_fields:
+        return
+    UserProfile.objects.get_or_create(user=instance)
 
+
+@receiver(post_save, sender=TestCase)
+@receiver(post_delete, sender=TestCase)
+def invalidate_test_suite_caches(sender, instance, **kwargs):
+    """Descarta os caches que dependem dos casos de teste do desafio"""
+    # A nova revisão invalida a suíte em cache também nos outros processos
+    Challenge.objects.filter(id=instance.challenge_id).update(
+        test_suite_revision=F('test_suite_revision') + 1
+    )
+    test_suites.invalidate(instance.challenge_id)
+    verdict_cache.invalidate_challenge(instance.challenge_id)
+
+
+@receiver(post_save, sender=Challenge)
+@receiver(post_delete, sender=Challenge)
+def invalidate_cached_pages(sender, instance, **kwargs):
+    """Descarta as páginas em cache que listam desafios"""
+    page_cache.invalidate()
+
+
+@receiver(post_delete, sender=Submission)
+def release_code_blob(sender, instance, **kwargs):
+    """Libera o código da submissão removida"""
+    if instance.code_blob_id is not None:
+        CodeBlob.objects.release(instance.code_blob_id)
@@ -0,0 +1,211 @@
+"""
+Contadores desnormalizados dos desafios.
+
+``solved_count``, ``attempt_count`` e ``accepted_count`` ficam gravados no
+próprio desafio para que as listagens não precisem agregar a tabela de
+submissões a cada linha. O avaliador atualiza os contadores com ``F()``
+quando grava um veredito; ``manage.py rebuild_stats`` recalcula tudo a partir
+das submissões.
+
+Os desafios resolvidos por cada usuário ficam em ``UserSolved``, uma linha
+por (usuário, desafio), criada no primeiro aceite.
+
+Os totais da home (``COUNT(*)`` de desafios, usuários e submissões) ficam no
+cache do Django. Depois de ``HOME_STATS_TTL`` o valor antigo continua sendo
+servido enquanto uma thread recalcula (stale-while-revalidate); só um cache
+vazio faz a requisição esperar pelas contagens. ``manage.py refresh_stats``
+recalcula sob demanda, para uso em um cron.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q
+
+from . import leaderboard
+from .models import Challenge, Submission, UserProfile, UserSolved
+
+
+logger = logging.getLogger(__name__)
+
+HOME_STATS_KEY = 'stats:home'
+HOME_STATS_LOCK_KEY = 'stats:home:refreshing'
+DEFAULT_HOME_STATS_TTL = 60
+DEFAULT_HOME_STATS_STALE_TTL = 600
+# Tempo máximo de uma atualização; depois disso outra pode começar
+REFRESH_LOCK_TIMEOUT = 30
+
+# Submissões ainda não avaliadas não contam como tentativa
+JUDGED = ~Q(submission__status__in=('pending', 'running'))
+
+
+def record_verdict(challenge, status, first_accept=False):
+    """Contabiliza um veredito nos contadores do desafio"""
+    counters = {'attempt_count': F('attempt_count') + 1}
+    if status == 'accepted':
+        counters['accepted_count'] = F('accepted_count') + 1
+    if first_accept:
+        counters['solved_count'] = F('solved_count') + 1
+    Challenge.objects.filter(pk=challenge.pk).update(**counters)
+
+
+def record_accept(submission):
+    """
+    Registra um aceite no conjunto de desafios resolvidos do usuário
+
+    O primeiro aceite é decidido pela restrição única de ``UserSolved``:
+    duas avaliações simultâneas não conseguem inserir a mesma linha.
+
+    Returns:
+        True se foi o primeiro aceite do usuário neste desafio
+    """
+    accepted_at = submission.finished_at or submission.submitted_at
+    try:
+        with transaction.atomic():
+            UserSolved.objects.create(
+                user_id=submission.user_id,
+                challenge_id=submission.challenge_id,
+                first_accepted_at=accepted_at,
+                best_time=submission.execution_time
+            )
+    except IntegrityError:
+        if submission.execution_time is not None:
+            UserSolved.objects.filter(
+                Q(best_time__isnull=True) | Q(best_time__gt=submission.execution_time),
+                user_id=submission.user_id,
+                challenge_id=submission.challenge_id
+            ).update(best_time=submission.execution_time)
+        return False
+
+    UserProfile.objects.filter(user_id=submission.user_id).update(
+        challenges_solved=F('challenges_solved') + 1
+    )
+    leaderboard.record_first_accept(
+        submission.user_id, submission.challenge.difficulty, accepted_at
+    )
+    return True
+
+
+def solved_challenge_ids(user, challenge_ids=None):
+    """
+    Conjunto com os ids dos desafios resolvidos pelo usuário
+
+    Args:
+        user: Usuário (anônimo resulta em conjunto vazio)
+        challenge_ids: Restringe a consulta a estes desafios, ex.: os da página
+    """
+    if not user.is_authenticated:
+        return set()
+    solved = UserSolved.objects.filter(user=user)
+    if challenge_ids is not None:
+        solved = solved.filter(challenge_id__in=challenge_ids)
+    return set(solved.values_list('challenge_id', flat=True))
+
+
+def rebuild_challenge_stats(challenges=None):
+    """
+    Recalcula os contadores a partir das submissões
+
+    Args:
+        challenges: QuerySet de desafios; por padrão, todos
+
+    Returns:
+        Número de desafios atualizados
+    """
+    if challenges is None:
+        challenges = Challenge.objects.all()
+
+    accepted = Q(submission__status='accepted')
+    rows = challenges.annotate(
+        new_attempt_count=Count('submission', filter=JUDGED),
+        new_accepted_count=Count('submission', filter=accepted),
+        new_solved_count=Count('submission__user', filter=accepted, distinct=True),
+    )
+
+    updated = []
+    for challenge in rows:
+        challenge.attempt_count = challenge.new_attempt_count
+        challenge.accepted_count = challenge.new_accepted_count
+        challenge.solved_count = challenge.new_solved_count
+        updated.append(challenge)
+
+    Challenge.objects.bulk_update(
+        updated, ['attempt_count', 'accepted_count', 'solved_count'], batch_size=500
+    )
+    return len(updated)
+
+
+def rebuild_profile_stats():
+    """
+    Recalcula ``UserProfile.challenges_solved`` a partir de ``UserSolved``
+
+    Returns:
+        Número de perfis corrigidos
+    """
+    solved = dict(
+        UserSolved.objects.values_list('user_id').annotate(total=Count('id')).order_by()
+    )
+    profiles = []
+    for profile in UserProfile.objects.only('id', 'user_id', 'challenges_solved'):
+        total = solved.get(profile.user_id, 0)
+        if profile.challenges_solved != total:
+            profile.challenges_solved = total
+            profiles.append(profile)
+
+    UserProfile.objects.bulk_update(profiles, ['challenges_solved'], batch_size=500)
+    return len(profiles)
+
+
+def compute_home_stats():
+    """Conta desafios, usuários e submissões"""
+    return {
+        'challenges_count': Challenge.objects.count(),
+        'users_count': UserProfile.objects.count(),
+        'submissions_count': Submission.objects.count(),
+    }
+
+
+def refresh_home_stats():
+    """Recalcula os totais da home e grava no cache"""
+    ttl = getattr(settings, 'HOME_STATS_TTL', DEFAULT_HOME_STATS_TTL)
+    stale_ttl = getattr(settings, 'HOME_STATS_STALE_TTL', DEFAULT_HOME_STATS_STALE_TTL)
+    values = compute_home_stats()
+    cache.set(
+        HOME_STATS_KEY,
+        {'values': values, 'fresh_until': time.time() + ttl},
+        ttl + stale_ttl
+    )
+    return values
+
+
+def _refresh_in_background():
+    def refresh():
+        try:
+            refresh_home_stats()
+        except Exception:
+            logger.exception('Erro ao atualizar as estatísticas da home')
+        finally:
+            cache.delete(HOME_STATS_LOCK_KEY)
+            connection.close()
+
+    threading.Thread(target=refresh, name='home-stats-refresh', daemon=True).start()
+
+
+def get_home_stats():
+    """
+    Totais exibidos na home
+
+    Serve o valor em cache mesmo vencido e dispara a atualização em segundo
+    plano; ``cache.add`` garante uma só atualização por vez.
+    """
+    entry = cache.get(HOME_STATS_KEY)
+    if entry is None:
+        return refresh_home_stats()
+
+    if entry['fresh_until'] <= time.time():
+        if cache.add(HOME_STATS_LOCK_KEY, True, REFRESH_LOCK_TIMEOUT):
+            _refresh_in_background()
+    return entry['values']
@@ -0,0 +1,93 @@
+"""
+Casos de teste grandes guardados em arquivo, fora do banco.
+
+Um ``TestCase`` com ``data_file`` não tem a entrada e a saída esperada no
+banco: elas ficam em um arquivo JSON Lines sob ``TEST_DATA_ROOT``, com a
+entrada (argumentos da função) na primeira linha e a saída esperada na
+segunda. O nome do arquivo é o SHA-256 do conteúdo, então um arquivo nunca
+muda depois de gravado e casos iguais dividem o mesmo arquivo.
+
+A suíte de testes em cache e o job do sandbox levam só o caminho; quem lê e
+decodifica os dados é o processo filho, com ``mmap`` somente leitura. As
+páginas do arquivo ficam no cache do sistema operacional, compartilhadas
+entre os processos do pool, e os dados não passam pelo banco, pelo processo
+web nem pelo pipe.
+
+Não depende do Django: roda no processo filho do sandbox.
+"""
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+
+
+FILE_SUFFIX = '.jsonl'
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class TestDataError(Exception):
+    """Arquivo de caso de teste ausente ou inválido"""
+    pass
+
+
+def encode(args, expected):
+    """Conteúdo do arquivo: uma linha JSON para a entrada e outra para a saída"""
+    lines = [json.dumps(value, separators=(',', ':')) for value in (args, expected)]
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def write_test_data(root, args, expected):
+    """
+    Grava um caso de teste em ``root``
+
+    Returns:
+        Tupla (caminho relativo a ``root``, SHA-256, tamanho em bytes)
+    """
+    data = encode(args, expected)
+    digest = hashlib.sha256(data).hexdigest()
+    relative_path = os.path.join(digest[:2], digest + FILE_SUFFIX)
+    path = os.path.join(root, relative_path)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Grava em um temporário e renomeia: um leitor nunca vê o arquivo pela metade
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    return relative_path, digest, len(data)
+
+
+def read_test_data(path):
+    """
+    Lê um caso de teste gravado por ``write_test_data``
+
+    Returns:
+        Tupla (argumentos, saída esperada)
+
+    Raises:
+        TestDataError: se o arquivo não existir ou estiver corrompido
+    """
+    try:
+        with open(path, 'rb') as data_file, \
+                mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            newline = data.find(b'\n')
+            if newline < 0:
+                raise TestDataError(f'Arquivo de teste sem a saída esperada: {path}')
+            return json.loads(data[:newline]), json.loads(data[newline + 1:])
+    except (OSError, ValueError) as e:
+        raise TestDataError(f'Erro ao ler o arquivo de teste: {e}') from e
+
+
+def file_digest(path):
+    """SHA-256 do conteúdo de um arquivo de teste"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as data_file:
+        for chunk in iter(lambda: data_file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
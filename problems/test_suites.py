@@ -0,0 +1,103 @@
+"""
+Cache de suítes de teste já processadas, por desafio.
+
+``get_test_suite`` devolve os casos de teste do desafio com a entrada e a
+saída esperada já decodificadas do JSON, sem consultar o banco enquanto a
+suíte não mudar. A validade é conferida contra ``test_suite_revision`` (que
+os signals incrementam a cada mudança em um ``TestCase``) e ``updated_at``
+do desafio, campos que já vêm junto com o próprio desafio. Assim um
+processo percebe mudanças feitas por outro.
+
+Casos guardados em arquivo (ver test_data.py) entram na suíte só com o
+caminho; quem lê os dados é o processo filho do sandbox.
+
+Alterações em massa (``QuerySet.update``, ``bulk_create``) não disparam
+signals e precisam chamar ``invalidate`` explicitamente.
+"""
+import json
+from collections import namedtuple
+
+from django.conf import settings
+
+from .lru import LRUCache
+from .verdict_cache import suite_version
+
+
+DEFAULT_CACHE_SIZE = 256
+
+TestSuite = namedtuple('TestSuite', ['key', 'version', 'cases', 'samples'])
+
+_suites = LRUCache(getattr(settings, 'TEST_SUITE_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+
+
+def _suite_key(challenge):
+    return (challenge.test_suite_revision, challenge.updated_at)
+
+
+def _parse_case(test_case):
+    """
+    Converte um TestCase no formato do executor, já decodificado
+
+    Se o JSON for inválido os campos decodificados ficam de fora e o
+    executor reporta o erro ao rodar o teste, como antes.
+    """
+    if test_case.data_file:
+        # Nos resultados, no lugar dos dados aparece uma descrição do arquivo
+        label = f'(arquivo de {test_case.data_size} bytes)'
+        return {
+            'input_data': label,
+            'expected_output': label,
+            'data_file': test_case.data_path,
+            'data_sha256': test_case.data_sha256,
+        }
+    case = {
+        'input_data': test_case.input_data,
+        'expected_output': test_case.expected_output,
+    }
+    try:
+        case['args'] = json.loads(test_case.input_data)
+        case['expected'] = json.loads(test_case.expected_output)
+    except json.JSONDecodeError:
+        case.pop('args', None)
+    return case
+
+
+def build_test_suite(challenge):
+    """Carrega e processa os casos de teste do desafio a partir do banco"""
+    cases = []
+    samples = []
+    for test_case in challenge.test_cases.all():
+        case = _parse_case(test_case)
+        cases.append(case)
+        if test_case.is_sample:
+            samples.append(case)
+
+    return TestSuite(
+        key=_suite_key(challenge),
+        version=suite_version(challenge, cases),
+        cases=tuple(cases),
+        samples=tuple(samples),
+    )
+
+
+def get_test_suite(challenge):
+    """
+    Retorna a suíte de testes do desafio, do cache quando possível
+
+    Os dicts dos casos são compartilhados entre requisições e não devem ser
+    alterados.
+    """
+    suite = _suites.get(challenge.id)
+    if suite is None or suite.key != _suite_key(challenge):
+        suite = build_test_suite(challenge)
+        _suites.set(challenge.id, suite)
+    return suite
+
+
+def invalidate(challenge_id):
+    """Descarta a suíte em cache de um desafio neste processo"""
+    _suites.discard(challenge_id)
+
+
+def clear():
+    _suites.clear()
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from problems import archive
+from problems.models import Challenge, Submission, SubmissionArchive
+
+
+class SubmissionArchiveTest(TestCase):
+    """Testes para o arquivamento de submissões antigas"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.challenge = Challenge.objects.create(
+            title='Soma', slug='soma', description='Somar', difficulty='easy'
+        )
+        self.old = timezone.now() - timedelta(days=200)
+
+    def _submission(self, status, execution_time=None, submitted_at=None):
+        return Submission.objects.create(
+            user=self.user,
+            challenge=self.challenge,
+            code=f'def solution(a, b):\n    return a + b  # {status}',
+            status=status,
+            result_message=f'Resultado {status}',
+            test_results=[{'test_number': 1, 'passed': status == 'accepted'}],
+            execution_time=execution_time,
+            submitted_at=submitted_at or self.old
+        )
+
+    def test_archives_old_non_best_submissions(self):
+        """Testa quais submissões são arquivadas"""
+        wrong = self._submission('wrong_answer')
+        slow = self._submission('accepted', execution_time=0.5)
+        best = self._submission('accepted', execution_time=0.1)
+        recent = self._submission('wrong_answer', submitted_at=timezone.now())
+
+        self.assertEqual(archive.archive_submissions(older_than_days=90, batch_size=1), 2)
+
+        archived = set(Submission.objects.filter(is_archived=True).values_list('id', flat=True))
+        self.assertEqual(archived, {wrong.id, slow.id})
+        best.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertFalse(best.is_archived)
+        self.assertFalse(recent.is_archived)
+
+    def test_hot_row_is_slimmed_and_restored(self):
+        """Testa se o resultado sai da tabela principal e volta ao carregar"""
+        submission = self._submission('wrong_answer')
+        original_code = submission.code
+        archive.archive_submissions(older_than_days=90)
+
+        submission.refresh_from_db()
+        self.assertEqual(submission.result_message, '')
+        self.assertEqual(submission.test_results, [])
+        self.assertEqual(submission.code, original_code)
+        self.assertTrue(SubmissionArchive.objects.filter(submission=submission).exists())
+
+        archive.load(submission)
+        self.assertEqual(submission.result_message, 'Resultado wrong_answer')
+        self.assertEqual(submission.test_results[0]['test_number'], 1)
+
+    def test_submission_detail_shows_archived_code(self):
+        """Testa se a página da submissão continua mostrando o código"""
+        submission = self._submission('wrong_answer')
+        archive.archive_submissions(older_than_days=90)
+
+        self.client.login(username='testuser', password='12345')
+        response = self.client.get(reverse('submission_detail', args=[submission.id]))
+        self.assertContains(response, 'return a + b  # wrong_answer')
+        self.assertContains(response, 'Resultado wrong_answer')
+
+    def test_command_dry_run(self):
+        """Testa se o modo de simulação não arquiva nada"""
+        self._submission('wrong_answer')
+        out = StringIO()
+        call_command('archive_submissions', dry_run=True, stdout=out)
+
+        self.assertIn('1 submissão(ões) seriam arquivadas', out.getvalue())
+        self.assertFalse(Submission.objects.filter(is_archived=True).exists())
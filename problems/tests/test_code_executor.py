@@ -1,6 +1,7 @@
 from django.test import TestCase
 from problems.code_executor import execute_code
 import json
+import os
 
 
 class CodeExecutorTest(TestCase):
@@ -229,3 +230,190 @@ def solution(n):
         self.assertIn('actual', test_result)
         self.assertIn('error', test_result)
 
+    
+    def test_execute_code_time_limit(self):
+        """Testa se um loop infinito termina com tempo limite excedido"""
+        code = "def solution(a, b):\n    while True:\n        pass"
+        test_cases = [
+            {
+                'input_data': json.dumps([2, 3]),
+                'expected_output': json.dumps(5)
+            }
+        ]
+        limits = {'time_limit': 0.2, 'cpu_time_limit': 0.2, 'total_time_limit': 1.0}
+        result = execute_code(code, test_cases, 'solution', limits=limits)
+        
+        self.assertEqual(result['status'], 'time_limit')
+        self.assertEqual(result['failed_test'], 1)
+        self.assertEqual(result['test_results'][0]['error'], 'Tempo limite excedido')
+    
+    def test_execute_code_time_limit_not_swallowed(self):
+        """Testa se o código do usuário não consegue engolir o timeout"""
+        code = """
+def solution(a, b):
+    while True:
+        try:
+            while True:
+                pass
+        except Exception:
+            pass
+"""
+        test_cases = [
+            {
+                'input_data': json.dumps([2, 3]),
+                'expected_output': json.dumps(5)
+            }
+        ]
+        limits = {'time_limit': 0.2, 'cpu_time_limit': 0.2, 'total_time_limit': 1.0}
+        result = execute_code(code, test_cases, 'solution', limits=limits)
+        
+        self.assertEqual(result['status'], 'time_limit')
+    
+    def test_execute_code_total_time_limit(self):
+        """Testa se o orçamento total da submissão é respeitado"""
+        code = "import time\ndef solution(a, b):\n    time.sleep(0.3)\n    return a + b"
+        test_cases = [
+            {
+                'input_data': json.dumps([2, 3]),
+                'expected_output': json.dumps(5)
+            }
+        ] * 5
+        limits = {'time_limit': 1.0, 'cpu_time_limit': 1.0, 'total_time_limit': 0.5}
+        result = execute_code(code, test_cases, 'solution', limits=limits)
+        
+        self.assertEqual(result['status'], 'time_limit')
+        self.assertEqual(result['failed_test'], 2)
+    
+    def test_execute_code_reports_each_test(self):
+        """Testa se o callback recebe o resultado de cada teste"""
+        code = "def solution(a, b):\n    return a + b"
+        test_cases = [
+            {
+                'input_data': json.dumps([2, 3]),
+                'expected_output': json.dumps(5)
+            }
+        ] * 3
+        received = []
+        execute_code(code, test_cases, 'solution', on_test_result=received.append)
+        
+        self.assertEqual([t['test_number'] for t in received], [1, 2, 3])
+    
+    def test_execute_code_captures_output(self):
+        """Testa se a saída do print é devolvida"""
+        code = "def solution(a, b):\n    print('debug', a)\n    return a + b"
+        test_cases = [
+            {
+                'input_data': json.dumps([2, 3]),
+                'expected_output': json.dumps(5)
+            }
+        ]
+        result = execute_code(code, test_cases, 'solution')
+        
+        self.assertEqual(result['output'], 'debug 2\n')
+    
+    def test_execute_code_truncates_output(self):
+        """Testa se a saída capturada é truncada no limite"""
+        code = "def solution(a, b):\n    for _ in range(1000):\n        print('x' * 100)\n    return a + b"
+        test_cases = [
+            {
+                'input_data': json.dumps([2, 3]),
+                'expected_output': json.dumps(5)
+            }
+        ]
+        result = execute_code(code, test_cases, 'solution', limits={'output_limit': 50})
+        
+        self.assertEqual(result['status'], 'accepted')
+        self.assertTrue(result['output'].startswith('x' * 50))
+        self.assertIn('saída truncada', result['output'])
+        self.assertLess(len(result['output']), 100)
+    
+    def test_execute_code_memory_error(self):
+        """Testa se MemoryError vira limite de memória excedido"""
+        code = "def solution(a, b):\n    raise MemoryError()"
+        test_cases = [
+            {
+                'input_data': json.dumps([2, 3]),
+                'expected_output': json.dumps(5)
+            }
+        ]
+        result = execute_code(code, test_cases, 'solution')
+        
+        self.assertEqual(result['status'], 'memory_limit')
+        self.assertEqual(result['failed_test'], 1)
+    
+    def test_execute_code_measures_cpu_time_per_test(self):
+        """Testa se cada teste traz o tempo de CPU e o total é a soma"""
+        code = "def solution(n):\n    return sum(range(n))"
+        test_cases = [
+            {'input_data': json.dumps([n]), 'expected_output': json.dumps(sum(range(n)))}
+            for n in (10, 100000)
+        ]
+        result = execute_code(code, test_cases, 'solution')
+        
+        self.assertEqual(result['status'], 'accepted')
+        cpu_times = [test['cpu_time'] for test in result['test_results']]
+        self.assertTrue(all(cpu_time >= 0 for cpu_time in cpu_times))
+        self.assertIn('wall_time', result['test_results'][0])
+        self.assertAlmostEqual(result['cpu_time'], sum(cpu_times), places=5)
+        self.assertNotIn('peak_memory', result['test_results'][0])
+    
+    def test_execute_code_repeats_with_original_arguments(self):
+        """Testa se as repetições recebem os argumentos originais"""
+        code = (
+            "def solution(items):\n"
+            "    print(len(items), end=' ')\n"
+            "    items.append(0)\n"
+            "    return sorted(items)"
+        )
+        test_cases = [
+            {'input_data': json.dumps([[3, 1, 2]]), 'expected_output': json.dumps([0, 1, 2, 3])}
+        ]
+        result = execute_code(
+            code, test_cases, 'solution',
+            limits={'timing_repeats': 3, 'measure_memory': True}
+        )
+        
+        self.assertEqual(result['status'], 'accepted')
+        # Três chamadas medidas e uma para a memória, sempre com 3 itens
+        self.assertEqual(result['output'].split(), ['3', '3', '3', '3'])
+        self.assertIn('peak_memory', result['test_results'][0])
+        self.assertIsNotNone(result['cpu_time'])
+    
+    def test_execute_code_repeats_on_fresh_state(self):
+        """Testa se cada repetição carrega o código de novo"""
+        code = (
+            "import functools\n"
+            "@functools.lru_cache(maxsize=None)\n"
+            "def solution(n):\n"
+            "    print('calculado', end=' ')\n"
+            "    return sum(range(n))"
+        )
+        test_cases = [
+            {'input_data': json.dumps([1000]), 'expected_output': json.dumps(sum(range(1000)))}
+        ]
+        result = execute_code(code, test_cases, 'solution', limits={'timing_repeats': 3})
+        
+        self.assertEqual(result['status'], 'accepted')
+        # Sem cache entre as repetições: as três chamadas calculam
+        self.assertEqual(result['output'].split(), ['calculado'] * 3)
+    
+    def test_execute_code_failing_repeat_is_an_error(self):
+        """Testa se uma repetição com erro não é ignorada"""
+        os.environ.pop('SOLUTION_CALLS', None)
+        self.addCleanup(os.environ.pop, 'SOLUTION_CALLS', None)
+        code = (
+            "import os\n"
+            "def solution(a, b):\n"
+            "    calls = int(os.environ.get('SOLUTION_CALLS', '0')) + 1\n"
+            "    os.environ['SOLUTION_CALLS'] = str(calls)\n"
+            "    if calls > 1:\n"
+            "        raise ValueError('segunda chamada')\n"
+            "    return a + b"
+        )
+        test_cases = [
+            {'input_data': json.dumps([2, 3]), 'expected_output': json.dumps(5)}
+        ]
+        result = execute_code(code, test_cases, 'solution', limits={'timing_repeats': 3})
+        
+        self.assertEqual(result['status'], 'runtime_error')
+        self.assertFalse(result['test_results'][0]['passed'])
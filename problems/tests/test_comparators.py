@@ -0,0 +1,153 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from problems import comparators
+from problems.code_executor import MAX_ACTUAL_REPR, execute_code
+from problems.judge import enqueue_submission, judge_submission
+from problems.models import Challenge, TestCase as ChallengeTestCase
+from problems.verdict_cache import suite_version
+
+
+CHECKER = (
+    "def check(actual, expected, args):\n"
+    "    items, target = args\n"
+    "    if len(actual) != 2:\n"
+    "        return False, 'esperado um par de índices'\n"
+    "    return items[actual[0]] + items[actual[1]] == target"
+)
+
+
+class ComparatorsTest(TestCase):
+    """Testes para os comparadores da saída"""
+
+    def test_exact(self):
+        """Testa a comparação exata e o caminho da primeira diferença"""
+        self.assertIsNone(comparators.exact([[1, 2], [3]], [[1, 2], [3]]))
+        self.assertEqual(
+            comparators.exact([[1, 2], [3, 5]], [[1, 2], [3, 4]]),
+            '[1][1]: esperado 4, obtido 5'
+        )
+        self.assertEqual(
+            comparators.exact({'a': 1}, {'a': 1, 'b': 2}), "resultado: falta a chave 'b'"
+        )
+        # Mesmos elementos, tipo diferente
+        self.assertIn('esperado [1, 2]', comparators.exact((1, 2), [1, 2]))
+
+    def test_float(self):
+        """Testa a tolerância numérica"""
+        compare = comparators.float_comparator(1e-6)
+        self.assertIsNone(compare([0.1 + 0.2, 1], [0.3, 1.0]))
+        self.assertEqual(compare([0.3, 1.5], [0.3, 1.0]), '[1]: esperado 1.0, obtido 1.5')
+        self.assertIsNotNone(compare(['0.3'], [0.3]))
+
+    def test_unordered(self):
+        """Testa listas em qualquer ordem, com repetições"""
+        compare = comparators.build({'name': 'unordered'})
+        self.assertIsNone(compare([[2, 3], [1, 2], [1, 2]], [[1, 2], [1, 2], [2, 3]]))
+        self.assertEqual(
+            compare([[1, 2], [2, 3], [2, 3]], [[1, 2], [1, 2], [2, 3]]),
+            '[1]: [1, 2] não aparece na resposta'
+        )
+        # Só o nível de fora é livre
+        self.assertIsNotNone(compare([[2, 1]], [[1, 2]]))
+
+    def test_unordered_nested(self):
+        """Testa listas aninhadas em qualquer ordem em todos os níveis"""
+        compare = comparators.build({'name': 'unordered_nested'})
+        expected = [['eat', 'tea', 'ate'], ['tan', 'nat'], ['bat']]
+        self.assertIsNone(compare([['bat'], ['nat', 'tan'], ['ate', 'eat', 'tea']], expected))
+        self.assertIsNotNone(compare([['bat'], ['nat', 'tan'], ['ate', 'eat', 'eat']], expected))
+
+    def test_diff_is_compact(self):
+        """Testa que a diferença não repete valores grandes inteiros"""
+        expected = list(range(100000))
+        actual = list(expected)
+        actual[-1] = -1
+        diff = comparators.exact([actual], [expected])
+        self.assertEqual(diff, '[0][99999]: esperado 99999, obtido -1')
+        self.assertLessEqual(len(comparators.exact(actual, 'x')), 200)
+
+    def test_custom(self):
+        """Testa o verificador próprio do desafio"""
+        compare = comparators.build({'name': 'custom', 'checker': CHECKER})
+        # Outra resposta válida além da esperada
+        self.assertIsNone(compare([3, 2], [2, 3], [[2, 7, 11, 4], 15]))
+        self.assertIsNotNone(compare([0, 1], [2, 3], [[2, 7, 11, 4], 15]))
+        self.assertEqual(compare([0], [0, 3], [[2, 7], 9]), 'esperado um par de índices')
+
+        with self.assertRaises(comparators.CheckerError):
+            comparators.build({'name': 'custom', 'checker': 'def verificar(): pass'})
+
+
+class ComparatorExecutionTest(TestCase):
+    """Testes para o comparador no executor e no avaliador"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.challenge = Challenge.objects.create(
+            title='Média', slug='media', description='Média', comparator='float'
+        )
+        ChallengeTestCase.objects.create(
+            challenge=self.challenge, input_data='[[1, 2, 2]]', expected_output='1.6666667'
+        )
+
+    def test_wrong_answer_has_diff(self):
+        """Testa se o teste com resposta errada traz a diferença"""
+        test_cases = [{'input_data': json.dumps([[1, 2]]), 'expected_output': '[1, 2]'}]
+        result = execute_code("def solution(items):\n    return [1, 3]", test_cases)
+
+        self.assertEqual(result['status'], 'wrong_answer')
+        self.assertEqual(result['test_results'][0]['diff'], '[1]: esperado 2, obtido 3')
+
+    def test_wrong_answer_truncates_large_actual(self):
+        """Testa se um resultado errado grande é guardado truncado"""
+        test_cases = [{'input_data': '[100000]', 'expected_output': '[]'}]
+        result = execute_code("def solution(n):\n    return list(range(n))", test_cases)
+
+        test_result = result['test_results'][0]
+        self.assertEqual(result['status'], 'wrong_answer')
+        self.assertLessEqual(len(test_result['actual']), MAX_ACTUAL_REPR)
+        self.assertTrue(test_result['actual'].startswith('[0, 1, 2'))
+
+    def test_custom_checker_receives_original_args(self):
+        """Testa que o verificador recebe os argumentos antes da chamada"""
+        code = (
+            "def solution(items, target):\n"
+            "    items.clear()\n"
+            "    return [0, 1]"
+        )
+        test_cases = [{'input_data': '[[2, 7, 11], 9]', 'expected_output': '[0, 1]'}]
+        comparison = {'name': 'custom', 'checker': CHECKER}
+        result = execute_code(code, test_cases, comparison=comparison)
+
+        self.assertEqual(result['status'], 'accepted')
+
+    def test_checker_error(self):
+        """Testa se um erro no verificador é atribuído ao desafio"""
+        comparison = {'name': 'custom', 'checker': 'def check(a, e, args):\n    return 1 / 0'}
+        test_cases = [{'input_data': '[1]', 'expected_output': '1'}]
+        result = execute_code("def solution(x):\n    return x", test_cases, comparison=comparison)
+
+        self.assertEqual(result['status'], 'runtime_error')
+        self.assertIn('verificador', result['message'])
+
+    def test_judge_uses_challenge_comparator(self):
+        """Testa se o avaliador usa o comparador do desafio"""
+        code = "def solution(items):\n    return sum(items) / len(items)"
+        result = judge_submission(enqueue_submission(self.user, self.challenge, code))
+        self.assertEqual(result['status'], 'accepted')
+
+        self.challenge.comparator = 'exact'
+        self.challenge.save()
+        result = judge_submission(enqueue_submission(self.user, self.challenge, code))
+        self.assertEqual(result['status'], 'wrong_answer')
+
+    def test_comparator_changes_suite_version(self):
+        """Testa se mudar o comparador invalida os vereditos em cache"""
+        test_cases = [{'input_data': '[[1, 2, 2]]', 'expected_output': '1.6666667'}]
+        version = suite_version(self.challenge, test_cases)
+
+        self.challenge.float_tolerance = 1e-3
+        self.assertNotEqual(suite_version(self.challenge, test_cases), version)
@@ -0,0 +1,214 @@
+import json
+import os
+import sys
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from problems import stats
+from problems.judge import (
+    ProgressRecorder,
+    claim_next_submission,
+    enqueue_submission,
+    judge_submission,
+    recover_stale_submissions,
+)
+from problems.models import Challenge, TestCase as ChallengeTestCase, Submission, UserSolved
+
+
+class JudgeQueueTest(TestCase):
+    """Testes para a fila de avaliação"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.challenge = Challenge.objects.create(
+            title='Soma',
+            slug='soma',
+            description='Somar',
+            difficulty='easy',
+            function_name='solution'
+        )
+        ChallengeTestCase.objects.create(
+            challenge=self.challenge,
+            input_data='[2, 3]',
+            expected_output='5'
+        )
+        ChallengeTestCase.objects.create(
+            challenge=self.challenge,
+            input_data='[10, 20]',
+            expected_output='30'
+        )
+        self.correct_code = 'def solution(a, b):\n    return a + b'
+
+    def test_enqueue_creates_pending_submission(self):
+        """Testa se a submissão entra na fila como pendente"""
+        submission = enqueue_submission(self.user, self.challenge, self.correct_code)
+
+        self.assertEqual(submission.status, 'pending')
+        self.user.userprofile.refresh_from_db()
+        self.assertEqual(self.user.userprofile.total_submissions, 1)
+
+    def test_claim_marks_running(self):
+        """Testa se a reivindicação marca a submissão como em execução"""
+        enqueue_submission(self.user, self.challenge, self.correct_code)
+
+        submission = claim_next_submission()
+        self.assertEqual(submission.status, 'running')
+        self.assertIsNotNone(submission.started_at)
+
+    def test_claim_is_exclusive(self):
+        """Testa se uma submissão não é reivindicada duas vezes"""
+        enqueue_submission(self.user, self.challenge, self.correct_code)
+
+        self.assertIsNotNone(claim_next_submission())
+        self.assertIsNone(claim_next_submission())
+
+    def test_claim_oldest_first(self):
+        """Testa se a fila é processada em ordem de chegada"""
+        first = enqueue_submission(self.user, self.challenge, self.correct_code)
+        enqueue_submission(self.user, self.challenge, self.correct_code)
+
+        self.assertEqual(claim_next_submission().id, first.id)
+
+    def test_judge_submission_writes_result(self):
+        """Testa se a avaliação grava o resultado na submissão"""
+        submission = enqueue_submission(self.user, self.challenge, self.correct_code)
+        judge_submission(submission)
+
+        submission.refresh_from_db()
+        self.assertEqual(submission.status, 'accepted')
+        self.assertEqual(len(submission.test_results), 2)
+        self.assertIsNotNone(submission.finished_at)
+        self.assertEqual(
+            submission.cpu_time,
+            round(sum(t['cpu_time'] for t in submission.test_results), 6)
+        )
+
+    def test_judge_submission_reports_progress(self):
+        """Testa se o progresso de cada teste é repassado e gravado"""
+        submission = enqueue_submission(self.user, self.challenge, self.correct_code)
+        received = []
+        judge_submission(submission, on_test_result=received.append)
+
+        self.assertEqual([t['test_number'] for t in received], [1, 2])
+
+    def test_progress_recorder_flush(self):
+        """Testa se o progresso parcial é gravado no banco"""
+        submission = enqueue_submission(self.user, self.challenge, self.correct_code)
+        recorder = ProgressRecorder(submission)
+        recorder({'test_number': 1, 'passed': True})
+        recorder.flush()
+
+        submission.refresh_from_db()
+        self.assertEqual(submission.test_results, [{'test_number': 1, 'passed': True}])
+
+    def test_judge_submission_counts_first_accept_once(self):
+        """Testa se o desafio só conta como resolvido uma vez"""
+        for _ in range(2):
+            submission = enqueue_submission(self.user, self.challenge, self.correct_code)
+            judge_submission(submission)
+
+        self.user.userprofile.refresh_from_db()
+        self.assertEqual(self.user.userprofile.challenges_solved, 1)
+
+    def test_judge_submission_records_solved_set(self):
+        """Testa se o primeiro aceite cria a linha de desafio resolvido"""
+        submission = enqueue_submission(self.user, self.challenge, self.correct_code)
+        judge_submission(submission)
+        judge_submission(enqueue_submission(self.user, self.challenge, self.correct_code))
+
+        solved = UserSolved.objects.get(user=self.user, challenge=self.challenge)
+        submission.refresh_from_db()
+        self.assertEqual(solved.first_accepted_at, submission.finished_at)
+        self.assertLessEqual(solved.best_time, submission.execution_time)
+        self.assertEqual(UserSolved.objects.count(), 1)
+
+    def test_record_accept_uses_unique_constraint(self):
+        """Testa se só o primeiro aceite conta, decidido pela restrição única"""
+        first = enqueue_submission(self.user, self.challenge, self.correct_code)
+        second = enqueue_submission(self.user, self.challenge, self.correct_code)
+        first.execution_time, second.execution_time = 0.5, 0.2
+
+        self.assertTrue(stats.record_accept(first))
+        self.assertFalse(stats.record_accept(second))
+
+        self.user.userprofile.refresh_from_db()
+        self.assertEqual(self.user.userprofile.challenges_solved, 1)
+        self.assertEqual(UserSolved.objects.get().best_time, 0.2)
+
+    def test_wrong_answer_not_in_solved_set(self):
+        """Testa se resposta errada não marca o desafio como resolvido"""
+        submission = enqueue_submission(self.user, self.challenge, 'def solution(a, b):\n    return 0')
+        judge_submission(submission)
+
+        self.assertFalse(UserSolved.objects.exists())
+
+    def test_judge_submission_updates_challenge_stats(self):
+        """Testa se os contadores do desafio acompanham os vereditos"""
+        for code in [self.correct_code, self.correct_code, 'def solution(a, b):\n    return 0']:
+            submission = enqueue_submission(self.user, self.challenge, code)
+            judge_submission(submission)
+
+        self.challenge.refresh_from_db()
+        self.assertEqual(self.challenge.solved_count, 1)
+        self.assertEqual(self.challenge.attempt_count, 3)
+        self.assertEqual(self.challenge.accepted_count, 2)
+        self.assertEqual(self.challenge.acceptance_rate, 66.7)
+
+    def test_recover_stale_submissions(self):
+        """Testa se submissões abandonadas voltam para a fila"""
+        submission = enqueue_submission(self.user, self.challenge, self.correct_code)
+        Submission.objects.filter(id=submission.id).update(
+            status='running',
+            started_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(recover_stale_submissions(stale_after=60), 1)
+        submission.refresh_from_db()
+        self.assertEqual(submission.status, 'pending')
+
+    def test_run_judge_workers_once(self):
+        """Testa se o comando processa toda a fila e encerra"""
+        enqueue_submission(self.user, self.challenge, self.correct_code)
+        enqueue_submission(self.user, self.challenge, 'def solution(a, b):\n    return 0')
+
+        call_command('run_judge_workers', workers=1, once=True, stdout=StringIO())
+
+        statuses = sorted(Submission.objects.values_list('status', flat=True))
+        self.assertEqual(statuses, ['accepted', 'wrong_answer'])
+
+
+class BenchJudgeCommandTest(TestCase):
+    """Testes para o comando de benchmark do avaliador"""
+
+    def test_bench_writes_report(self):
+        """Testa se o comando mede os modos pedidos e grava o JSON"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.json')
+            call_command(
+                'bench_judge', modes=['inline', 'sandbox'], repeat=1,
+                pool_size=1, output=path, stdout=StringIO()
+            )
+            with open(path, encoding='utf-8') as f:
+                report = json.load(f)
+
+        self.assertEqual(set(report['modes']), {'inline', 'sandbox'})
+        for stats in report['modes'].values():
+            self.assertEqual(stats['submissions'], report['corpus_size'])
+            self.assertLessEqual(stats['p50_ms'], stats['p95_ms'])
+            self.assertLessEqual(stats['p95_ms'], stats['p99_ms'])
+            self.assertIn('accepted', stats['statuses'])
+            self.assertIn('wrong_answer', stats['statuses'])
+            self.assertIn('runtime_error', stats['statuses'])
+            # Cada modo roda em um processo próprio e mede o próprio pico
+            if sys.platform != 'win32':
+                self.assertGreater(stats['peak_rss_kb'], 0)
+        self.assertEqual(
+            report['modes']['inline']['statuses'],
+            report['modes']['sandbox']['statuses']
+        )
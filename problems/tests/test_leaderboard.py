@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from problems import leaderboard
+from problems.judge import enqueue_submission, judge_submission
+from problems.models import (
+    Challenge,
+    LeaderboardEntry,
+    LeaderboardScore,
+    TestCase as ChallengeTestCase,
+    UserSolved,
+)
+
+
+class LeaderboardTest(TestCase):
+    """Testes para o ranking materializado"""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.users = [
+            User.objects.create_user(username=f'user{n}', password='12345')
+            for n in range(4)
+        ]
+        self.challenges = {
+            difficulty: Challenge.objects.create(
+                title=difficulty, slug=difficulty, description=difficulty,
+                difficulty=difficulty
+            )
+            for difficulty in ('easy', 'medium', 'hard')
+        }
+
+    def _solve(self, user, difficulty, minutes):
+        accepted_at = self.now + timedelta(minutes=minutes)
+        UserSolved.objects.create(
+            user=user,
+            challenge=self.challenges[difficulty],
+            first_accepted_at=accepted_at
+        )
+        leaderboard.record_first_accept(user.id, difficulty, accepted_at)
+
+    def _ranking(self):
+        page = leaderboard.leaderboard_page()
+        return [(ranked.rank, ranked.entry.user.username) for ranked in page.items]
+
+    def test_incremental_ranking(self):
+        """Testa pontuação por dificuldade e desempate por quem chegou antes"""
+        self._solve(self.users[0], 'easy', 1)
+        self._solve(self.users[1], 'hard', 2)
+        self._solve(self.users[2], 'medium', 3)
+        self._solve(self.users[2], 'easy', 4)
+        self._solve(self.users[3], 'easy', 5)
+
+        # user1 e user2 têm 3 pontos; user1 chegou antes
+        self.assertEqual(
+            self._ranking(),
+            [(1, 'user1'), (2, 'user2'), (3, 'user0'), (4, 'user3')]
+        )
+        self.assertEqual(leaderboard.get_user_rank(self.users[2]).rank, 2)
+        self.assertEqual(leaderboard.get_user_rank(self.users[3]).rank, 4)
+        self.assertEqual(
+            dict(LeaderboardScore.objects.filter(users__gt=0).values_list('score', 'users')),
+            {3: 2, 1: 2}
+        )
+
+    def test_rebuild_matches_incremental(self):
+        """Testa se o recálculo completo chega ao mesmo ranking"""
+        self._solve(self.users[0], 'hard', 1)
+        self._solve(self.users[1], 'easy', 2)
+        self._solve(self.users[1], 'medium', 3)
+        incremental = self._ranking()
+        occupied = LeaderboardScore.objects.filter(users__gt=0)
+        scores = dict(occupied.values_list('score', 'users'))
+        # A pontuação que ficou vazia não é apagada (ver _move_score)
+        self.assertEqual(LeaderboardScore.objects.get(score=1).users, 0)
+
+        leaderboard.rebuild_leaderboard()
+
+        self.assertEqual(self._ranking(), incremental)
+        self.assertEqual(dict(occupied.values_list('score', 'users')), scores)
+
+    def test_pages_continue_ranks(self):
+        """Testa se a posição continua entre as páginas"""
+        for n, user in enumerate(self.users):
+            self._solve(user, 'easy', n)
+
+        first = leaderboard.leaderboard_page(page_size=3)
+        second = leaderboard.leaderboard_page(first.next_cursor, page_size=3)
+
+        self.assertEqual([ranked.rank for ranked in first.items], [1, 2, 3])
+        self.assertEqual([ranked.rank for ranked in second.items], [4])
+        self.assertEqual(second.items[0].entry.user, self.users[3])
+        self.assertIsNone(second.next_cursor)
+
+    def test_user_without_accepts_has_no_rank(self):
+        """Testa usuário que ainda não resolveu nenhum desafio"""
+        self.assertIsNone(leaderboard.get_user_rank(self.users[0]))
+
+    def test_judge_updates_leaderboard_on_first_accept(self):
+        """Testa se o avaliador atualiza o ranking só no primeiro aceite"""
+        challenge = self.challenges['medium']
+        ChallengeTestCase.objects.create(
+            challenge=challenge, input_data='[2, 3]', expected_output='5'
+        )
+        code = 'def solution(a, b):\n    return a + b'
+        for _ in range(2):
+            judge_submission(enqueue_submission(self.users[0], challenge, code))
+
+        entry = LeaderboardEntry.objects.get(user=self.users[0])
+        self.assertEqual(entry.score, 2)
+        self.assertEqual(entry.solved_count, 1)
+
+    def test_leaderboard_view(self):
+        """Testa a página do ranking com a posição do usuário"""
+        self._solve(self.users[0], 'easy', 1)
+        self._solve(self.users[1], 'hard', 2)
+        self.client.login(username='user0', password='12345')
+
+        response = self.client.get(reverse('leaderboard'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'problems/leaderboard.html')
+        self.assertEqual(response.context['my_rank'].rank, 2)
+        self.assertEqual(len(response.context['entries']), 2)
@@ -1,6 +1,10 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
 from django.contrib.auth.models import User
-from problems.models import Challenge, TestCase as ChallengeTestCase, Submission, UserProfile
+from problems.models import Challenge, CodeBlob, TestCase as ChallengeTestCase, Submission, UserProfile
 import json
 
 
@@ -45,6 +49,33 @@ class ChallengeModelTest(TestCase):
         )
         self.assertEqual(self.challenge.get_solved_count(), 1)
     
+    def test_acceptance_rate(self):
+        """Testa taxa de aceitação calculada a partir dos contadores"""
+        self.assertIsNone(self.challenge.acceptance_rate)
+        self.challenge.attempt_count = 3
+        self.challenge.accepted_count = 1
+        self.assertEqual(self.challenge.acceptance_rate, 33.3)
+    
+    def test_rebuild_stats(self):
+        """Testa recálculo dos contadores a partir das submissões"""
+        user = User.objects.create_user(username='testuser', password='12345')
+        other = User.objects.create_user(username='other', password='12345')
+        for owner, status in [
+            (user, 'accepted'), (user, 'accepted'), (user, 'wrong_answer'),
+            (other, 'accepted'), (other, 'pending'),
+        ]:
+            Submission.objects.create(
+                user=owner, challenge=self.challenge, code='', status=status
+            )
+        
+        call_command('rebuild_stats', stdout=StringIO())
+        self.challenge.refresh_from_db()
+        
+        self.assertEqual(self.challenge.solved_count, 2)
+        self.assertEqual(self.challenge.attempt_count, 4)
+        self.assertEqual(self.challenge.accepted_count, 3)
+        self.assertEqual(self.challenge.solved_count, self.challenge.get_solved_count())
+    
     def test_difficulty_choices(self):
         """Testa opções de dificuldade"""
         choices = dict(Challenge.DIFFICULTY_CHOICES)
@@ -131,6 +162,40 @@ class SubmissionModelTest(TestCase):
         self.assertIn('wrong_answer', choices)
         self.assertIn('runtime_error', choices)
         self.assertIn('time_limit', choices)
+    
+    def test_code_is_stored_compressed(self):
+        """Testa se o código é gravado em um blob e lido de volta"""
+        submission = Submission.objects.get(id=self.submission.id)
+        self.assertEqual(submission.code, 'def solution(a, b): return a + b')
+        self.assertEqual(submission.code_blob.size, len(submission.code))
+        self.assertNotEqual(bytes(submission.code_blob.data), submission.code.encode())
+    
+    def test_identical_code_is_deduplicated(self):
+        """Testa se códigos idênticos de usuários diferentes compartilham o blob"""
+        other = User.objects.create_user(username='other', password='12345')
+        duplicate = Submission.objects.create(
+            user=other,
+            challenge=self.challenge,
+            code='def solution(a, b): return a + b'
+        )
+        self.assertEqual(duplicate.code_blob_id, self.submission.code_blob_id)
+        self.assertEqual(CodeBlob.objects.count(), 1)
+        self.assertEqual(CodeBlob.objects.get().ref_count, 2)
+    
+    def test_blob_released_on_delete_and_change(self):
+        """Testa se o blob sem referências é removido"""
+        duplicate = Submission.objects.create(
+            user=self.user,
+            challenge=self.challenge,
+            code='def solution(a, b): return a + b'
+        )
+        duplicate.delete()
+        self.assertEqual(CodeBlob.objects.get().ref_count, 1)
+        
+        self.submission.code = 'def solution(a, b): return b + a'
+        self.submission.save()
+        self.assertEqual(CodeBlob.objects.count(), 1)
+        self.assertEqual(Submission.objects.get(id=self.submission.id).code, 'def solution(a, b): return b + a')
 
 
 class UserProfileModelTest(TestCase):
@@ -161,4 +226,87 @@ class UserProfileModelTest(TestCase):
         profile.refresh_from_db()
         self.assertEqual(profile.challenges_solved, 5)
         self.assertEqual(profile.total_submissions, 10)
+    
+    def test_user_save_does_not_overwrite_counters(self):
+        """Testa se salvar o usuário não regrava um perfil desatualizado"""
+        stale_profile = self.user.userprofile
+        UserProfile.objects.filter(user=self.user).update(total_submissions=3)
+        
+        self.user.first_name = 'Teste'
+        self.user.save()
+        
+        stale_profile.refresh_from_db()
+        self.assertEqual(stale_profile.total_submissions, 3)
+    
+    def test_user_save_creates_missing_profile(self):
+        """Testa se usuários sem perfil ganham um ao serem salvos"""
+        UserProfile.objects.filter(user=self.user).delete()
+        user = User.objects.get(id=self.user.id)
+        user.save()
+        self.assertTrue(UserProfile.objects.filter(user=user).exists())
+
+
 
+class SubmissionIndexTest(TestCase):
+    """Testa se as consultas frequentes de submissões usam os índices compostos"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.challenge = Challenge.objects.create(
+            title='Teste Soma',
+            slug='teste-soma',
+            description='Somar dois números',
+            difficulty='easy'
+        )
+    
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest('Plano de execução não verificado neste banco')
+        if connection.vendor == 'postgresql':
+            # Com as tabelas quase vazias o PostgreSQL prefere varredura sequencial
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        self.assertIn(index_name, queryset.explain())
+    
+    def test_profile_recent_submissions(self):
+        """Testa submissões recentes do usuário"""
+        queryset = Submission.objects.filter(user=self.user).order_by('-submitted_at')[:10]
+        self.assertUsesIndex(queryset, 'submission_user_recent_idx')
+    
+    def test_challenge_submissions(self):
+        """Testa submissões do usuário em um desafio"""
+        queryset = Submission.objects.filter(
+            user=self.user,
+            challenge=self.challenge
+        ).order_by('-submitted_at')[:5]
+        self.assertUsesIndex(queryset, 'submission_user_chal_idx')
+    
+    def test_user_challenge_status(self):
+        """Testa filtro por usuário, desafio e status"""
+        queryset = Submission.objects.filter(
+            user=self.user,
+            challenge=self.challenge,
+            status='accepted'
+        )
+        self.assertUsesIndex(queryset, 'submission_user_chal_idx')
+    
+    def test_judge_queue(self):
+        """Testa a consulta que reivindica a próxima submissão pendente"""
+        queryset = Submission.objects.filter(
+            status='pending'
+        ).order_by('submitted_at', 'id').values_list('id', flat=True)[:1]
+        self.assertUsesIndex(queryset, 'submission_queue_idx')
+    
+    def test_accepted_partial_index(self):
+        """Testa se o índice de aceites é parcial"""
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Submission._meta.db_table
+            )
+        self.assertIn('submission_accepted_idx', constraints)
+        if connection.vendor == 'postgresql':
+            queryset = Submission.objects.filter(
+                challenge=self.challenge,
+                status='accepted'
+            ).values('user')
+            self.assertUsesIndex(queryset, 'submission_accepted_idx')
@@ -0,0 +1,103 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from problems import runtimes
+from problems.judge import enqueue_submission, judge_submission
+from problems.models import (
+    Challenge,
+    RuntimeBucket,
+    Submission,
+    TestCase as ChallengeTestCase,
+)
+
+
+class RuntimeHistogramTest(TestCase):
+    """Testes para o histograma de tempos das soluções aceitas"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.challenge = Challenge.objects.create(
+            title='Soma', slug='soma', description='Some', difficulty='easy'
+        )
+
+    def test_buckets_are_logarithmic(self):
+        """Testa se cada potência de 10 tem o mesmo número de faixas"""
+        self.assertEqual(runtimes.bucket_for(0), 0)
+        self.assertEqual(runtimes.bucket_for(0.001), runtimes.BUCKETS_PER_DECADE)
+        self.assertEqual(runtimes.bucket_for(0.01), 2 * runtimes.BUCKETS_PER_DECADE)
+        self.assertEqual(runtimes.bucket_for(10 ** 6), runtimes.BUCKET_COUNT - 1)
+        lower, upper = runtimes.bucket_bounds(runtimes.bucket_for(0.0042))
+        self.assertTrue(lower <= 0.0042 < upper)
+
+    def test_faster_than(self):
+        """Testa a porcentagem de soluções mais lentas"""
+        for seconds in (0.001, 0.01, 0.01, 0.1, 1.0):
+            runtimes.record_runtime(self.challenge.id, seconds)
+
+        self.assertEqual(runtimes.faster_than(self.challenge.id, 0.001), 100.0)
+        self.assertEqual(runtimes.faster_than(self.challenge.id, 1.0), 0.0)
+        # Duas mais lentas e o empate da mesma faixa conta como meio
+        self.assertEqual(runtimes.faster_than(self.challenge.id, 0.01), 62.5)
+
+    def test_faster_than_without_others(self):
+        """Testa que não há porcentagem sem outra solução aceita"""
+        runtimes.record_runtime(self.challenge.id, 0.01)
+        self.assertIsNone(runtimes.faster_than(self.challenge.id, 0.01))
+
+    def test_judge_records_accepted_runtime(self):
+        """Testa se só os aceites entram no histograma"""
+        ChallengeTestCase.objects.create(
+            challenge=self.challenge, input_data='[2, 3]', expected_output='5'
+        )
+        judge_submission(enqueue_submission(
+            self.user, self.challenge, 'def solution(a, b):\n    return a + b'
+        ))
+        judge_submission(enqueue_submission(
+            self.user, self.challenge, 'def solution(a, b):\n    return a - b'
+        ))
+        self.assertEqual(
+            sum(RuntimeBucket.objects.values_list('count', flat=True)), 1
+        )
+
+    def test_distribution_endpoint(self):
+        """Testa o histograma servido para o gráfico"""
+        runtimes.record_runtime(self.challenge.id, 0.001)
+        runtimes.record_runtime(self.challenge.id, 0.004)
+        url = reverse('runtime_distribution', args=[self.challenge.slug])
+
+        data = self.client.get(url).json()
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(len(data['buckets']), 7)
+        self.assertEqual(data['buckets'][0]['count'], 1)
+        self.assertEqual(data['buckets'][0]['lower_ms'], 1.0)
+
+        # Em cache: um novo aceite só aparece depois do TTL
+        runtimes.record_runtime(self.challenge.id, 0.004)
+        self.assertEqual(self.client.get(url).json()['total'], 2)
+
+    def test_rebuild_from_submissions(self):
+        """Testa se rebuild_stats recalcula os histogramas"""
+        for seconds in (0.002, 0.002, 0.5):
+            Submission.objects.create(
+                user=self.user, challenge=self.challenge, code='x = 1',
+                status='accepted', execution_time=seconds
+            )
+        Submission.objects.create(
+            user=self.user, challenge=self.challenge, code='x = 2',
+            status='wrong_answer', execution_time=0.001
+        )
+        RuntimeBucket.objects.create(challenge=self.challenge, bucket=0, count=9)
+
+        call_command('rebuild_stats', stdout=StringIO())
+
+        counts = dict(RuntimeBucket.objects.values_list('bucket', 'count'))
+        self.assertEqual(counts, {
+            runtimes.bucket_for(0.002): 2,
+            runtimes.bucket_for(0.5): 1,
+        })
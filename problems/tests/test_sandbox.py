@@ -0,0 +1,339 @@
+from django.test import TestCase, override_settings
+from problems.sandbox import SandboxPool, compile_code, run_in_sandbox
+from problems import sandbox
+import json
+
+
+class SandboxPoolTest(TestCase):
+    """Testes para o pool de processos de execução"""
+
+    def setUp(self):
+        self.pool = SandboxPool(size=1, max_jobs_per_worker=2)
+        self.test_cases = [
+            {
+                'input_data': json.dumps([2, 3]),
+                'expected_output': json.dumps(5)
+            }
+        ]
+
+    def tearDown(self):
+        self.pool.close()
+
+    def _worker_pid(self):
+        worker = self.pool._acquire()
+        pid = worker.process.pid
+        self.pool._release(worker)
+        return pid
+
+    def test_execute_success(self):
+        """Testa execução bem-sucedida em um processo filho"""
+        code = "def solution(a, b):\n    return a + b"
+        result = self.pool.execute(code, self.test_cases, 'solution')
+
+        self.assertEqual(result['status'], 'accepted')
+        self.assertTrue(result['test_results'][0]['passed'])
+
+    def test_execute_wrong_answer(self):
+        """Testa resposta errada em um processo filho"""
+        code = "def solution(a, b):\n    return a - b"
+        result = self.pool.execute(code, self.test_cases, 'solution')
+
+        self.assertEqual(result['status'], 'wrong_answer')
+
+    def test_crash_does_not_affect_parent(self):
+        """Testa se um processo que morre é substituído"""
+        code = "import os\ndef solution(a, b):\n    os._exit(1)"
+        result = self.pool.execute(code, self.test_cases, 'solution')
+
+        self.assertEqual(result['status'], 'runtime_error')
+        self.assertIn('encerrado inesperadamente', result['message'])
+
+        # O pool continua funcionando com um novo processo
+        code = "def solution(a, b):\n    return a + b"
+        result = self.pool.execute(code, self.test_cases, 'solution')
+        self.assertEqual(result['status'], 'accepted')
+
+    def test_failing_callback_replaces_worker(self):
+        """Testa se um erro no callback não deixa o job pela metade no pool"""
+        code = "def solution(a, b):\n    return a + b"
+        test_cases = self.test_cases * 200
+
+        def fail(test_result):
+            raise RuntimeError('falha ao gravar o progresso')
+
+        first_pid = self._worker_pid()
+        with self.assertRaises(RuntimeError):
+            self.pool.execute(code, test_cases, 'solution', on_test_result=fail)
+
+        # O próximo job recebe um processo novo e só os próprios resultados
+        self.assertNotEqual(self._worker_pid(), first_pid)
+        result = self.pool.execute(code, self.test_cases, 'solution')
+        self.assertEqual(result['status'], 'accepted')
+        self.assertEqual(len(result['test_results']), 1)
+
+    def test_worker_cannot_reach_parent_secrets(self):
+        """Testa se o código do usuário não vê a conexão de banco nem a SECRET_KEY"""
+        from django.conf import settings
+        from django.contrib.auth.models import User
+        from django.db import connection
+
+        connection.ensure_connection()
+        code = (
+            "def solution(a, b):\n"
+            "    from django.conf import settings\n"
+            "    from django.db import connections\n"
+            "    try:\n"
+            "        secret = settings.SECRET_KEY\n"
+            "    except Exception:\n"
+            "        secret = None\n"
+            "    database = settings.DATABASES['default'].get('PASSWORD')\n"
+            "    opened = [c.alias for c in connections.all() if c.connection is not None]\n"
+            "    return [secret, database or None, opened]"
+        )
+        test_cases = [{'input_data': '[1, 2]', 'expected_output': '[null, null, []]'}]
+        result = self.pool.execute(code, test_cases, 'solution')
+
+        self.assertEqual(result['status'], 'accepted', result['test_results'])
+        # O pai continua com a configuração e a conexão intactas
+        self.assertTrue(settings.SECRET_KEY)
+        self.assertIsNotNone(connection.connection)
+        User.objects.create_user(username='depois', password='12345')
+        self.assertTrue(User.objects.filter(username='depois').exists())
+
+    def test_worker_recycled_after_max_jobs(self):
+        """Testa se o processo é reciclado depois de N jobs"""
+        code = "def solution(a, b):\n    return a + b"
+        first_pid = self._worker_pid()
+
+        self.pool.execute(code, self.test_cases, 'solution')
+        self.assertEqual(self._worker_pid(), first_pid)
+
+        self.pool.execute(code, self.test_cases, 'solution')
+        self.assertNotEqual(self._worker_pid(), first_pid)
+
+    def test_unserializable_output(self):
+        """Testa retorno que não pode ser serializado em JSON"""
+        code = "def solution(a, b):\n    return {a, b}"
+        result = self.pool.execute(code, self.test_cases, 'solution')
+
+        self.assertEqual(result['status'], 'wrong_answer')
+        self.assertEqual(result['test_results'][0]['actual'], '{2, 3}')
+
+    @override_settings(SANDBOX_ENABLED=False)
+    def test_run_in_sandbox_disabled(self):
+        """Testa execução no próprio processo quando o sandbox está desabilitado"""
+        code = "def solution(a, b):\n    return a + b"
+        result = run_in_sandbox(code, self.test_cases, 'solution')
+
+        self.assertEqual(result['status'], 'accepted')
+
+    def test_syntax_error_does_not_use_worker(self):
+        """Testa se erro de sintaxe é reportado sem ocupar um processo"""
+        code = "def solution(a, b)\n    return a + b"
+        self.pool._acquire = None
+        result = self.pool.execute(code, self.test_cases, 'solution')
+
+        self.assertEqual(result['status'], 'runtime_error')
+        self.assertIn('Erro de sintaxe', result['message'])
+        self.assertIsNone(result['failed_test'])
+
+    def test_compiler_memory_error_does_not_use_worker(self):
+        """Testa se código aninhado demais para o compilador vira erro de execução"""
+        code = "def solution(a, b):\n    return " + '-' * 200000 + 'a'
+        self.pool._acquire = None
+        result = self.pool.execute(code, self.test_cases, 'solution')
+
+        self.assertEqual(result['status'], 'runtime_error')
+        self.assertIn('Erro ao compilar', result['message'])
+        self.assertIsNone(result['failed_test'])
+
+    def test_time_limit_in_worker(self):
+        """Testa tempo limite aplicado dentro do processo filho"""
+        code = "def solution(a, b):\n    while True:\n        pass"
+        limits = {'time_limit': 0.2, 'cpu_time_limit': 0.2, 'total_time_limit': 1.0}
+        result = self.pool.execute(code, self.test_cases * 2, 'solution', limits=limits)
+
+        self.assertEqual(result['status'], 'time_limit')
+        self.assertEqual(result['failed_test'], 1)
+
+    def test_parent_kills_worker_ignoring_signals(self):
+        """Testa se o pai mata um filho que ignora os sinais de timeout"""
+        code = """
+import signal
+signal.signal(signal.SIGALRM, signal.SIG_IGN)
+signal.signal(signal.SIGPROF, signal.SIG_IGN)
+
+def solution(a, b):
+    if a == 10:
+        while True:
+            pass
+    return a + b
+"""
+        test_cases = self.test_cases + [
+            {
+                'input_data': json.dumps([10, 20]),
+                'expected_output': json.dumps(30)
+            }
+        ]
+        limits = {'time_limit': 0.2, 'cpu_time_limit': 0.2, 'total_time_limit': 0.5}
+        result = self.pool.execute(code, test_cases, 'solution', limits=limits)
+
+        self.assertEqual(result['status'], 'time_limit')
+        self.assertEqual(result['failed_test'], 2)
+        self.assertTrue(result['test_results'][0]['passed'])
+        self.assertFalse(result['test_results'][1]['passed'])
+
+        # O pool continua funcionando com um novo processo
+        code = "def solution(a, b):\n    return a + b"
+        result = self.pool.execute(code, self.test_cases, 'solution')
+        self.assertEqual(result['status'], 'accepted')
+
+    def test_memory_limit_in_worker(self):
+        """Testa se alocar memória demais termina com limite de memória"""
+        code = "def solution(a, b):\n    data = [0] * (1024 * 1024 * 1024)\n    return a + b"
+        limits = {'memory_limit': 64}
+        result = self.pool.execute(code, self.test_cases, 'solution', limits=limits)
+
+        self.assertEqual(result['status'], 'memory_limit')
+        self.assertEqual(result['failed_test'], 1)
+
+        # O processo é reciclado e o pool continua funcionando
+        code = "def solution(a, b):\n    return a + b"
+        result = self.pool.execute(code, self.test_cases, 'solution')
+        self.assertEqual(result['status'], 'accepted')
+
+
+class SandboxParallelTest(TestCase):
+    """Testes para a execução dos testes dividida entre processos"""
+
+    def setUp(self):
+        self.pool = SandboxPool(size=3, max_jobs_per_worker=100)
+        self.test_cases = [
+            {
+                'input_data': json.dumps([n, n]),
+                'expected_output': json.dumps(2 * n)
+            }
+            for n in range(1, 11)
+        ]
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_parallel_accepted_in_order(self):
+        """Testa se os resultados voltam em ordem"""
+        code = "def solution(a, b):\n    return a + b"
+        received = []
+        result = self.pool.execute_parallel(
+            code, self.test_cases, 'solution', shards=3, on_test_result=received.append
+        )
+
+        self.assertEqual(result['status'], 'accepted')
+        numbers = [t['test_number'] for t in result['test_results']]
+        self.assertEqual(numbers, list(range(1, 11)))
+        self.assertEqual([t['test_number'] for t in received], numbers)
+
+    def test_parallel_failing_callback_releases_workers(self):
+        """Testa se um erro no callback devolve ao pool todos os processos"""
+        code = "def solution(a, b):\n    return a + b"
+
+        def fail(test_result):
+            raise RuntimeError('falha ao gravar o progresso')
+
+        with self.assertRaises(RuntimeError):
+            self.pool.execute_parallel(
+                code, self.test_cases * 20, 'solution', shards=3, on_test_result=fail
+            )
+
+        self.assertEqual(self.pool._idle.qsize(), 3)
+        result = self.pool.execute_parallel(code, self.test_cases, 'solution', shards=3)
+        self.assertEqual(result['status'], 'accepted')
+        self.assertEqual(len(result['test_results']), 10)
+
+    def test_parallel_reports_first_failure(self):
+        """Testa se a falha reportada é a primeira da ordem sequencial"""
+        code = "def solution(a, b):\n    return 0 if a in (4, 8) else a + b"
+        result = self.pool.execute_parallel(code, self.test_cases, 'solution', shards=3)
+
+        self.assertEqual(result['status'], 'wrong_answer')
+        self.assertEqual(result['failed_test'], 4)
+        self.assertEqual(result['message'], 'Teste 4 falhou')
+        self.assertEqual([t['test_number'] for t in result['test_results']], [1, 2, 3, 4])
+
+    def test_parallel_cancels_slow_shards(self):
+        """Testa se os processos além da falha são cancelados"""
+        code = """
+import time
+def solution(a, b):
+    if a == 1:
+        return 0
+    time.sleep(5)
+    return a + b
+"""
+        limits = {'time_limit': 10, 'cpu_time_limit': 10, 'total_time_limit': 10}
+        result = self.pool.execute_parallel(
+            code, self.test_cases, 'solution', shards=3, limits=limits
+        )
+
+        self.assertEqual(result['status'], 'wrong_answer')
+        self.assertEqual(result['failed_test'], 1)
+        self.assertLess(result['execution_time'], 3)
+
+    def test_parallel_syntax_error(self):
+        """Testa erro ao carregar o código em execução paralela"""
+        code = "def solution(a, b)\n    return a + b"
+        result = self.pool.execute_parallel(code, self.test_cases, 'solution', shards=3)
+
+        self.assertEqual(result['status'], 'runtime_error')
+        self.assertIsNone(result['failed_test'])
+        self.assertEqual(result['test_results'], [])
+
+    def test_parallel_time_limit(self):
+        """Testa tempo limite em execução paralela"""
+        code = """
+import signal
+signal.signal(signal.SIGALRM, signal.SIG_IGN)
+signal.signal(signal.SIGPROF, signal.SIG_IGN)
+def solution(a, b):
+    while a == 5:
+        pass
+    return a + b
+"""
+        limits = {'time_limit': 0.2, 'cpu_time_limit': 0.2, 'total_time_limit': 0.5}
+        result = self.pool.execute_parallel(
+            code, self.test_cases, 'solution', shards=3, limits=limits
+        )
+
+        self.assertEqual(result['status'], 'time_limit')
+        self.assertEqual(result['failed_test'], 5)
+
+
+class BytecodeCacheTest(TestCase):
+    """Testes para o cache de bytecode"""
+
+    def setUp(self):
+        sandbox._bytecode.clear()
+
+    def test_compiles_once(self):
+        """Testa se o mesmo código é compilado uma única vez"""
+        code = "def solution(a, b):\n    return a + b"
+        first = compile_code(code)
+        second = compile_code(code)
+
+        self.assertIs(first, second)
+        self.assertIs(first.code_object, second.code_object)
+
+    def test_shared_cache_level(self):
+        """Testa se o bytecode é recuperado do cache compartilhado"""
+        code = "def solution(a, b):\n    return a * b"
+        first = compile_code(code)
+        sandbox._bytecode.clear()
+        second = compile_code(code)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(first.marshaled, second.marshaled)
+
+    def test_syntax_error_not_cached(self):
+        """Testa se código inválido não entra no cache"""
+        with self.assertRaises(SyntaxError):
+            compile_code("def solution(:")
+        self.assertEqual(len(sandbox._bytecode), 0)
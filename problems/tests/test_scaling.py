@@ -0,0 +1,139 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from problems import complexity, scaling
+from problems.code_executor import execute_code
+from problems.judge import enqueue_submission, judge_submission
+from problems.models import Challenge, TestCase as ChallengeTestCase
+
+
+GENERATOR = (
+    "import random\n"
+    "def generate(n):\n"
+    "    rng = random.Random(n)\n"
+    "    return [[rng.randint(0, 1000) for _ in range(n)]]"
+)
+
+LINEAR = (
+    "def solution(items):\n"
+    "    total = 0\n"
+    "    for item in items:\n"
+    "        total += item\n"
+    "    return total >= 0"
+)
+
+QUADRATIC = (
+    "def solution(items):\n"
+    "    for i in range(len(items)):\n"
+    "        for j in range(i):\n"
+    "            pass\n"
+    "    return True"
+)
+
+
+class ComplexityFitTest(TestCase):
+    """Testes para o ajuste da curva de crescimento"""
+
+    def test_fit_slope(self):
+        """Testa a inclinação log-log de potências de n"""
+        sizes = [100, 200, 400, 800]
+        self.assertAlmostEqual(complexity.fit_slope(sizes, [n ** 2 for n in sizes]), 2.0)
+        self.assertAlmostEqual(complexity.fit_slope(sizes, [5.0] * 4), 0.0)
+
+    def test_excess_exponent(self):
+        """Testa o expoente além da classe declarada"""
+        sizes = [1000, 2000, 4000, 8000]
+        n_log_n = [1e-7 * complexity.growth('n log n', n) for n in sizes]
+        quadratic = [1e-7 * n ** 2 for n in sizes]
+
+        self.assertAlmostEqual(complexity.excess_exponent(sizes, n_log_n, 'n log n'), 0.0)
+        self.assertGreater(complexity.excess_exponent(sizes, quadratic, 'n log n'), 0.8)
+        self.assertLess(complexity.excess_exponent(sizes, n_log_n, 'n^2'), 0)
+
+    def test_tiny_times_are_not_judged(self):
+        """Testa que tempos abaixo da resolução não geram veredito"""
+        self.assertIsNone(complexity.excess_exponent([10, 20], [1e-6, 4e-6], 'n'))
+
+
+class ScalingExecutionTest(TestCase):
+    """Testes para o teste de escala no executor"""
+
+    def _scaling(self, sizes, expected):
+        inputs = [(size, [list(range(size))]) for size in sizes]
+        return {'inputs': inputs, 'complexity': expected, 'tolerance': 0.5}
+
+    def _run(self, code, scaling_job):
+        test_cases = [{'input_data': json.dumps([[1, 2]]), 'expected_output': 'true'}]
+        return execute_code(
+            code, test_cases, 'solution', limits={'timing_repeats': 5}, scaling=scaling_job
+        )
+
+    def test_within_complexity(self):
+        """Testa se uma solução linear passa em um desafio O(n)"""
+        sizes = [50000, 100000, 200000, 400000]
+        result = self._run(LINEAR, self._scaling(sizes, 'n'))
+
+        self.assertEqual(result['status'], 'accepted')
+        self.assertEqual(result['scaling']['sizes'], sizes)
+        self.assertLessEqual(result['scaling']['excess_exponent'], 0.5)
+
+    def test_exceeds_complexity(self):
+        """Testa se uma solução quadrática é rejeitada em um desafio O(n)"""
+        result = self._run(QUADRATIC, self._scaling([150, 300, 600, 1200], 'n'))
+
+        self.assertEqual(result['status'], 'time_limit')
+        self.assertIn('O(n)', result['message'])
+        self.assertIsNone(result['failed_test'])
+
+    def test_skipped_when_a_test_fails(self):
+        """Testa que o teste de escala só roda se os casos passarem"""
+        code = "def solution(items):\n    return False"
+        result = self._run(code, self._scaling([100, 200], 'n'))
+
+        self.assertEqual(result['status'], 'wrong_answer')
+        self.assertNotIn('scaling', result)
+
+
+class ScalingInputsTest(TestCase):
+    """Testes para as entradas geradas e a integração com o avaliador"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.challenge = Challenge.objects.create(
+            title='Distintos', slug='distintos', description='Distintos',
+            expected_complexity='n', scaling_generator=GENERATOR,
+            scaling_base_size=150, scaling_steps=4
+        )
+        ChallengeTestCase.objects.create(
+            challenge=self.challenge, input_data='[[1, 2]]', expected_output='true'
+        )
+
+    def test_inputs_are_built_once(self):
+        """Testa se as entradas geradas ficam em cache até o desafio mudar"""
+        inputs = scaling.get_scaling_inputs(self.challenge)
+        self.assertEqual([size for size, _ in inputs], [150, 300, 600, 1200])
+        self.assertEqual(len(inputs[-1][1][0]), 1200)
+        self.assertIs(scaling.get_scaling_inputs(self.challenge), inputs)
+
+        self.challenge.scaling_steps = 2
+        self.challenge.save()
+        self.assertEqual(len(scaling.get_scaling_inputs(self.challenge)), 2)
+
+    def test_invalid_generator_skips_check(self):
+        """Testa se um gerador com erro não impede a avaliação"""
+        self.challenge.scaling_generator = 'def gerar(n):\n    return [n]'
+        self.challenge.save()
+
+        with self.assertLogs('problems.scaling', 'ERROR'):
+            self.assertIsNone(scaling.get_scaling_job(self.challenge))
+
+    def test_judge_rejects_slow_solution(self):
+        """Testa se o avaliador rejeita a solução quadrática"""
+        submission = enqueue_submission(self.user, self.challenge, QUADRATIC)
+        result = judge_submission(submission)
+
+        self.assertEqual(result['status'], 'time_limit')
+        submission.refresh_from_db()
+        self.assertEqual(submission.status, 'time_limit')
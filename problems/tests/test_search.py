@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from problems import search
+from problems.models import Challenge
+
+
+class ChallengeSearchTest(TestCase):
+    """Testes para a busca textual de desafios"""
+
+    def setUp(self):
+        self.sum_challenge = Challenge.objects.create(
+            title='Soma de Dois Números',
+            slug='soma',
+            description='Retorne a soma de a e b.'
+        )
+        self.list_challenge = Challenge.objects.create(
+            title='Maior Elemento',
+            slug='maior-elemento',
+            description='Percorra a lista e some os elementos não é o objetivo.'
+        )
+        self.reverse_challenge = Challenge.objects.create(
+            title='Inverter String',
+            slug='inverter-string',
+            description='Retorne a string invertida.'
+        )
+
+    def _search(self, query):
+        challenges, _ = search.filter_challenges(Challenge.objects.all(), query)
+        return [challenge.slug for challenge in challenges]
+
+    def test_title_ranks_above_description(self):
+        """Testa se o título pesa mais que a descrição"""
+        Challenge.objects.filter(pk=self.list_challenge.pk).update(
+            description='Nada de soma aqui, apenas soma e soma.'
+        )
+        self.assertEqual(self._search('soma'), ['soma', 'maior-elemento'])
+
+    def test_prefix_match(self):
+        """Testa se o último termo casa por prefixo"""
+        self.assertEqual(self._search('inver'), ['inverter-string'])
+
+    def test_ignores_accents(self):
+        """Testa busca sem acentos"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('Remoção de acentos configurada apenas no FTS5')
+        self.assertEqual(self._search('numeros'), ['soma'])
+
+    def test_all_terms_required(self):
+        """Testa se todos os termos precisam aparecer"""
+        self.assertEqual(self._search('retorne string'), ['inverter-string'])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Testa se o índice acompanha alterações nos desafios"""
+        self.reverse_challenge.title = 'Palíndromo'
+        self.reverse_challenge.save()
+        self.assertEqual(self._search('palindromo'), ['inverter-string'])
+        self.assertEqual(self._search('inverter'), [])
+
+        self.reverse_challenge.delete()
+        self.assertEqual(self._search('palindromo'), [])
+
+    def test_operators_are_not_interpreted(self):
+        """Testa se sintaxe de busca digitada pelo usuário não quebra a consulta"""
+        self.assertEqual(self._search('"soma*'), ['soma'])
+        self.assertEqual(self._search('soma" OR NEAR(*'), [])
+        self.assertEqual(self._search('!!!'), [])
+
+    def test_ranked_results_are_paginated(self):
+        """Testa se a segunda página da busca é alcançável pelo cursor"""
+        Challenge.objects.filter(pk=self.list_challenge.pk).update(
+            description='Nada de soma aqui, apenas soma e soma.'
+        )
+        url = reverse('challenge_list_api')
+        first = self.client.get(url, {'search': 'soma', 'limit': 1}).json()
+        self.assertEqual([c['slug'] for c in first['results']], ['soma'])
+        self.assertIsNotNone(first['next_cursor'])
+
+        second = self.client.get(
+            url, {'search': 'soma', 'limit': 1, 'cursor': first['next_cursor']}
+        ).json()
+        self.assertEqual([c['slug'] for c in second['results']], ['maior-elemento'])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_filters_apply_to_every_match(self):
+        """Testa a busca filtrada e paginada com centenas de resultados"""
+        Challenge.objects.bulk_create([
+            Challenge(title=f'Array {n}', slug=f'array-{n}', description='Array', difficulty='easy')
+            for n in range(250)
+        ])
+        hard = Challenge.objects.create(
+            title='Array Difícil', slug='array-dificil', description='Array', difficulty='hard'
+        )
+
+        challenges, _ = search.filter_challenges(
+            Challenge.objects.filter(difficulty='hard'), 'array'
+        )
+        self.assertEqual([c.slug for c in challenges], [hard.slug])
+
+        # A paginação alcança todos os resultados, sem limite de candidatos
+        url = reverse('challenge_list_api')
+        slugs, cursor = [], None
+        while True:
+            params = {'search': 'array', 'limit': 100}
+            if cursor:
+                params['cursor'] = cursor
+            page = self.client.get(url, params).json()
+            slugs += [c['slug'] for c in page['results']]
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(len(slugs), 251)
+        self.assertEqual(len(set(slugs)), 251)
+
+    def test_fallback_without_index(self):
+        """Testa a busca com icontains quando o banco não tem índice"""
+        with mock.patch.object(search, '_backend', return_value=None):
+            challenges, ranked = search.filter_challenges(Challenge.objects.all(), 'String')
+
+        self.assertFalse(ranked)
+        self.assertEqual([c.slug for c in challenges], ['inverter-string'])
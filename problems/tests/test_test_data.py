@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from problems import test_data, test_suites
+from problems.code_executor import execute_code
+from problems.judge import enqueue_submission, judge_submission
+from problems.models import Challenge, TestCase as ChallengeTestCase
+
+
+class TestDataFilesTest(TestCase):
+    """Testes para os casos de teste guardados em arquivo"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        settings_override = override_settings(TEST_DATA_ROOT=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        test_suites.clear()
+
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.challenge = Challenge.objects.create(
+            title='Soma', slug='soma', description='Somar a lista'
+        )
+        self.items = list(range(100000))
+
+    def test_write_and_read(self):
+        """Testa a gravação por conteúdo e a leitura com mmap"""
+        path, digest, size = test_data.write_test_data(self.root, [self.items], sum(self.items))
+
+        self.assertEqual(path, os.path.join(digest[:2], digest + '.jsonl'))
+        self.assertEqual(os.path.getsize(os.path.join(self.root, path)), size)
+        self.assertEqual(
+            test_data.read_test_data(os.path.join(self.root, path)),
+            ([self.items], sum(self.items))
+        )
+        self.assertEqual(test_data.file_digest(os.path.join(self.root, path)), digest)
+        # Conteúdo igual, mesmo arquivo
+        self.assertEqual(test_data.write_test_data(self.root, [self.items], sum(self.items))[0], path)
+
+    def test_missing_file(self):
+        """Testa se um arquivo ausente vira erro nos dados de teste"""
+        test_cases = [{
+            'input_data': '(arquivo)', 'expected_output': '(arquivo)',
+            'data_file': os.path.join(self.root, 'ausente.jsonl'),
+        }]
+        result = execute_code("def solution(items):\n    return sum(items)", test_cases)
+
+        self.assertEqual(result['status'], 'runtime_error')
+        self.assertEqual(result['message'], 'Erro no formato dos dados de teste')
+
+    def test_suite_carries_only_the_path(self):
+        """Testa se a suíte e o avaliador não carregam os dados do arquivo"""
+        test_case = ChallengeTestCase(challenge=self.challenge)
+        test_case.store_data([self.items], sum(self.items))
+        test_case.save()
+
+        suite = test_suites.get_test_suite(Challenge.objects.get(id=self.challenge.id))
+        case = suite.cases[0]
+        self.assertNotIn('args', case)
+        self.assertEqual(case['data_file'], test_case.data_path)
+
+        submission = enqueue_submission(
+            self.user, self.challenge, "def solution(items):\n    return sum(items)"
+        )
+        result = judge_submission(submission)
+        self.assertEqual(result['status'], 'accepted')
+        self.assertIn('bytes', result['test_results'][0]['input'])
+
+    def test_move_test_data_command(self):
+        """Testa se o comando move só os casos grandes para arquivos"""
+        small = ChallengeTestCase.objects.create(
+            challenge=self.challenge, input_data='[[1, 2]]', expected_output='3'
+        )
+        large = ChallengeTestCase.objects.create(
+            challenge=self.challenge,
+            input_data=json.dumps([self.items]),
+            expected_output=json.dumps(sum(self.items))
+        )
+
+        call_command('move_test_data', min_size=1000, stdout=StringIO())
+
+        small.refresh_from_db()
+        large.refresh_from_db()
+        self.assertEqual(small.data_file, '')
+        self.assertEqual(large.input_data, '')
+        self.assertEqual(
+            test_data.read_test_data(large.data_path), ([self.items], sum(self.items))
+        )
+
+        out = StringIO()
+        call_command('move_test_data', verify=True, stdout=out)
+        self.assertIn('Todos os arquivos conferem', out.getvalue())
@@ -0,0 +1,91 @@
+from django.test import TestCase
+
+from problems import test_suites
+from problems.models import Challenge, TestCase as ChallengeTestCase
+
+
+class TestSuiteCacheTest(TestCase):
+    """Testes para o cache de suítes de teste"""
+
+    def setUp(self):
+        test_suites.clear()
+        self.challenge = Challenge.objects.create(
+            title='Soma',
+            slug='soma',
+            description='Somar',
+            difficulty='easy',
+            function_name='solution'
+        )
+        self.sample = ChallengeTestCase.objects.create(
+            challenge=self.challenge,
+            input_data='[2, 3]',
+            expected_output='5',
+            is_sample=True
+        )
+        ChallengeTestCase.objects.create(
+            challenge=self.challenge,
+            input_data='[10, 20]',
+            expected_output='30'
+        )
+
+    def _challenge(self):
+        return Challenge.objects.get(id=self.challenge.id)
+
+    def test_cases_are_parsed(self):
+        """Testa se entrada e saída já vêm decodificadas"""
+        suite = test_suites.get_test_suite(self._challenge())
+
+        self.assertEqual(len(suite.cases), 2)
+        self.assertEqual(suite.cases[0]['args'], [2, 3])
+        self.assertEqual(suite.cases[0]['expected'], 5)
+        self.assertEqual(len(suite.samples), 1)
+
+    def test_cached_suite_skips_database(self):
+        """Testa se a suíte em cache não consulta o banco"""
+        test_suites.get_test_suite(self._challenge())
+        challenge = self._challenge()
+
+        with self.assertNumQueries(0):
+            suite = test_suites.get_test_suite(challenge)
+        self.assertEqual(len(suite.cases), 2)
+
+    def test_saving_test_case_invalidates(self):
+        """Testa se alterar um caso de teste gera uma nova suíte"""
+        old = test_suites.get_test_suite(self._challenge())
+        self.sample.expected_output = '6'
+        self.sample.save()
+
+        suite = test_suites.get_test_suite(self._challenge())
+        self.assertEqual(suite.cases[0]['expected'], 6)
+        self.assertNotEqual(suite.version, old.version)
+
+    def test_revision_detects_changes_from_other_processes(self):
+        """Testa se a revisão no banco invalida o cache local"""
+        test_suites.get_test_suite(self._challenge())
+        # Simula a mudança feita por outro processo: o cache local
+        # continua populado, mas a revisão no banco muda
+        ChallengeTestCase.objects.filter(id=self.sample.id).update(expected_output='7')
+        Challenge.objects.filter(id=self.challenge.id).update(test_suite_revision=99)
+
+        suite = test_suites.get_test_suite(self._challenge())
+        self.assertEqual(suite.cases[0]['expected'], 7)
+
+    def test_deleting_test_case_invalidates(self):
+        """Testa se remover um caso de teste gera uma nova suíte"""
+        test_suites.get_test_suite(self._challenge())
+        self.sample.delete()
+
+        suite = test_suites.get_test_suite(self._challenge())
+        self.assertEqual(len(suite.cases), 1)
+        self.assertEqual(suite.samples, ())
+
+    def test_invalid_json_left_for_executor(self):
+        """Testa se JSON inválido fica sem decodificar"""
+        ChallengeTestCase.objects.create(
+            challenge=self.challenge,
+            input_data='invalid json',
+            expected_output='5'
+        )
+        suite = test_suites.get_test_suite(self._challenge())
+
+        self.assertNotIn('args', suite.cases[2])
@@ -0,0 +1,90 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from problems import verdict_cache
+from problems.judge import enqueue_submission, judge_submission
+from problems.models import Challenge, TestCase as ChallengeTestCase, VerdictCache
+
+
+class VerdictCacheTest(TestCase):
+    """Testes para o cache de vereditos"""
+
+    def setUp(self):
+        verdict_cache.clear_memory()
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.challenge = Challenge.objects.create(
+            title='Soma',
+            slug='soma',
+            description='Somar',
+            difficulty='easy',
+            function_name='solution'
+        )
+        self.test_case = ChallengeTestCase.objects.create(
+            challenge=self.challenge,
+            input_data='[2, 3]',
+            expected_output='5'
+        )
+        self.code = 'def solution(a, b):\n    return a + b'
+
+    def _judge(self, code):
+        submission = enqueue_submission(self.user, self.challenge, code)
+        judge_submission(submission)
+        submission.refresh_from_db()
+        return submission
+
+    def test_normalize_code(self):
+        """Testa se só as quebras de linha são normalizadas"""
+        self.assertEqual(
+            verdict_cache.code_hash('def f():\r\n    return 1\r\n'),
+            verdict_cache.code_hash('def f():\n    return 1\n')
+        )
+        self.assertNotEqual(
+            verdict_cache.code_hash('def f():\n    return 1 + \\ \n        2'),
+            verdict_cache.code_hash('def f():\n    return 1 + \\\n        2')
+        )
+
+    def test_whitespace_in_string_misses_cache(self):
+        """Testa se espaços no fim de uma linha dentro de string não reaproveitam o veredito"""
+        code = 'def solution(a, b):\n    """x  \n    """\n    return a + b'
+        self._judge(code)
+        submission = self._judge(code.replace('x  \n', 'x\n'))
+
+        self.assertFalse(submission.cache_hit)
+
+    def test_duplicate_submission_hits_cache(self):
+        """Testa se código idêntico reaproveita o veredito"""
+        first = self._judge(self.code)
+        second = self._judge(self.code.replace('\n', '\r\n'))
+
+        self.assertFalse(first.cache_hit)
+        self.assertTrue(second.cache_hit)
+        self.assertEqual(second.status, 'accepted')
+        self.assertEqual(second.test_results, first.test_results)
+
+    def test_database_level_shared_between_processes(self):
+        """Testa se o veredito é encontrado no banco sem o cache em memória"""
+        self._judge(self.code)
+        verdict_cache.clear_memory()
+
+        self.assertTrue(self._judge(self.code).cache_hit)
+        self.assertEqual(VerdictCache.objects.get().hits, 1)
+
+    def test_changing_test_cases_invalidates(self):
+        """Testa se alterar os casos de teste invalida o cache"""
+        self._judge(self.code)
+        self.test_case.expected_output = '6'
+        self.test_case.save()
+
+        self.assertFalse(VerdictCache.objects.exists())
+        submission = self._judge(self.code)
+        self.assertFalse(submission.cache_hit)
+        self.assertEqual(submission.status, 'wrong_answer')
+
+    def test_time_limit_not_cached(self):
+        """Testa se vereditos dependentes de carga não são guardados"""
+        self.challenge.time_limit = 0.2
+        self.challenge.cpu_time_limit = 0.2
+        self.challenge.save()
+        self._judge('def solution(a, b):\n    while True:\n        pass')
+
+        self.assertFalse(VerdictCache.objects.exists())
@@ -1,7 +1,13 @@
-from django.test import TestCase, Client
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.utils import timezone
 from django.urls import reverse
 from django.contrib.auth.models import User
-from problems.models import Challenge, TestCase as ChallengeTestCase, Submission
+from problems import stats
+from problems.models import Challenge, TestCase as ChallengeTestCase, Submission, UserSolved
+from problems.stats import get_home_stats
+from unittest import mock
 import json
 
 
@@ -9,6 +15,7 @@ class HomeViewTest(TestCase):
     """Testes para a view home"""
     
     def setUp(self):
+        cache.clear()
         self.client = Client()
     
     def test_home_view_status_code(self):
@@ -29,6 +36,62 @@ class HomeViewTest(TestCase):
         self.assertIn('submissions_count', response.context)
 
 
+class PageCacheTest(TestCase):
+    """Testes para o cache de páginas e das estatísticas da home"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='12345')
+    
+    def test_anonymous_home_is_cached(self):
+        """Testa se a segunda visita anônima não renderiza o template"""
+        self.client.get(reverse('home'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'CodePlatform')
+    
+    def test_authenticated_user_bypasses_cache(self):
+        """Testa se usuários autenticados não recebem a página em cache"""
+        self.client.get(reverse('challenge_list'))
+        self.client.login(username='testuser', password='12345')
+        response = self.client.get(reverse('challenge_list'))
+        self.assertTemplateUsed(response, 'problems/problem_list.html')
+        self.assertContains(response, 'testuser')
+    
+    def test_challenge_write_invalidates_pages(self):
+        """Testa se criar um desafio descarta as páginas em cache"""
+        self.client.get(reverse('challenge_list'))
+        Challenge.objects.create(title='Novo Desafio', slug='novo', description='Novo')
+        response = self.client.get(reverse('challenge_list'))
+        self.assertContains(response, 'Novo Desafio')
+    
+    def test_pending_messages_bypass_cache(self):
+        """Testa se uma página com mensagem não é servida nem guardada no cache"""
+        self.client.get(reverse('home'))
+        self.client.login(username='testuser', password='12345')
+        response = self.client.get(reverse('logout'), follow=True)
+        self.assertContains(response, 'Você saiu da sua conta')
+    
+    def test_home_stats_served_stale_while_refreshing(self):
+        """Testa se estatísticas vencidas são servidas enquanto atualizam"""
+        self.assertEqual(get_home_stats()['users_count'], 1)
+        User.objects.create_user(username='other', password='12345')
+        
+        entry = cache.get(stats.HOME_STATS_KEY)
+        entry['fresh_until'] = 0
+        cache.set(stats.HOME_STATS_KEY, entry)
+        with mock.patch.object(stats, '_refresh_in_background') as refresh:
+            self.assertEqual(get_home_stats()['users_count'], 1)
+            self.assertEqual(get_home_stats()['users_count'], 1)
+        # Só uma atualização por vez
+        refresh.assert_called_once()
+        
+        stats.refresh_home_stats()
+        self.assertEqual(get_home_stats()['users_count'], 2)
+
+
 class RegisterViewTest(TestCase):
     """Testes para a view de registro"""
     
@@ -103,6 +166,7 @@ class ChallengeListViewTest(TestCase):
     """Testes para a view de lista de desafios"""
     
     def setUp(self):
+        cache.clear()
         self.client = Client()
         Challenge.objects.create(
             title='Desafio 1',
@@ -134,6 +198,88 @@ class ChallengeListViewTest(TestCase):
         """Testa busca por título"""
         response = self.client.get(reverse('challenge_list') + '?search=Desafio 1')
         self.assertEqual(len(response.context['challenges']), 1)
+    
+    @override_settings(CHALLENGES_PAGE_SIZE=1)
+    def test_challenge_list_pagination(self):
+        """Testa paginação por cursor da listagem"""
+        response = self.client.get(reverse('challenge_list'))
+        self.assertEqual([c.slug for c in response.context['challenges']], ['desafio-2'])
+        self.assertIsNotNone(response.context['next_page_url'])
+        
+        response = self.client.get(reverse('challenge_list') + response.context['next_page_url'])
+        self.assertEqual([c.slug for c in response.context['challenges']], ['desafio-1'])
+        self.assertIsNone(response.context['next_page_url'])
+        self.assertIsNotNone(response.context['first_page_url'])
+    
+    def test_challenge_list_invalid_cursor(self):
+        """Testa se um cursor inválido volta para a primeira página"""
+        response = self.client.get(reverse('challenge_list') + '?cursor=xyz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['challenges']), 2)
+
+
+class ChallengeListApiTest(TestCase):
+    """Testes para a API de listagem de desafios"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        created_at = timezone.now()
+        # Mesma data de criação: o id desempata a ordem
+        self.challenges = [
+            Challenge.objects.create(
+                title=f'Desafio {n}',
+                slug=f'desafio-{n}',
+                description=f'Descrição {n}',
+                difficulty='easy',
+                created_at=created_at
+            )
+            for n in range(5)
+        ]
+    
+    def _fetch_all(self, **params):
+        slugs = []
+        cursor = None
+        while True:
+            query = dict(params)
+            if cursor:
+                query['cursor'] = cursor
+            data = self.client.get(reverse('challenge_list_api'), query).json()
+            slugs.extend(row['slug'] for row in data['results'])
+            cursor = data['next_cursor']
+            if cursor is None:
+                return slugs
+    
+    def test_pages_cover_all_challenges_once(self):
+        """Testa se as páginas percorrem todos os desafios sem repetir"""
+        slugs = self._fetch_all(limit=2)
+        self.assertEqual(slugs, [f'desafio-{n}' for n in reversed(range(5))])
+    
+    def test_rows_carry_counts_and_solved_flag(self):
+        """Testa os campos de cada linha"""
+        UserSolved.objects.create(user=self.user, challenge=self.challenges[0])
+        Challenge.objects.filter(pk=self.challenges[0].pk).update(
+            solved_count=1, attempt_count=4, accepted_count=1
+        )
+        self.client.login(username='testuser', password='12345')
+        data = self.client.get(reverse('challenge_list_api'), {'search': 'Desafio 0'}).json()
+        
+        self.assertEqual(data['results'], [{
+            'id': self.challenges[0].id,
+            'slug': 'desafio-0',
+            'title': 'Desafio 0',
+            'difficulty': 'easy',
+            'solved_count': 1,
+            'attempt_count': 4,
+            'acceptance_rate': 25.0,
+            'solved': True,
+        }])
+    
+    def test_invalid_cursor(self):
+        """Testa erro para cursor inválido"""
+        response = self.client.get(reverse('challenge_list_api'), {'cursor': 'xyz'})
+        self.assertEqual(response.status_code, 400)
 
 
 class ChallengeDetailViewTest(TestCase):
@@ -223,6 +369,18 @@ class RunCodeViewTest(TestCase):
         self.assertEqual(response.status_code, 400)
 
 
+    def test_run_code_too_deeply_nested(self):
+        """Testa se código que estoura o compilador vira erro de execução"""
+        self.client.login(username='testuser', password='12345')
+        code = 'def solution(a, b):\n    return ' + '-' * 200000 + 'a'
+        response = self.client.post(
+            reverse('run_code', args=['soma']),
+            data=json.dumps({'code': code}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'runtime_error')
+
 class SubmitCodeViewTest(TestCase):
     """Testes para a view de submeter código"""
     
@@ -279,6 +437,69 @@ class SubmitCodeViewTest(TestCase):
         
         profile.refresh_from_db()
         self.assertEqual(profile.total_submissions, initial_submissions + 1)
+    
+    def test_submit_code_returns_pending(self):
+        """Testa se a submissão é enfileirada e retorna imediatamente"""
+        self.client.login(username='testuser', password='12345')
+        data = {
+            'code': 'def solution(a, b):\n    return a + b'
+        }
+        response = self.client.post(
+            reverse('submit_code', args=['soma']),
+            data=json.dumps(data),
+            content_type='application/json'
+        )
+        result = response.json()
+        self.assertEqual(result['status'], 'pending')
+        self.assertFalse(result['finished'])
+        self.assertIn('submission_id', result)
+    
+    def test_submit_code_eager(self):
+        """Testa avaliação na própria requisição com JUDGE_EAGER"""
+        self.client.login(username='testuser', password='12345')
+        data = {
+            'code': 'def solution(a, b):\n    return a + b'
+        }
+        with self.settings(JUDGE_EAGER=True):
+            response = self.client.post(
+                reverse('submit_code', args=['soma']),
+                data=json.dumps(data),
+                content_type='application/json'
+            )
+        result = response.json()
+        self.assertEqual(result['status'], 'accepted')
+        self.assertTrue(result['finished'])
+    
+    def test_submission_status(self):
+        """Testa consulta do status de uma submissão"""
+        self.client.login(username='testuser', password='12345')
+        submission = Submission.objects.create(
+            user=self.user,
+            challenge=self.challenge,
+            code='def solution(a, b):\n    return a + b',
+            status='accepted',
+            result_message='Todos os testes passaram!'
+        )
+        response = self.client.get(
+            reverse('submission_status', args=['soma', submission.id])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'accepted')
+        self.assertTrue(response.json()['finished'])
+    
+    def test_submission_status_other_user(self):
+        """Testa se um usuário não vê o status de submissões alheias"""
+        other = User.objects.create_user(username='other', password='12345')
+        submission = Submission.objects.create(
+            user=other,
+            challenge=self.challenge,
+            code='def solution(a, b):\n    return a + b'
+        )
+        self.client.login(username='testuser', password='12345')
+        response = self.client.get(
+            reverse('submission_status', args=['soma', submission.id])
+        )
+        self.assertEqual(response.status_code, 404)
 
 
 class UserProfileViewTest(TestCase):
@@ -302,4 +523,94 @@ class UserProfileViewTest(TestCase):
         self.assertIn('profile', response.context)
         self.assertIn('recent_submissions', response.context)
         self.assertIn('solved_challenges', response.context)
+    
+    def test_profile_lists_solved_challenges(self):
+        """Testa se o perfil lista os desafios do conjunto de resolvidos"""
+        challenge = Challenge.objects.create(
+            title='Soma', slug='soma', description='Somar', difficulty='easy'
+        )
+        UserSolved.objects.create(user=self.user, challenge=challenge)
+        self.client.login(username='testuser', password='12345')
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(list(response.context['solved_challenges']), [challenge])
+
+
+
+class SubmissionEventsViewTest(TestCase):
+    """Testes para o endpoint de eventos da submissão"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.challenge = Challenge.objects.create(
+            title='Soma',
+            slug='soma',
+            description='Somar',
+            difficulty='easy',
+            function_name='solution'
+        )
+        self.submission = Submission.objects.create(
+            user=self.user,
+            challenge=self.challenge,
+            code='def solution(a, b):\n    return a + b',
+            status='accepted',
+            result_message='Todos os testes passaram!',
+            test_results=[
+                {'test_number': 1, 'passed': True},
+                {'test_number': 2, 'passed': True},
+            ]
+        )
+        self.url = reverse('submission_events', args=['soma', self.submission.id])
+    
+    async def _read_stream(self, response):
+        return ''.join([
+            chunk.decode() if isinstance(chunk, bytes) else chunk
+            async for chunk in response.streaming_content
+        ])
+    
+    async def test_events_require_login(self):
+        """Testa se requer autenticação"""
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+    
+    async def test_events_stream_tests_and_done(self):
+        """Testa se transmite cada teste e o resultado final"""
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(self.url)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = await self._read_stream(response)
+        self.assertEqual(body.count('event: test'), 2)
+        self.assertIn('event: done', body)
+        self.assertIn('"status": "accepted"', body)
+    
+    async def test_events_resume_from_last_event_id(self):
+        """Testa se retoma a partir do Last-Event-ID"""
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(self.url, headers={'Last-Event-ID': '1'})
+        
+        body = await self._read_stream(response)
+        self.assertEqual(body.count('event: test'), 1)
+        self.assertIn('id: 2', body)
+
+    @override_settings(SUBMISSION_EVENTS_POLL_INTERVAL=0)
+    def test_events_stream_incrementally_under_wsgi(self):
+        """Testa se sob WSGI cada evento sai antes de a avaliação terminar"""
+        self.submission.status = 'running'
+        self.submission.test_results = [{'test_number': 1, 'passed': True}]
+        self.submission.save()
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+
+        self.assertFalse(response.is_async)
+        chunks = iter(response.streaming_content)
+        self.assertEqual(next(chunks), b'retry: 1000\n\n')
+        self.assertIn(b'event: test', next(chunks))
+        self.assertEqual(next(chunks), b': keep-alive\n\n')
 
+        self.submission.status = 'accepted'
+        self.submission.test_results.append({'test_number': 2, 'passed': True})
+        self.submission.save()
+        body = b''.join(chunks).decode()
+        self.assertIn('id: 2', body)
+        self.assertIn('event: done', body)
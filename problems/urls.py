@@ -8,9 +8,13 @@ urlpatterns = [
     
     # URLs novas (challenge)
     path('challenges/', views.challenge_list, name='challenge_list'),
+    path('api/challenges/', views.challenge_list_api, name='challenge_list_api'),
     path('challenge/<slug:slug>/', views.challenge_detail, name='challenge_detail'),
     path('challenge/<slug:slug>/run/', views.run_code, name='run_code'),
     path('challenge/<slug:slug>/submit/', views.submit_code, name='submit_code'),
+    path('challenge/<slug:slug>/runtimes/', views.runtime_distribution, name='runtime_distribution'),
+    path('challenge/<slug:slug>/submission/<int:submission_id>/status/', views.submission_status, name='submission_status'),
+    path('challenge/<slug:slug>/submission/<int:submission_id>/events/', views.submission_events, name='submission_events'),
     
     # URLs antigas (problem) - Redirects para compatibilidade
     path('problems/', RedirectView.as_view(pattern_name='challenge_list', permanent=True)),
@@ -27,8 +31,9 @@ urlpatterns = [
     path('login/', views.user_login, name='login'),
     path('logout/', views.user_logout, name='logout'),
     
-    # Perfil e submissões
+    # Perfil, ranking e submissões
     path('profile/', views.user_profile, name='profile'),
+    path('leaderboard/', views.leaderboard, name='leaderboard'),
     path('submission/<int:submission_id>/', views.submission_detail, name='submission_detail'),
 ]
 
@@ -0,0 +1,155 @@
+"""
+Cache de vereditos por conteúdo.
+
+Submissões com o mesmo código (depois de normalizado) para a mesma versão
+da suíte de testes recebem o veredito já calculado, sem passar pelo
+sandbox. Há dois níveis: um LRU em memória por processo e a tabela
+``VerdictCache``, compartilhada entre processos.
+
+A versão da suíte é um hash dos casos de teste, da função e dos limites do
+desafio, então uma mudança em qualquer um deles gera chaves novas. Os
+registros antigos de um desafio são apagados quando seus casos de teste
+mudam (ver signals.py).
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .code_executor import total_cpu_time
+from .lru import LRUCache
+from .models import VerdictCache
+from .sandbox import CRASH_MESSAGE
+
+
+DEFAULT_CACHE_SIZE = 1024
+
+# Vereditos que dependem da carga da máquina não são reaproveitados
+CACHEABLE_STATUSES = ('accepted', 'wrong_answer', 'runtime_error')
+
+_memory = LRUCache(getattr(settings, 'VERDICT_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+
+
+def is_enabled():
+    return getattr(settings, 'VERDICT_CACHE_ENABLED', True)
+
+
+def normalize_code(code):
+    """
+    Normaliza as quebras de linha, que o compilador já trata como iguais
+
+    Espaços não são removidos: dentro de strings ou depois de uma barra de
+    continuação eles mudam o programa.
+    """
+    return code.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def code_hash(code):
+    """Hash SHA-256 do código normalizado"""
+    return hashlib.sha256(normalize_code(code).encode('utf-8')).hexdigest()
+
+
+def _case_key(test_case):
+    key = [test_case['input_data'], test_case['expected_output']]
+    if 'data_sha256' in test_case:
+        key.append(test_case['data_sha256'])
+    return key
+
+
+def suite_version(challenge, test_cases):
+    """
+    Hash que identifica a suíte de testes, a função, os limites, o teste
+    de escala e o comparador da saída do desafio
+    """
+    parts = [
+        challenge.function_name,
+        challenge.get_execution_limits(),
+        [_case_key(tc) for tc in test_cases],
+    ]
+    if challenge.has_scaling_test:
+        parts.append([
+            challenge.expected_complexity,
+            challenge.scaling_generator,
+            challenge.get_scaling_sizes(),
+        ])
+    if challenge.comparator != 'exact':
+        parts.append(challenge.get_comparison())
+    payload = json.dumps(parts, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _result_from_entry(entry):
+    return {
+        'status': entry.status,
+        'message': entry.result_message,
+        'execution_time': entry.execution_time,
+        'cpu_time': total_cpu_time(entry.test_results),
+        'failed_test': entry.failed_test,
+        'test_results': entry.test_results,
+    }
+
+
+def lookup(challenge, code_digest, version):
+    """
+    Procura o veredito em memória e depois no banco
+
+    Returns:
+        dict no formato do executor ou None
+    """
+    if not is_enabled():
+        return None
+
+    key = (challenge.id, code_digest, version)
+    result = _memory.get(key)
+    if result is not None:
+        return result
+
+    entry = VerdictCache.objects.filter(
+        code_hash=code_digest,
+        suite_version=version
+    ).first()
+    if entry is None:
+        return None
+
+    VerdictCache.objects.filter(id=entry.id).update(hits=F('hits') + 1)
+    result = _result_from_entry(entry)
+    _memory.set(key, result)
+    return result
+
+
+def store(challenge, code_digest, version, result):
+    """Guarda o veredito se ele for determinístico"""
+    if not is_enabled():
+        return
+    if result['status'] not in CACHEABLE_STATUSES or result['message'] == CRASH_MESSAGE:
+        return
+
+    entry = VerdictCache(
+        challenge=challenge,
+        code_hash=code_digest,
+        suite_version=version,
+        status=result['status'],
+        result_message=result['message'],
+        execution_time=result['execution_time'],
+        failed_test=result.get('failed_test'),
+        test_results=result.get('test_results', []),
+    )
+    try:
+        with transaction.atomic():
+            entry.save()
+    except IntegrityError:
+        # Outro worker avaliou o mesmo código ao mesmo tempo
+        pass
+    _memory.set((challenge.id, code_digest, version), _result_from_entry(entry))
+
+
+def invalidate_challenge(challenge_id):
+    """Descarta os vereditos de um desafio cujos testes mudaram"""
+    VerdictCache.objects.filter(challenge_id=challenge_id).delete()
+    _memory.discard_where(lambda key: key[0] == challenge_id)
+
+
+def clear_memory():
+    _memory.clear()
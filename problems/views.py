@@ -2,29 +2,48 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
 from django.views.decorators.http import require_POST
-from django.db.models import Count, Q
+from django.db.models import Count
+import asyncio
 import json
+import time
 
-from .models import Challenge, TestCase, Submission, UserProfile
+from .models import Challenge, TestCase, Submission, UserSolved
 from .forms import UserRegistrationForm, CodeSubmissionForm
-from .code_executor import execute_code
+from .sandbox import run_in_sandbox
+from .judge import enqueue_submission, judge_submission
+from .stats import get_home_stats, solved_challenge_ids
+from .page_cache import cache_page_for_anonymous
+from .pagination import DEFAULT_PAGE_SIZE, InvalidCursor, paginate, paginate_ranked
+from .search import filter_challenges
+from .leaderboard import get_user_rank, leaderboard_page
+from . import archive, runtimes
+from .archive import ARCHIVED_FIELDS
+from .test_suites import get_test_suite
 
 
+# Maior página aceita pela API de listagem
+MAX_API_PAGE_SIZE = 100
+
+
+@cache_page_for_anonymous
 def home(request):
     """Página inicial"""
-    challenges_count = Challenge.objects.count()
-    users_count = UserProfile.objects.count()
-    submissions_count = Submission.objects.count()
+    # Contagens em cache (ver stats.get_home_stats)
+    home_stats = get_home_stats()
+    challenges_count = home_stats['challenges_count']
     
     recent_challenges = Challenge.objects.all()[:6]
     
     context = {
         'challenges_count': challenges_count,
         'problems_count': challenges_count,  # Compatibilidade com templates
-        'users_count': users_count,
-        'submissions_count': submissions_count,
+        'users_count': home_stats['users_count'],
+        'submissions_count': home_stats['submissions_count'],
         'recent_challenges': recent_challenges,
         'recent_problems': recent_challenges,  # Compatibilidade com templates
     }
@@ -77,8 +96,8 @@ def user_logout(request):
     return redirect('home')
 
 
-def challenge_list(request):
-    """Lista todos os desafios"""
+def _filter_challenges(request):
+    """Aplica os filtros de dificuldade e busca da listagem de desafios"""
     challenges = Challenge.objects.all()
     
     # Filtro por dificuldade
@@ -86,33 +105,102 @@ def challenge_list(request):
     if difficulty:
         challenges = challenges.filter(difficulty=difficulty)
     
-    # Busca por título
+    # Busca textual no título e na descrição
     search = request.GET.get('search')
+    ranked = False
     if search:
-        challenges = challenges.filter(
-            Q(title__icontains=search) | Q(description__icontains=search)
-        )
+        challenges, ranked = filter_challenges(challenges, search)
+    
+    return challenges, difficulty, search, ranked
+
+
+def _paginate_challenges(challenges, ranked, cursor, page_size):
+    """Página da listagem; resultados de busca vêm por relevância"""
+    if ranked:
+        return paginate_ranked(challenges, cursor, page_size)
+    return paginate(challenges, cursor, page_size)
+
+
+def _page_size():
+    return getattr(settings, 'CHALLENGES_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+
+
+@cache_page_for_anonymous
+def challenge_list(request):
+    """Lista os desafios, paginados por cursor"""
+    challenges, difficulty, search, ranked = _filter_challenges(request)
+    
+    cursor = request.GET.get('cursor')
+    try:
+        page = _paginate_challenges(challenges, ranked, cursor, _page_size())
+    except InvalidCursor:
+        cursor = None
+        page = _paginate_challenges(challenges, ranked, None, _page_size())
     
     # Adicionar informação se o usuário já resolveu
-    if request.user.is_authenticated:
-        solved_challenges = Submission.objects.filter(
-            user=request.user,
-            status='accepted'
-        ).values_list('challenge_id', flat=True)
-    else:
-        solved_challenges = []
+    solved_challenges = solved_challenge_ids(
+        request.user, [challenge.id for challenge in page.items]
+    )
+    
+    # Links de paginação preservando os filtros
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    first_page_url = f'?{params.urlencode()}' if cursor else None
+    next_page_url = None
+    if page.next_cursor:
+        params['cursor'] = page.next_cursor
+        next_page_url = f'?{params.urlencode()}'
     
     context = {
-        'challenges': challenges,
-        'problems': challenges,  # Compatibilidade com templates
+        'challenges': page.items,
+        'problems': page.items,  # Compatibilidade com templates
         'solved_challenges': solved_challenges,
         'solved_problems': solved_challenges,  # Compatibilidade com templates
         'current_difficulty': difficulty,
         'search_query': search,
+        'next_cursor': page.next_cursor,
+        'next_page_url': next_page_url,
+        'first_page_url': first_page_url,
     }
     return render(request, 'problems/problem_list.html', context)
 
 
+def challenge_list_api(request):
+    """Lista os desafios em JSON, paginados por cursor"""
+    challenges, _, _, ranked = _filter_challenges(request)
+    challenges = challenges.only(
+        'id', 'slug', 'title', 'difficulty', 'created_at',
+        'solved_count', 'attempt_count', 'accepted_count'
+    )
+    
+    try:
+        limit = int(request.GET.get('limit', _page_size()))
+    except ValueError:
+        return JsonResponse({'error': 'Parâmetro limit inválido'}, status=400)
+    limit = max(1, min(limit, MAX_API_PAGE_SIZE))
+    
+    try:
+        page = _paginate_challenges(challenges, ranked, request.GET.get('cursor'), limit)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    solved = solved_challenge_ids(request.user, [challenge.id for challenge in page.items])
+    results = [
+        {
+            'id': challenge.id,
+            'slug': challenge.slug,
+            'title': challenge.title,
+            'difficulty': challenge.difficulty,
+            'solved_count': challenge.solved_count,
+            'attempt_count': challenge.attempt_count,
+            'acceptance_rate': challenge.acceptance_rate,
+            'solved': challenge.id in solved,
+        }
+        for challenge in page.items
+    ]
+    return JsonResponse({'results': results, 'next_cursor': page.next_cursor})
+
+
 # Alias para compatibilidade com URLs antigas
 problem_list = challenge_list
 
@@ -131,13 +219,12 @@ def challenge_detail(request, slug):
         user_submissions = Submission.objects.filter(
             user=request.user,
             challenge=challenge
-        ).order_by('-submitted_at')[:5]
+        ).defer(*ARCHIVED_FIELDS).order_by('-submitted_at')[:5]
         
         # Verificar se já resolveu (query separada, antes do slice)
-        user_solved = Submission.objects.filter(
+        user_solved = UserSolved.objects.filter(
             user=request.user,
-            challenge=challenge,
-            status='accepted'
+            challenge=challenge
         ).exists()
     
     form = CodeSubmissionForm(initial={'code': challenge.starter_code})
@@ -157,6 +244,12 @@ def challenge_detail(request, slug):
 problem_detail = challenge_detail
 
 
+def runtime_distribution(request, slug):
+    """Histograma de tempos das soluções aceitas (gráfico da página do desafio)"""
+    challenge = get_object_or_404(Challenge.objects.only('id'), slug=slug)
+    return JsonResponse(runtimes.distribution(challenge.id))
+
+
 @login_required
 @require_POST
 def run_code(request, slug):
@@ -171,22 +264,19 @@ def run_code(request, slug):
             return JsonResponse({'error': 'Código vazio'}, status=400)
         
         # Pegar apenas casos de teste de exemplo
-        test_cases = challenge.test_cases.filter(is_sample=True)
+        test_cases_data = get_test_suite(challenge).samples
         
-        if not test_cases.exists():
+        if not test_cases_data:
             return JsonResponse({'error': 'Nenhum caso de teste disponível'}, status=400)
         
-        # Preparar casos de teste
-        test_cases_data = [
-            {
-                'input_data': tc.input_data,
-                'expected_output': tc.expected_output
-            }
-            for tc in test_cases
-        ]
-        
         # Executar código
-        result = execute_code(code, test_cases_data, challenge.function_name)
+        result = run_in_sandbox(
+            code,
+            test_cases_data,
+            challenge.function_name,
+            limits=challenge.get_execution_limits(),
+            comparison=challenge.get_comparison()
+        )
         
         return JsonResponse(result)
     
@@ -207,70 +297,188 @@ def submit_code(request, slug):
         if not code:
             return JsonResponse({'error': 'Código vazio'}, status=400)
         
-        # Criar submissão
-        submission = Submission.objects.create(
-            user=request.user,
-            challenge=challenge,
-            code=code,
-            status='running'
-        )
-        
-        # Pegar todos os casos de teste
-        test_cases = challenge.test_cases.all()
-        
-        if not test_cases.exists():
-            submission.status = 'runtime_error'
-            submission.result_message = 'Nenhum caso de teste disponível'
-            submission.save()
-            return JsonResponse({'error': 'Nenhum caso de teste disponível'}, status=400)
-        
-        # Preparar casos de teste
-        test_cases_data = [
-            {
-                'input_data': tc.input_data,
-                'expected_output': tc.expected_output
-            }
-            for tc in test_cases
-        ]
-        
-        # Executar código
-        result = execute_code(code, test_cases_data, challenge.function_name)
-        
-        # Atualizar submissão
-        submission.status = result['status']
-        submission.result_message = result['message']
-        submission.execution_time = result['execution_time']
-        submission.save()
-        
-        # Atualizar perfil do usuário
-        profile = request.user.userprofile
-        profile.total_submissions += 1
-        
-        # Se foi aceito e é a primeira vez que resolve este desafio
-        if result['status'] == 'accepted':
-            previous_accepted = Submission.objects.filter(
+        if not get_test_suite(challenge).cases:
+            Submission.objects.create(
                 user=request.user,
                 challenge=challenge,
-                status='accepted'
-            ).exclude(id=submission.id).exists()
-            
-            if not previous_accepted:
-                profile.challenges_solved += 1
+                code=code,
+                status='runtime_error',
+                result_message='Nenhum caso de teste disponível'
+            )
+            return JsonResponse({'error': 'Nenhum caso de teste disponível'}, status=400)
+        
+        # Colocar a submissão na fila de avaliação
+        submission = enqueue_submission(request.user, challenge, code)
         
-        profile.save()
+        # Em desenvolvimento é possível avaliar na própria requisição
+        if getattr(settings, 'JUDGE_EAGER', False):
+            judge_submission(submission)
         
-        return JsonResponse({
-            'submission_id': submission.id,
-            'status': submission.status,
-            'message': submission.result_message,
-            'execution_time': submission.execution_time,
-            'test_results': result.get('test_results', [])
-        })
+        return JsonResponse(_submission_payload(submission))
     
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+QUEUE_MESSAGES = {
+    'pending': 'Submissão na fila de avaliação',
+    'running': 'Avaliando submissão...',
+}
+
+
+def _submission_payload(submission):
+    """Dados de uma submissão no formato retornado pela API"""
+    return {
+        'submission_id': submission.id,
+        'status': submission.status,
+        'message': submission.result_message or QUEUE_MESSAGES.get(submission.status, ''),
+        'execution_time': submission.execution_time,
+        'cpu_time': submission.cpu_time,
+        'faster_than': runtimes.submission_faster_than(submission),
+        'failed_test': submission.failed_test,
+        'test_results': submission.test_results,
+        'finished': submission.is_finished,
+    }
+
+
+@login_required
+def submission_status(request, slug, submission_id):
+    """Retorna o estado atual de uma submissão (usado para polling)"""
+    submission = get_object_or_404(
+        Submission,
+        id=submission_id,
+        challenge__slug=slug,
+        user=request.user
+    )
+    archive.load(submission)
+    return JsonResponse(_submission_payload(submission))
+
+
+def _sse_event(event, data, event_id=None):
+    """Formata uma mensagem no protocolo server-sent events"""
+    message = f'event: {event}\n'
+    if event_id is not None:
+        message += f'id: {event_id}\n'
+    message += f'data: {json.dumps(data)}\n\n'
+    return message
+
+
+def _poll_submission_events(submission_id, sent):
+    """
+    Lê a submissão e monta os eventos novos a partir do teste ``sent``
+
+    Emite um evento ``test`` para cada teste concluído (com o número do
+    teste como id, para que o navegador retome do ponto certo ao
+    reconectar) e um evento ``done`` com o resultado final.
+
+    Returns:
+        Tupla (eventos, testes já enviados, se a transmissão terminou)
+    """
+    submission = Submission.objects.filter(id=submission_id).first()
+    if submission is None:
+        return [], sent, True
+    archive.load(submission)
+
+    events = [
+        _sse_event('test', test_result, test_result['test_number'])
+        for test_result in submission.test_results[sent:]
+    ]
+    sent = max(sent, len(submission.test_results))
+
+    if submission.is_finished:
+        events.append(_sse_event('done', _submission_payload(submission)))
+        return events, sent, True
+    return events, sent, False
+
+
+def _events_settings():
+    """Intervalo entre consultas e prazo da conexão de eventos"""
+    poll_interval = getattr(settings, 'SUBMISSION_EVENTS_POLL_INTERVAL', 0.5)
+    deadline = time.monotonic() + getattr(settings, 'SUBMISSION_EVENTS_TIMEOUT', 60)
+    return poll_interval, deadline
+
+
+async def _submission_event_stream(submission_id, sent):
+    """Gera os eventos de progresso de uma submissão (servidor ASGI)"""
+    poll_interval, deadline = _events_settings()
+
+    yield 'retry: 1000\n\n'
+    while True:
+        events, sent, finished = await sync_to_async(_poll_submission_events)(
+            submission_id, sent
+        )
+        for event in events:
+            yield event
+        # Ao fim do prazo o navegador reconecta sozinho enviando o Last-Event-ID
+        if finished or time.monotonic() >= deadline:
+            return
+
+        yield ': keep-alive\n\n'
+        await asyncio.sleep(poll_interval)
+
+
+def _submission_event_stream_sync(submission_id, sent):
+    """
+    Gera os eventos de progresso de uma submissão (servidor WSGI)
+
+    Sob WSGI o Django consumiria o gerador assíncrono inteiro antes de
+    responder; este gerador síncrono envia cada evento assim que ele existe,
+    ao custo de ocupar uma thread do servidor enquanto a conexão dura.
+    """
+    poll_interval, deadline = _events_settings()
+
+    yield 'retry: 1000\n\n'
+    while True:
+        events, sent, finished = _poll_submission_events(submission_id, sent)
+        yield from events
+        if finished or time.monotonic() >= deadline:
+            return
+
+        yield ': keep-alive\n\n'
+        time.sleep(poll_interval)
+
+
+async def submission_events(request, slug, submission_id):
+    """
+    Transmite o progresso da avaliação via server-sent events
+
+    Servida pelo ASGI (codingplatform/asgi.py), cada conexão aberta não
+    ocupa uma thread do servidor. Sob WSGI (runserver, gunicorn) a view
+    transmite com um gerador síncrono, que ocupa uma thread por conexão.
+    """
+    def get_user():
+        return request.user if request.user.is_authenticated else None
+
+    user = await sync_to_async(get_user)()
+    if user is None:
+        return JsonResponse({'error': 'Autenticação necessária'}, status=401)
+
+    exists = await Submission.objects.filter(
+        id=submission_id,
+        challenge__slug=slug,
+        user=user
+    ).aexists()
+    if not exists:
+        return JsonResponse({'error': 'Submissão não encontrada'}, status=404)
+
+    try:
+        sent = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        sent = 0
+
+    if isinstance(request, ASGIRequest):
+        stream = _submission_event_stream(submission_id, sent)
+    else:
+        stream = _submission_event_stream_sync(submission_id, sent)
+    response = StreamingHttpResponse(
+        stream,
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Desativa o buffer do nginx
+    return response
+
+
 @login_required
 def user_profile(request):
     """Página de perfil do usuário"""
@@ -279,19 +487,14 @@ def user_profile(request):
     # Submissões recentes
     recent_submissions = Submission.objects.filter(
         user=request.user
-    ).select_related('challenge').order_by('-submitted_at')[:10]
+    ).select_related('challenge').defer(*ARCHIVED_FIELDS).order_by('-submitted_at')[:10]
     
     # Desafios resolvidos
-    solved_challenges = Submission.objects.filter(
-        user=request.user,
-        status='accepted'
-    ).values('challenge').distinct()
-    
-    solved_challenge_ids = [sc['challenge'] for sc in solved_challenges]
-    solved_challenge_list = Challenge.objects.filter(id__in=solved_challenge_ids)
+    solved_challenge_list = Challenge.objects.filter(solvers__user=request.user)
     
     context = {
         'profile': profile,
+        'my_rank': get_user_rank(request.user),
         'recent_submissions': recent_submissions,
         'solved_challenges': solved_challenge_list,
         'solved_problems': solved_challenge_list,  # Compatibilidade com templates
@@ -299,14 +502,37 @@ def user_profile(request):
     return render(request, 'problems/profile.html', context)
 
 
+def leaderboard(request):
+    """Ranking de usuários, paginado por cursor"""
+    cursor = request.GET.get('cursor')
+    try:
+        page = leaderboard_page(cursor, _page_size())
+    except InvalidCursor:
+        cursor = None
+        page = leaderboard_page(None, _page_size())
+    
+    first_page_url = '?' if cursor else None
+    next_page_url = f'?cursor={page.next_cursor}' if page.next_cursor else None
+    
+    context = {
+        'entries': page.items,
+        'my_rank': get_user_rank(request.user),
+        'next_page_url': next_page_url,
+        'first_page_url': first_page_url,
+    }
+    return render(request, 'problems/leaderboard.html', context)
+
+
 @login_required
 def submission_detail(request, submission_id):
     """Detalhe de uma submissão"""
     submission = get_object_or_404(
-        Submission, 
+        Submission.objects.select_related('code_blob'),
         id=submission_id,
         user=request.user
     )
+    # Submissões antigas guardam o resultado no arquivo compactado
+    archive.load(submission)
     
     context = {
         'submission': submission,